@@ -0,0 +1,426 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from Logic.app_logic import AppLogic
+from Models.account import Account
+from Models.account_keys import ACCOUNT_KEY_PREFIX
+from Models.compact_accounts import COMPACT_KEY_PATTERN, account_writer
+from Models.password_policy import PasswordPolicy, set_password_policy
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+from Utils.data_loader import DataLoader
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "results.json")
+
+# Every benchmark account uses this prefix, so cleaning up never touches real accounts
+BENCH_USER_PREFIX = "bench-"
+BENCH_PASSWORD = "benchpw123"
+
+class CountingClient:
+    """
+    Wraps a storage client and counts the round trips made through it.
+
+    Direct commands, script calls and pipeline executions each count as one round trip,
+    which is what they cost on a real Redis server.
+    """
+
+    def __init__(self, client):
+        """
+        Initializes the wrapper.
+
+        Args:
+            client: The storage client to wrap.
+        """
+        self.client = client
+        self.round_trips = 0
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if not callable(attribute):
+            return attribute
+
+        def command(*args, **kwargs):
+            self.round_trips += 1
+            return attribute(*args, **kwargs)
+        return command
+
+    def pipeline(self, transaction=True):
+        pipeline = self.client.pipeline(transaction=transaction)
+        original_execute = pipeline.execute
+
+        def execute(*args, **kwargs):
+            self.round_trips += 1
+            return original_execute(*args, **kwargs)
+        pipeline.execute = execute
+        return pipeline
+
+    def register_script(self, source):
+        script = self.client.register_script(source)
+
+        def run(keys=None, args=None, client=None):
+            if client is None:
+                self.round_trips += 1
+            return script(keys=keys, args=args, client=client)
+        return run
+
+@contextlib.contextmanager
+def bcrypt_cost(rounds):
+    """
+    Uses a bcrypt password policy with the given cost while the block runs.
+
+    Benchmarks default to the minimum cost so the numbers show the application's own work
+    rather than being dominated by hashing; pass 12 to measure the production cost. The
+    seeded hashes use the same cost, so logins never trigger a rehash.
+
+    Args:
+        rounds (int): The bcrypt cost factor.
+
+    Yields:
+        PasswordPolicy: The policy in use.
+    """
+    policy = PasswordPolicy('bcrypt', bcrypt_rounds=rounds)
+    previous = set_password_policy(policy)
+    try:
+        yield policy
+    finally:
+        set_password_policy(previous)
+
+def percentile(samples, pct):
+    """
+    Returns a percentile of the samples using the nearest-rank method.
+
+    Args:
+        samples (list): The measured values.
+        pct (float): The percentile, from 0 to 100.
+
+    Returns:
+        float: The percentile value, or 0.0 for no samples.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def summarize(durations, round_trips, operations, elapsed=None):
+    """
+    Turns raw timings into the figures written to the results file.
+
+    Args:
+        durations (list): Seconds taken by each timed sample.
+        round_trips (int): Round trips made during the samples.
+        operations (int): Logical operations performed.
+        elapsed (float, optional): Wall-clock seconds for all operations. Defaults to the sum of durations.
+
+    Returns:
+        dict: operations, p50/p90/p99/max latency in milliseconds, throughput in operations
+            per second and round trips per operation.
+    """
+    elapsed = sum(durations) if elapsed is None else elapsed
+    return {
+        'operations': operations,
+        'p50_ms': round(percentile(durations, 50) * 1000, 4),
+        'p90_ms': round(percentile(durations, 90) * 1000, 4),
+        'p99_ms': round(percentile(durations, 99) * 1000, 4),
+        'max_ms': round(max(durations, default=0) * 1000, 4),
+        'throughput_per_s': round(operations / elapsed, 2) if elapsed else 0.0,
+        'round_trips_per_op': round(round_trips / operations, 4) if operations else 0.0
+    }
+
+def seed_accounts(client, count, password_hash, layout=None):
+    """
+    Stores benchmark accounts in pipelined batches.
+
+    Args:
+        client: The storage client.
+        count (int): Number of accounts.
+        password_hash (str): The bcrypt hash stored for every account.
+        layout (str, optional): 'hash' or 'compact'. Defaults to the CAMPSITE_ACCOUNT_LAYOUT setting.
+    """
+    write_account = account_writer(client, layout)
+    for start in range(0, count, 1000):
+        pipeline = client.pipeline(transaction=False)
+        for i in range(start, min(start + 1000, count)):
+            write_account(pipeline, f"{BENCH_USER_PREFIX}{i}@example.com", {
+                'password': password_hash,
+                'first_name': f"Bench{i}",
+                'security_question': "What is your pet's name?",
+                'security_answer': f"Pet{i}"
+            })
+        pipeline.execute()
+
+def clear_benchmark_keys(client):
+    """
+    Deletes the accounts created by the benchmarks and nothing else, in either layout.
+
+    Args:
+        client: The storage client.
+    """
+    for keys in scan_batches(client, match=f"{ACCOUNT_KEY_PREFIX}{{{BENCH_USER_PREFIX}*", count=1000):
+        if keys:
+            client.delete(*keys)
+    # Compact buckets are shared with real accounts, so only the benchmark fields are removed
+    for keys in scan_batches(client, match=COMPACT_KEY_PATTERN, count=1000):
+        if not keys:
+            continue
+        pipeline = client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.hkeys(key)
+        deletes = client.pipeline(transaction=False)
+        for key, login_names in zip(keys, pipeline.execute()):
+            login_names = [name for name in login_names if name.startswith(BENCH_USER_PREFIX)]
+            if login_names:
+                deletes.hdel(key, *login_names)
+        deletes.execute()
+
+def time_operation(counter, operation, iterations):
+    """
+    Runs an operation repeatedly, timing each call and counting its round trips.
+
+    Args:
+        counter (CountingClient): The client the operation uses.
+        operation (function): Called with the iteration number.
+        iterations (int): Number of calls.
+
+    Returns:
+        dict: The summary (see summarize).
+    """
+    # One untimed call first (with i=-1), so imports and script loading are not measured
+    operation(-1)
+    durations = []
+    counter.round_trips = 0
+    for i in range(iterations):
+        started_at = time.perf_counter()
+        operation(i)
+        durations.append(time.perf_counter() - started_at)
+    return summarize(durations, counter.round_trips, iterations)
+
+def benchmark_login(counter, size, iterations):
+    account_manager = Account(counter)
+    users = [f"{BENCH_USER_PREFIX}{random.randrange(size)}@example.com" for _ in range(iterations)]
+    return time_operation(counter, lambda i: account_manager.login(users[i], BENCH_PASSWORD), iterations)
+
+def benchmark_create_account(counter, size, iterations):
+    account_manager = Account(counter)
+    return time_operation(counter, lambda i: account_manager.create_account(
+        f"{BENCH_USER_PREFIX}new-{size}-{i}@example.com", BENCH_PASSWORD, "New", "Favourite colour?", "Blue"
+    ), iterations)
+
+def benchmark_forgot_password(counter, size, iterations):
+    logic = AppLogic(connect=False)
+    logic.redis_client = counter
+    logic.account_manager = Account(counter)
+    users = [f"{BENCH_USER_PREFIX}{random.randrange(size)}@example.com" for _ in range(iterations)]
+    return time_operation(counter, lambda i: logic.handle_forgot_password(users[i]), iterations)
+
+def benchmark_load_initial_data(counter, size, chunk_size=500):
+    """
+    Loads a generated CSV of `size` rows, timing each chunk.
+
+    Returns:
+        dict: The summary, with operations counted in rows and latency measured per chunk.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        csv_file = os.path.join(directory, "accounts.csv")
+        with open(csv_file, mode='w', newline='') as file:
+            file.write("username,password,firstname,first dogs name\n")
+            for i in range(size):
+                file.write(f"{BENCH_USER_PREFIX}csv{i}@example.com,pass{i},Name{i},Dog{i}\n")
+
+        chunk_times = []
+        last = [time.perf_counter()]
+
+        def on_chunk(report):
+            now = time.perf_counter()
+            chunk_times.append(now - last[0])
+            last[0] = now
+
+        counter.round_trips = 0
+        started_at = time.perf_counter()
+        DataLoader(counter, chunk_size=chunk_size, progress_callback=on_chunk).load_initial_data(csv_file)
+        elapsed = time.perf_counter() - started_at
+    return summarize(chunk_times, counter.round_trips, size, elapsed)
+
+OPERATIONS = {
+    'login': benchmark_login,
+    'create_account': benchmark_create_account,
+    'handle_forgot_password': benchmark_forgot_password
+}
+
+def run_suite(sizes=(100, 1000, 10000), iterations=200, backend='memory', bcrypt_rounds=4, operations=None):
+    """
+    Runs every benchmark at every dataset size.
+
+    Args:
+        sizes (tuple, optional): Numbers of accounts stored before measuring. Defaults to (100, 1000, 10000).
+        iterations (int, optional): Calls timed per operation and size. Defaults to 200.
+        backend (str, optional): Storage backend to measure ('memory', 'sqlite' or 'redis').
+            Defaults to 'memory'.
+        bcrypt_rounds (int, optional): bcrypt cost used while benchmarking. Defaults to 4.
+        operations (list, optional): Names of the benchmarks to run. Defaults to all of them
+            plus 'load_initial_data'.
+
+    Returns:
+        dict: {'meta': {...}, 'results': {operation: {size: summary}}}.
+    """
+    operations = operations or list(OPERATIONS) + ['load_initial_data']
+    random.seed(0)
+    results = {operation: {} for operation in operations}
+    with bcrypt_cost(bcrypt_rounds) as policy, contextlib.redirect_stdout(io.StringIO()):
+        password_hash = policy.hash(BENCH_PASSWORD)
+        for size in sizes:
+            client = open_storage(backend)
+            if client is None:
+                raise ConnectionError(f"Could not open the '{backend}' storage backend.")
+            try:
+                clear_benchmark_keys(client)
+                seed_accounts(client, size, password_hash)
+                counter = CountingClient(client)
+                for operation in operations:
+                    if operation == 'load_initial_data':
+                        results[operation][str(size)] = benchmark_load_initial_data(counter, size)
+                    else:
+                        results[operation][str(size)] = OPERATIONS[operation](counter, size, iterations)
+            finally:
+                clear_benchmark_keys(client)
+
+    return {
+        'meta': {
+            'backend': backend,
+            'bcrypt_rounds': bcrypt_rounds,
+            'iterations': iterations,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'created_at': time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        'results': results
+    }
+
+def compare(results, baseline, timings=False, threshold=0.25, tail_threshold=1.0, min_delta_ms=0.5):
+    """
+    Compares results with a baseline and lists the regressions.
+
+    Round trips per operation do not depend on the machine, so any increase counts. Latency
+    and throughput do, so they are only compared when `timings` is set, which makes sense
+    for a baseline recorded on the same machine. Then median latency may grow and throughput
+    may drop by `threshold` before it counts as a regression; p99 latency, which is noisier,
+    may grow by `tail_threshold`. Latency changes smaller than `min_delta_ms` are ignored as
+    timer noise.
+
+    Args:
+        results (dict): Output of run_suite().
+        baseline (dict): A previous output of run_suite().
+        timings (bool, optional): Whether to compare latency and throughput too. Defaults to False.
+        threshold (float, optional): Allowed relative slowdown of p50 and throughput. Defaults to 0.25.
+        tail_threshold (float, optional): Allowed relative slowdown of p99. Defaults to 1.0.
+        min_delta_ms (float, optional): Smallest latency increase reported. Defaults to 0.5.
+
+    Returns:
+        list: One message per regression; empty if there are none.
+    """
+    regressions = []
+    for operation, sizes in results['results'].items():
+        for size, current in sizes.items():
+            previous = baseline.get('results', {}).get(operation, {}).get(size)
+            if previous is None:
+                continue
+            name = f"{operation} @ {size}"
+            if current['round_trips_per_op'] > previous['round_trips_per_op'] + 1e-9:
+                regressions.append(
+                    f"{name}: round_trips_per_op {previous['round_trips_per_op']} -> {current['round_trips_per_op']}"
+                )
+            if not timings:
+                continue
+            for metric, allowed in (('p50_ms', threshold), ('p99_ms', tail_threshold)):
+                limit = max(previous[metric] * (1 + allowed), previous[metric] + min_delta_ms)
+                if current[metric] > limit:
+                    regressions.append(f"{name}: {metric} {previous[metric]} -> {current[metric]}")
+            if previous['throughput_per_s'] and current['throughput_per_s'] < previous['throughput_per_s'] * (1 - threshold):
+                regressions.append(
+                    f"{name}: throughput_per_s {previous['throughput_per_s']} -> {current['throughput_per_s']}"
+                )
+    return regressions
+
+def print_table(results):
+    """
+    Prints the results as a table.
+
+    Args:
+        results (dict): Output of run_suite().
+    """
+    print(f"{'operation':<24}{'size':>8}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>12}{'trips/op':>10}")
+    for operation, sizes in results['results'].items():
+        for size, summary in sizes.items():
+            print(f"{operation:<24}{size:>8}{summary['p50_ms']:>10.3f}{summary['p99_ms']:>10.3f}"
+                  f"{summary['throughput_per_s']:>12.1f}{summary['round_trips_per_op']:>10.3f}")
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the benchmark suite.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the account and loader hot paths.")
+    parser.add_argument('--sizes', default="100,1000,10000", help="Comma-separated dataset sizes.")
+    parser.add_argument('--iterations', type=int, default=200, help="Calls timed per operation and size.")
+    parser.add_argument('--backend', default='memory', help="Storage backend: memory, sqlite or redis.")
+    parser.add_argument('--bcrypt-rounds', type=int, default=4, help="bcrypt cost used while benchmarking.")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="Where to write the JSON results.")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against.")
+    parser.add_argument('--compare-timings', action='store_true',
+                        help="Also compare latency and throughput; only meaningful for a baseline from this machine.")
+    parser.add_argument('--threshold', type=float, default=0.25, help="Allowed relative slowdown of p50 and throughput.")
+    parser.add_argument('--tail-threshold', type=float, default=1.0, help="Allowed relative slowdown of p99.")
+    parser.add_argument('--update-baseline', action='store_true', help="Save these results as the new baseline.")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Runs the suite, writes the results and compares them with the baseline.
+
+    Returns:
+        int: 0 if there are no regressions, 1 otherwise.
+    """
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run_suite(sizes, args.iterations, args.backend, args.bcrypt_rounds)
+    print_table(results)
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against; run with --update-baseline to create one.")
+        return 0
+
+    with open(args.baseline) as file:
+        regressions = compare(results, json.load(file), args.compare_timings, args.threshold, args.tail_threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the baseline.")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+from Benchmarks.benchmark_suite import (
+    BENCH_PASSWORD, BENCH_USER_PREFIX, bcrypt_cost, clear_benchmark_keys, seed_accounts, summarize
+)
+from Logic.account_http import AccountHTTPServer
+from Logic.account_service import AccountService
+from Models.async_storage import AsyncStorageAdapter, close_async_storage, open_async_storage
+from Models.storage import open_storage
+
+OPERATIONS = ('login', 'security_question', 'create_account')
+
+class HTTPClient:
+    """
+    One keep-alive HTTP/1.1 connection to the account service, sending JSON requests one
+    at a time.
+    """
+
+    def __init__(self, host, port):
+        """
+        Args:
+            host (str): The service's address.
+            port (int): The service's port.
+        """
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """
+        Sends a request and reads the response, reconnecting if the service closed the connection.
+
+        Args:
+            method (str): 'GET' or 'POST'.
+            path (str): The route, e.g. '/login'.
+            payload (dict, optional): The JSON body.
+
+        Returns:
+            tuple: (int, dict) - The status code and the decoded response body.
+        """
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload or {}).encode('utf-8')
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+        )
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        response = json.loads(await self.reader.readexactly(int(headers['content-length'])))
+        if headers.get('connection') == 'close':
+            await self.close()
+        return status, response
+
+    async def close(self):
+        """
+        Closes the connection.
+        """
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.writer = None
+
+def build_request(operation, client, n, accounts):
+    """
+    Builds one request of the load test.
+
+    Args:
+        operation (str): 'login', 'security_question' or 'create_account'.
+        client (int): Number of the simulated client.
+        n (int): Number of the request within the client's run.
+        accounts (int): Number of seeded accounts to log in to.
+
+    Returns:
+        tuple: (str, dict) - The route and the JSON body.
+    """
+    login_name = f"{BENCH_USER_PREFIX}{(client * 7919 + n) % accounts}@example.com"
+    if operation == 'login':
+        return '/login', {'login_name': login_name, 'password': BENCH_PASSWORD}
+    if operation == 'security_question':
+        return '/security-question', {'login_name': login_name}
+    return '/accounts', {
+        'login_name': f"{BENCH_USER_PREFIX}load-{client}-{n}@example.com",
+        'password': BENCH_PASSWORD,
+        'first_name': "Load",
+        'security_question': "What is your pet's name?",
+        'security_answer': "Rex"
+    }
+
+async def run_clients(host, port, clients, requests_per_client, operations, accounts):
+    """
+    Sends requests from many concurrent clients, each on its own connection, and times them.
+
+    Args:
+        host (str): The service's address.
+        port (int): The service's port.
+        clients (int): Concurrent clients.
+        requests_per_client (int): Requests each client sends, one after another.
+        operations (list): Operations the requests cycle through.
+        accounts (int): Number of seeded accounts.
+
+    Returns:
+        tuple: (list, Counter, float) - Each request's latency in seconds, the count of each
+            response status, and the wall-clock seconds for all requests.
+    """
+    durations = []
+    statuses = Counter()
+
+    async def client_run(client):
+        connection = HTTPClient(host, port)
+        try:
+            for n in range(requests_per_client):
+                path, payload = build_request(operations[(client + n) % len(operations)], client, n, accounts)
+                started_at = time.perf_counter()
+                status, _ = await connection.request('POST', path, payload)
+                durations.append(time.perf_counter() - started_at)
+                statuses[status] += 1
+        finally:
+            await connection.close()
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(client_run(client) for client in range(clients)))
+    return durations, statuses, time.perf_counter() - started_at
+
+async def run_load_test(clients=50, requests_per_client=20, operations=OPERATIONS, backend='memory', bcrypt_rounds=4,
+                        accounts=1000, host=None, port=None, max_in_flight=64, max_queue=256, hash_workers=None):
+    """
+    Seeds benchmark accounts and measures the account service under concurrent load.
+
+    Unless host and port are given, the service is started in this process on the chosen
+    backend, without rate limiting; a running service must use the same backend for the
+    seeded accounts to be found. Benchmark accounts are deleted afterwards.
+
+    Args:
+        clients (int, optional): Concurrent clients. Defaults to 50.
+        requests_per_client (int, optional): Requests each client sends. Defaults to 20.
+        operations (tuple, optional): Operations the requests cycle through. Defaults to OPERATIONS.
+        backend (str, optional): Storage backend. Defaults to 'memory'.
+        bcrypt_rounds (int, optional): bcrypt cost of the seeded and created accounts. Defaults to 4.
+        accounts (int, optional): Accounts seeded for logins. Defaults to 1000.
+        host (str, optional): Address of a running service.
+        port (int, optional): Port of a running service.
+        max_in_flight (int, optional): The in-process service's concurrency limit. Defaults to 64.
+        max_queue (int, optional): The in-process service's queue limit. Defaults to 256.
+        hash_workers (int, optional): The in-process service's hashing threads. Defaults to one per CPU.
+
+    Returns:
+        dict: The settings, the count of each response status, and latency percentiles and
+            throughput as in the benchmark suite.
+    """
+    storage = open_storage(backend)
+    service = server = async_storage = None
+    with bcrypt_cost(bcrypt_rounds) as policy:
+        try:
+            clear_benchmark_keys(storage)
+            seed_accounts(storage, accounts, policy.hash(BENCH_PASSWORD))
+
+            if host is None:
+                async_storage = await open_async_storage('redis') if backend == 'redis' else AsyncStorageAdapter(storage)
+                service = AccountService(async_storage, policy, max_in_flight=max_in_flight, max_queue=max_queue,
+                                         hash_workers=hash_workers)
+                server = AccountHTTPServer(service, '127.0.0.1', 0, max_connections=clients + 10)
+                host, port = '127.0.0.1', await server.start()
+
+            durations, statuses, elapsed = await run_clients(
+                host, port, clients, requests_per_client, list(operations), accounts
+            )
+        finally:
+            if server is not None:
+                await server.close()
+                service.close()
+            if async_storage is not None and backend == 'redis':
+                await close_async_storage(async_storage)
+            clear_benchmark_keys(storage)
+            storage.close()
+
+    round_trips = sum(service.account_manager.repository.round_trips.values()) if service else 0
+    return {
+        'clients': clients,
+        'backend': backend,
+        'bcrypt_rounds': bcrypt_rounds,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        **summarize(durations, round_trips, len(durations), elapsed)
+    }
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the load test.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Measure the asyncio account service under concurrent clients.")
+    parser.add_argument('--clients', type=int, default=50, help="Concurrent clients, each on its own connection.")
+    parser.add_argument('--requests', type=int, default=20, help="Requests sent by each client.")
+    parser.add_argument('--operations', default=','.join(OPERATIONS),
+                        help="Comma-separated operations the requests cycle through.")
+    parser.add_argument('--backend', default='memory', help="Storage backend: memory, sqlite or redis.")
+    parser.add_argument('--bcrypt-rounds', type=int, default=4, help="bcrypt cost of the test accounts.")
+    parser.add_argument('--accounts', type=int, default=1000, help="Accounts seeded for logins.")
+    parser.add_argument('--host', default=None, help="Address of a running service; by default one is started.")
+    parser.add_argument('--port', type=int, default=8080, help="Port of the running service.")
+    parser.add_argument('--max-in-flight', type=int, default=64, help="Concurrency limit of the started service.")
+    parser.add_argument('--max-queue', type=int, default=256, help="Queue limit of the started service.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(run_load_test(
+        clients=args.clients,
+        requests_per_client=args.requests,
+        operations=[operation for operation in args.operations.split(',') if operation],
+        backend=args.backend,
+        bcrypt_rounds=args.bcrypt_rounds,
+        accounts=args.accounts,
+        host=args.host,
+        port=args.port if args.host else None,
+        max_in_flight=args.max_in_flight,
+        max_queue=args.max_queue
+    ))
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,125 @@
+import json
+import os
+import time
+from kivy.core.image import Image as CoreImage
+
+ASSETS_DIR = "Assets"
+BACKGROUND = os.path.join(ASSETS_DIR, "background.jpg")
+
+# Icons packed into one atlas texture by build_assets.py
+ICONS = ("create_icon.png", "login_icon.png", "forgot_icon.png", "help_icon.png")
+ICON_ATLAS = os.path.join(ASSETS_DIR, "icons.atlas")
+
+def scaled_background_path(width, height):
+    """
+    Returns where build_assets.py writes the background pre-scaled to a window size.
+
+    Args:
+        width (int): Window width in pixels.
+        height (int): Window height in pixels.
+
+    Returns:
+        str: The path of the scaled copy.
+    """
+    return os.path.join(ASSETS_DIR, f"background-{width}x{height}.jpg")
+
+class TextureCache:
+    """
+    Decodes each image file once and shares its GPU texture between all widgets.
+
+    Kivy's own image cache drops textures that have not been used for a minute, so a screen
+    built later would decode the background again. This cache keeps a reference to every
+    texture it loads, and records how long decoding took and how much texture memory is held.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty cache.
+        """
+        self.textures = {}
+        self.decode_seconds = {}
+        self.hits = 0
+
+    def texture(self, path):
+        """
+        Returns the texture of an image file, decoding it on first use.
+
+        Args:
+            path (str): Path to the image file.
+
+        Returns:
+            Texture: The shared texture.
+        """
+        texture = self.textures.get(path)
+        if texture is not None:
+            self.hits += 1
+            return texture
+
+        started_at = time.perf_counter()
+        texture = CoreImage(path).texture
+        self.decode_seconds[path] = time.perf_counter() - started_at
+        self.textures[path] = texture
+        return texture
+
+    def stats(self):
+        """
+        Reports what the cache holds.
+
+        Returns:
+            dict: The number of textures, the decodes saved by sharing, the time spent
+                decoding each file, and the texture memory in bytes (at 4 bytes a pixel).
+        """
+        return {
+            'textures': len(self.textures),
+            'hits': self.hits,
+            'decode_seconds': dict(self.decode_seconds),
+            'texture_bytes': sum(texture.width * texture.height * 4 for texture in self.textures.values())
+        }
+
+# Textures shared by every screen in the process
+TEXTURES = TextureCache()
+
+_atlas_ids = None
+
+def icon_source(path):
+    """
+    Returns the source to load an icon from: its region of the icon atlas if the atlas has
+    been built and contains it, otherwise the image file itself.
+
+    Args:
+        path (str): Path to the icon's image file, e.g. 'Assets/login_icon.png'.
+
+    Returns:
+        str: An 'atlas://' URI or the original path.
+    """
+    global _atlas_ids
+    if _atlas_ids is None:
+        _atlas_ids = set()
+        if os.path.exists(ICON_ATLAS):
+            with open(ICON_ATLAS) as atlas_file:
+                for regions in json.load(atlas_file).values():
+                    _atlas_ids.update(regions)
+
+    icon_id = os.path.splitext(os.path.basename(path))[0]
+    if icon_id in _atlas_ids:
+        return f"atlas://{os.path.splitext(ICON_ATLAS)[0]}/{icon_id}"
+    return path
+
+def background_texture(window_size=None):
+    """
+    Returns the shared background texture, using the copy pre-scaled to the window size by
+    build_assets.py if there is one.
+
+    Args:
+        window_size (tuple, optional): (width, height) of the window. Defaults to the
+            original image.
+
+    Returns:
+        Texture: The shared texture.
+    """
+    path = BACKGROUND
+    if window_size is not None:
+        scaled = scaled_background_path(*window_size)
+        if os.path.exists(scaled):
+            path = scaled
+    return TEXTURES.texture(path)
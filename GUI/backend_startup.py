@@ -0,0 +1,60 @@
+import threading
+import time
+from kivy.clock import Clock
+from kivy.core.window import Window
+from Utils.startup_profile import STARTUP_PROFILE
+
+def start_backend(logic, started_at, on_status=None, on_ready=None):
+    """
+    Starts the application logic on a background thread so the window can draw immediately.
+
+    Progress messages and the final result are relayed to the Kivy UI thread through Clock
+    callbacks, and the time to first frame and time to ready are printed. If startup
+    profiling is enabled, its timeline is printed once both have happened.
+
+    Args:
+        logic (AppLogic): Logic created with connect=False.
+        started_at (float): time.perf_counter() value taken when the application started.
+        on_status (function, optional): Called on the UI thread with each status message.
+        on_ready (function, optional): Called on the UI thread with (success, message) once
+            startup has finished.
+
+    Returns:
+        threading.Thread: The thread running the startup.
+    """
+    milestones = []
+    milestones_lock = threading.Lock()
+
+    def reached(milestone):
+        STARTUP_PROFILE.mark(milestone)
+        with milestones_lock:
+            milestones.append(milestone)
+            done = len(milestones) == 2
+        if done and STARTUP_PROFILE.enabled:
+            STARTUP_PROFILE.disable()
+            STARTUP_PROFILE.report()
+
+    def on_first_frame(*args):
+        Window.unbind(on_draw=on_first_frame)
+        print(f"Time to first frame: {time.perf_counter() - started_at:.3f}s")
+        reached("first frame")
+
+    def relay_status(message):
+        STARTUP_PROFILE.mark(message)
+        if on_status is not None:
+            Clock.schedule_once(lambda dt: on_status(message))
+
+    def run():
+        success, message = logic.start(progress_callback=relay_status)
+        if success:
+            print(f"Time to ready: {time.perf_counter() - started_at:.3f}s")
+        else:
+            print(message)
+        reached("ready" if success else "startup failed")
+        if on_ready is not None:
+            Clock.schedule_once(lambda dt: on_ready(success, message))
+
+    Window.bind(on_draw=on_first_frame)
+    thread = threading.Thread(target=run, name="backend-startup", daemon=True)
+    thread.start()
+    return thread
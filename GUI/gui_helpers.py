@@ -2,6 +2,8 @@ from kivy.uix.button import Button
 from kivy.uix.label import Label
 from kivy.uix.popup import Popup
 from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.image import Image
+from GUI.assets import background_texture, icon_source
 
 def create_button(
     text, 
@@ -21,7 +23,8 @@ def create_button(
         size_hint (tuple): Size hint tuple (width, height).
         pos_hint (dict): Position hint dictionary.
         callback (function): Function to be called on button press.
-        image_path (str, optional): Optional path to an image file for button background.
+        image_path (str, optional): Optional path to an image file for button background. Icons
+            packed into the icon atlas are loaded from it.
         font_size (int, optional): Font size of the button text. Defaults to 20.
         background_color (tuple, optional): Background color of the button. Defaults to (0.2, 0.6, 0.8, 1).
         border (tuple, optional): Border size. Defaults to (0, 0, 0, 0).
@@ -29,6 +32,8 @@ def create_button(
     Returns:
         Button: Configured Button object.
     """
+    if image_path:
+        image_path = icon_source(image_path)
     button = Button(
         text=text,
         size_hint=size_hint,
@@ -43,6 +48,23 @@ def create_button(
     button.bind(on_press=callback)
     return button
 
+def create_background(keep_ratio=False):
+    """
+    Create the background image shared by every screen.
+
+    All backgrounds draw the same texture, decoded once (see GUI.assets), instead of each
+    screen decoding the image file again.
+
+    Args:
+        keep_ratio (bool, optional): Keep the image's aspect ratio when stretching it to the
+            screen. Defaults to False.
+
+    Returns:
+        Image: Configured Image object.
+    """
+    from kivy.core.window import Window  # Imported here so importing the helpers does not open a window
+    return Image(texture=background_texture(tuple(Window.size)), allow_stretch=True, keep_ratio=keep_ratio)
+
 def show_popup(title, message):
     """
     Display a popup with a given title and message.
@@ -68,6 +90,21 @@ def show_popup(title, message):
     close_button.bind(on_press=popup.dismiss)
     popup.open()
 
+def require_backend(logic):
+    """
+    Check that the backend has finished starting, telling the user to wait if it has not.
+
+    Args:
+        logic: The application logic handler.
+
+    Returns:
+        bool: True if the backend is ready, otherwise False after showing a popup.
+    """
+    if logic.is_ready():
+        return True
+    show_popup("Please wait", logic.status)
+    return False
+
 def create_label(text, font_size=24, color=(1, 1, 1, 1)):
     """
     Create a styled label with specified text, font size, and color.
@@ -1,32 +1,41 @@
-from kivy.uix.screenmanager import ScreenManager, NoTransition
+import time
+from kivy.uix.screenmanager import NoTransition
 from kivy.app import App
+from GUI.backend_startup import start_backend
+from GUI.screen_registry import LazyScreenManager, screen_factory
 from Logic.app_logic import AppLogic
-from Screens.main_menu_screen import MainMenuScreen
-from Screens.create_account_screen import CreateAccountScreen
-from Screens.login_screen import LoginScreen
-from Screens.forgot_password_screen import ForgotPasswordScreen
-from Screens.info_screen import InfoScreen
 
 class CampsiteApp(App):
 
     def build(self):
         """
-        Builds the application by setting up the screen manager and adding screens.
+        Builds the application by setting up the screen manager and registering screens.
 
         Returns:
-            ScreenManager: The screen manager configured with all the app screens.
+            LazyScreenManager: The screen manager configured with all the app screens, of
+                which only the main menu is built up front.
         """
-        # Initializes application logic
-        self.logic = AppLogic()
+        started_at = time.perf_counter()
+
+        # Initializes application logic, connected in the background once the screens exist
+        self.logic = AppLogic(connect=False)
 
         # Create the screen manager with NoTransition to disable animations between screens
-        self.screen_manager = ScreenManager(transition=NoTransition())
-
-        # Add all screens to the screen manager
-        self.screen_manager.add_widget(MainMenuScreen(name='main'))
-        self.screen_manager.add_widget(CreateAccountScreen(self.logic, name='create_account'))
-        self.screen_manager.add_widget(LoginScreen(self.logic, name='login'))
-        self.screen_manager.add_widget(ForgotPasswordScreen(self.logic, name='forgot_password'))
-        self.screen_manager.add_widget(InfoScreen(name='info'))
+        self.screen_manager = LazyScreenManager(transition=NoTransition())
+
+        # Register all screens; each is built when first opened or while the main menu is idle
+        self.screen_manager.register('main', screen_factory('Screens.main_menu_screen', 'MainMenuScreen', name='main'),
+                                     next_screens=('login', 'create_account', 'forgot_password'))
+        self.screen_manager.register('create_account', screen_factory(
+            'Screens.create_account_screen', 'CreateAccountScreen', self.logic, name='create_account'))
+        self.screen_manager.register('login', screen_factory(
+            'Screens.login_screen', 'LoginScreen', self.logic, name='login'))
+        self.screen_manager.register('forgot_password', screen_factory(
+            'Screens.forgot_password_screen', 'ForgotPasswordScreen', self.logic, name='forgot_password'))
+        self.screen_manager.register('info', screen_factory('Screens.info_screen', 'InfoScreen', name='info'))
+        main_menu = self.screen_manager.get_screen('main')
+
+        # Connect to Redis and load the initial data without blocking the first frame
+        start_backend(self.logic, started_at, on_status=main_menu.set_status)
 
         return self.screen_manager
@@ -0,0 +1,129 @@
+import importlib
+import time
+from kivy.clock import Clock
+from kivy.uix.screenmanager import ScreenManager
+
+def screen_factory(module_name, class_name, *args, **kwargs):
+    """
+    Returns a factory that imports a screen's module and builds the screen, for registering
+    with LazyScreenManager.
+
+    Importing the module only when the screen is built keeps its widgets' modules out of
+    startup too; kivy.uix.textinput alone takes about 150ms to import.
+
+    Args:
+        module_name (str): Module defining the screen, e.g. 'Screens.login_screen'.
+        class_name (str): The screen class, e.g. 'LoginScreen'.
+        *args: Positional arguments passed to the screen class.
+        **kwargs: Keyword arguments passed to the screen class.
+
+    Returns:
+        function: Builds the screen when called with no arguments.
+    """
+    def build():
+        return getattr(importlib.import_module(module_name), class_name)(*args, **kwargs)
+    return build
+
+class LazyScreenManager(ScreenManager):
+    """
+    A screen manager that builds each screen the first time it is needed.
+
+    Screens are registered with a factory instead of being added up front, so starting the
+    app only builds the first screen. A registered screen is built when it is navigated to,
+    or earlier, one per frame while the app is idle, if it is listed as a likely next screen
+    of the screen being shown. The build times of the deferred screens are what startup
+    saved, and are printed once every screen has been built.
+    """
+
+    def __init__(self, preload_delay=0.5, **kwargs):
+        """
+        Initializes an empty registry.
+
+        Args:
+            preload_delay (float, optional): Seconds after a screen is shown before its likely
+                next screens start being built. Defaults to 0.5.
+            **kwargs: Additional keyword arguments passed to ScreenManager.
+        """
+        self.factories = {}
+        self.next_screens = {}
+        self.build_times = {}
+        self.deferred = set()
+        self.preload_delay = preload_delay
+        self._preload_event = None
+        super(LazyScreenManager, self).__init__(**kwargs)
+
+    def register(self, name, factory, next_screens=()):
+        """
+        Registers a screen without building it.
+
+        The first screen registered is built straight away and shown, like the first screen
+        added to a ScreenManager.
+
+        Args:
+            name (str): The screen name used for navigation.
+            factory (function): Called with no arguments to build the screen, which must have
+                this name.
+            next_screens (iterable, optional): Names of the screens usually visited next,
+                preloaded while this one is shown.
+        """
+        self.factories[name] = factory
+        self.next_screens[name] = tuple(next_screens)
+        if self.current is None:
+            self.build_screen(name)
+        else:
+            self.deferred.add(name)
+
+    def build_screen(self, name):
+        """
+        Builds a registered screen if it has not been built yet.
+
+        Args:
+            name (str): The screen name.
+
+        Returns:
+            Screen: The screen.
+        """
+        if name in self.build_times or name not in self.factories:
+            return super(LazyScreenManager, self).get_screen(name)
+
+        started_at = time.perf_counter()
+        screen = self.factories[name]()
+        self.build_times[name] = time.perf_counter() - started_at
+        # Adding the first screen makes it current, which looks it up again by name
+        self.add_widget(screen)
+        if self.deferred and self.deferred <= set(self.build_times):
+            print(f"Deferred screen construction saved {self.startup_savings():.3f}s at startup "
+                  f"({len(self.deferred)} screens).")
+        return screen
+
+    def startup_savings(self):
+        """
+        Returns the time spent building the deferred screens so far, which building every
+        screen up front would have added to startup.
+
+        Returns:
+            float: Seconds.
+        """
+        return sum(self.build_times.get(name, 0.0) for name in self.deferred)
+
+    def get_screen(self, name):
+        return self.build_screen(name)
+
+    def has_screen(self, name):
+        return name in self.factories or super(LazyScreenManager, self).has_screen(name)
+
+    def on_current(self, instance, value):
+        super(LazyScreenManager, self).on_current(instance, value)
+        if self._preload_event is not None:
+            self._preload_event.cancel()
+        pending = [name for name in self.next_screens.get(value, ()) if name not in self.build_times]
+        if pending:
+            self._preload_event = Clock.schedule_once(lambda dt: self._preload(pending), self.preload_delay)
+
+    def _preload(self, pending):
+        # Build one screen per frame so the window keeps responding
+        while pending and (pending[0] in self.build_times or pending[0] not in self.factories):
+            pending.pop(0)
+        if pending:
+            self.build_screen(pending.pop(0))
+            self._preload_event = Clock.schedule_once(lambda dt: self._preload(pending), 0)
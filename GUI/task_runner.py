@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from kivy.clock import Clock
+from GUI.gui_helpers import show_popup
+
+class TaskRunner:
+    """
+    Runs blocking application logic calls on a worker pool, off the Kivy UI thread.
+
+    Each task has a name, and a second task with the same name is rejected while the first
+    is running, so double-clicking a button cannot submit twice. While a task runs, its
+    widgets are disabled and its button shows a busy message. Results are delivered back
+    on the UI thread through Clock callbacks.
+    """
+
+    def __init__(self, max_workers=4):
+        """
+        Initializes the worker pool.
+
+        Args:
+            max_workers (int, optional): Maximum number of tasks running at once. Defaults to 4.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="app-logic")
+        self.running = set()
+        self.lock = threading.Lock()
+
+    def submit(self, name, func, *args, on_done=None, busy_button=None, busy_text="Please wait...", disable=()):
+        """
+        Runs func(*args) on the worker pool.
+
+        Args:
+            name (str): Task name used to reject duplicate submissions.
+            func (function): The blocking function to run.
+            *args: Arguments passed to the function.
+            on_done (function, optional): Called on the UI thread with the function's result.
+            busy_button (Button, optional): Button disabled and relabelled with busy_text while running.
+            busy_text (str, optional): Text shown on busy_button while running. Defaults to "Please wait...".
+            disable (iterable, optional): Other widgets disabled while running.
+
+        Returns:
+            bool: True if the task was started, False if a task with the same name is still running.
+        """
+        with self.lock:
+            if name in self.running:
+                return False
+            self.running.add(name)
+
+        widgets = list(disable)
+        original_text = None
+        if busy_button is not None:
+            widgets.append(busy_button)
+            original_text = busy_button.text
+            busy_button.text = busy_text
+        for widget in widgets:
+            widget.disabled = True
+
+        def finish(future):
+            with self.lock:
+                self.running.discard(name)
+            for widget in widgets:
+                widget.disabled = False
+            if busy_button is not None:
+                busy_button.text = original_text
+
+            try:
+                result = future.result()
+            except Exception as e:
+                show_popup("Error", f"Something went wrong: {e}")
+                return
+            if on_done is not None:
+                on_done(result)
+
+        future = self.executor.submit(func, *args)
+        future.add_done_callback(lambda done: Clock.schedule_once(lambda dt: finish(done)))
+        return True
+
+    def is_running(self, name):
+        """
+        Checks whether a task is in progress.
+
+        Args:
+            name (str): The task name.
+
+        Returns:
+            bool: True if the task is running.
+        """
+        with self.lock:
+            return name in self.running
+
+_shared_runner = None
+
+def get_task_runner():
+    """
+    Returns the task runner shared by all screens, creating it on first use.
+
+    Returns:
+        TaskRunner: The shared task runner.
+    """
+    global _shared_runner
+    if _shared_runner is None:
+        _shared_runner = TaskRunner()
+    return _shared_runner
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import math
+from http import HTTPStatus
+from Logic.account_service import ServiceBusy
+from Models.rate_limiter import RateLimitExceeded
+
+# Largest request body accepted, far above any account request
+MAX_BODY_BYTES = 16 * 1024
+
+# Most header lines, and most bytes of headers, accepted in one request
+MAX_HEADERS = 100
+MAX_HEADER_BYTES = 16 * 1024
+
+class RequestRejected(Exception):
+    """
+    Raised while reading a request that cannot be served; the connection is answered with
+    the status and closed.
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class AccountHTTPServer:
+    """
+    A small HTTP/1.1 JSON endpoint for an AccountService, on asyncio streams.
+
+    Routes (request and response bodies are JSON objects):
+        POST /accounts           login_name, password, first_name, security_question, security_answer
+        POST /login              login_name, password
+        POST /security-question  login_name -> security_question
+        POST /password-reset     login_name, security_answer, new_password
+        GET  /stats              the service's load
+
+    Every response has 'ok' and 'message'. Rate-limited attempts get 429 and a busy
+    service 503, both with Retry-After. Connections are kept alive between requests, and
+    connections beyond max_connections are answered with 503 and closed, so the number of
+    open sockets stays bounded too. Once a request line has arrived, its headers and body
+    must follow within request_timeout, so a client sending them slowly cannot hold a
+    connection open.
+    """
+
+    def __init__(self, service, host='127.0.0.1', port=8080, max_connections=1000, idle_timeout=30,
+                 request_timeout=10):
+        """
+        Initializes the endpoint.
+
+        Args:
+            service (AccountService): The service handling the requests.
+            host (str, optional): Address to listen on. Defaults to '127.0.0.1'.
+            port (int, optional): Port to listen on; 0 picks a free one. Defaults to 8080.
+            max_connections (int, optional): Client connections open at once. Defaults to 1000.
+            idle_timeout (float, optional): Seconds an idle keep-alive connection stays open.
+                Defaults to 30.
+            request_timeout (float, optional): Seconds allowed for the headers and body of a
+                request after its request line. Defaults to 10.
+        """
+        self.service = service
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.request_timeout = request_timeout
+        self.connections = 0
+        self.server = None
+        self._handlers = {}
+        self.routes = {
+            ('POST', '/accounts'): self._create_account,
+            ('POST', '/login'): self._login,
+            ('POST', '/security-question'): self._security_question,
+            ('POST', '/password-reset'): self._reset_password,
+            ('GET', '/stats'): self._stats
+        }
+
+    async def start(self):
+        """
+        Starts listening.
+
+        Returns:
+            int: The port listened on.
+        """
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def serve_forever(self):
+        """
+        Serves requests until cancelled.
+        """
+        await self.server.serve_forever()
+
+    async def close(self):
+        """
+        Stops listening, closes the open connections and waits for their handlers to finish.
+        """
+        if self.server is None:
+            return
+        self.server.close()
+        for writer in list(self._handlers.values()):
+            writer.close()
+        if self._handlers:
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def _handle_connection(self, reader, writer):
+        peer = writer.get_extra_info('peername')
+        client_id = peer[0] if peer else None
+        if self.connections >= self.max_connections:
+            self._write_response(writer, HTTPStatus.SERVICE_UNAVAILABLE,
+                                 {'ok': False, 'message': "Too many connections."}, keep_alive=False)
+            await self._close(writer)
+            return
+
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while await self._handle_request(reader, writer, client_id):
+                pass
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            del self._handlers[task]
+            await self._close(writer)
+
+    async def _handle_request(self, reader, writer, client_id):
+        # Returns whether the connection should be kept open for another request
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+            if not request_line:
+                return False
+            try:
+                method, path, version = request_line.decode('latin-1').split()
+            except ValueError:
+                raise RequestRejected(HTTPStatus.BAD_REQUEST, "Malformed request.")
+            try:
+                headers, body = await asyncio.wait_for(self._read_message(reader), self.request_timeout)
+            except asyncio.TimeoutError:
+                raise RequestRejected(HTTPStatus.REQUEST_TIMEOUT, "Request not received in time.")
+        except (ValueError, asyncio.LimitOverrunError):
+            # asyncio raises ValueError for a line longer than the stream limit
+            self._write_response(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                                 {'ok': False, 'message': "Request line or header too long."}, keep_alive=False)
+            return False
+        except RequestRejected as e:
+            self._write_response(writer, e.status, {'ok': False, 'message': str(e)}, keep_alive=False)
+            return False
+
+        status, payload, retry_after = await self._dispatch(method, path.split('?')[0], body, client_id)
+        keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+        self._write_response(writer, status, payload, keep_alive, retry_after)
+        # Wait for slow readers here, so responses do not pile up in memory
+        await writer.drain()
+        return keep_alive
+
+    async def _read_message(self, reader):
+        # Reads the headers and body that follow a request line
+        headers = {}
+        header_lines = header_bytes = 0
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            header_lines += 1
+            header_bytes += len(line)
+            if header_lines > MAX_HEADERS or header_bytes > MAX_HEADER_BYTES:
+                raise RequestRejected(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many request headers.")
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        length = headers.get('content-length') or '0'
+        if not length.isdigit():
+            raise RequestRejected(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        length = int(length)
+        if length > MAX_BODY_BYTES:
+            raise RequestRejected(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+        body = await reader.readexactly(length) if length else b''
+        return headers, body
+
+    async def _dispatch(self, method, path, body, client_id):
+        handler = self.routes.get((method, path))
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, {'ok': False, 'message': f"No route for {method} {path}."}, None
+        try:
+            fields = json.loads(body or b'{}')
+            if not isinstance(fields, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {'ok': False, 'message': f"Invalid JSON body: {e}"}, None
+
+        try:
+            status, payload = await handler(fields, client_id)
+            return status, payload, None
+        except RateLimitExceeded as e:
+            return HTTPStatus.TOO_MANY_REQUESTS, {'ok': False, 'message': str(e)}, math.ceil(e.retry_after)
+        except ServiceBusy as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {'ok': False, 'message': str(e)}, 1
+        except Exception as e:
+            print(f"Failed to handle {method} {path}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'ok': False, 'message': "Internal error."}, None
+
+    async def _create_account(self, fields, client_id):
+        success, message = await self.service.create_account(
+            _text(fields, 'login_name'), _text(fields, 'password'), _text(fields, 'first_name'),
+            _text(fields, 'security_question'), _text(fields, 'security_answer')
+        )
+        return HTTPStatus.CREATED if success else HTTPStatus.BAD_REQUEST, {'ok': success, 'message': message}
+
+    async def _login(self, fields, client_id):
+        success, message = await self.service.login(_text(fields, 'login_name'), _text(fields, 'password'), client_id)
+        return HTTPStatus.OK if success else HTTPStatus.UNAUTHORIZED, {'ok': success, 'message': message}
+
+    async def _security_question(self, fields, client_id):
+        question, error = await self.service.get_security_question(_text(fields, 'login_name'))
+        if question is None:
+            return HTTPStatus.NOT_FOUND, {'ok': False, 'message': error}
+        return HTTPStatus.OK, {'ok': True, 'message': "", 'security_question': question}
+
+    async def _reset_password(self, fields, client_id):
+        success, message = await self.service.reset_password(
+            _text(fields, 'login_name'), _text(fields, 'security_answer'), _text(fields, 'new_password'), client_id
+        )
+        return HTTPStatus.OK if success else HTTPStatus.BAD_REQUEST, {'ok': success, 'message': message}
+
+    async def _stats(self, fields, client_id):
+        return HTTPStatus.OK, {'ok': True, 'message': "", 'connections': self.connections, **self.service.stats()}
+
+    @staticmethod
+    def _write_response(writer, status, payload, keep_alive, retry_after=None):
+        body = json.dumps(payload).encode('utf-8')
+        lines = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        if retry_after is not None:
+            lines.append(f"Retry-After: {max(1, retry_after)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+
+    @staticmethod
+    async def _close(writer):
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+def _text(fields, name):
+    # Missing or null fields become empty strings, which the service rejects as missing
+    value = fields.get(name)
+    return "" if value is None else str(value)
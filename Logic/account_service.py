@@ -0,0 +1,202 @@
+import asyncio
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from Models.async_account import AsyncAccount
+from Models.password_policy import get_password_policy, set_password_policy
+
+class ServiceBusy(Exception):
+    """
+    Raised when a request is turned away because the service already has as many requests
+    running and queued as it accepts.
+    """
+
+class AccountService:
+    """
+    Serves login, create-account and password-reset requests for many concurrent clients
+    from one asyncio event loop.
+
+    At most max_in_flight requests run at once, and up to max_queue more wait for a slot;
+    beyond that, requests are rejected straight away with ServiceBusy, so a burst of
+    traffic gets a quick "try again" instead of piling up until every request times out.
+    Password hashes are computed in a bounded pool of hash_workers, and the Redis client's
+    pool bounds the connections, so neither grows with the number of clients.
+    """
+
+    def __init__(self, redis_client, password_policy=None, rate_limiter=None, max_in_flight=64, max_queue=256,
+                 hash_workers=None, use_processes=False):
+        """
+        Initializes the service.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Asyncio client, from open_async_storage().
+            password_policy (PasswordPolicy, optional): How passwords are hashed. Defaults to
+                the application's policy.
+            rate_limiter (AsyncRateLimiter, optional): Throttles login and reset attempts per
+                login name and per client address. Defaults to None.
+            max_in_flight (int, optional): Requests handled at once. Defaults to 64.
+            max_queue (int, optional): Requests allowed to wait for a slot. Defaults to 256.
+            hash_workers (int, optional): Passwords hashed at once. Defaults to the number of CPUs.
+            use_processes (bool, optional): Hash in worker processes instead of threads, for
+                hashing schemes that hold the GIL. Defaults to False.
+        """
+        password_policy = password_policy or get_password_policy()
+        hash_workers = hash_workers or os.cpu_count() or 1
+        if use_processes:
+            self.executor = ProcessPoolExecutor(
+                max_workers=hash_workers, initializer=set_password_policy, initargs=(password_policy,)
+            )
+        else:
+            self.executor = ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix="password-hash")
+        self.account_manager = AsyncAccount(redis_client, password_policy, rate_limiter, self.executor)
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.waiting = 0
+        self.requests = Counter()
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    @asynccontextmanager
+    async def admit(self, operation):
+        """
+        Holds one of the service's slots while a request runs, waiting for one if needed.
+
+        Args:
+            operation (str): The request, e.g. 'login', counted in stats().
+
+        Raises:
+            ServiceBusy: If max_queue requests are already waiting.
+        """
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.requests['rejected'] += 1
+            raise ServiceBusy("The service is busy. Try again shortly.")
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        try:
+            yield
+            self.requests[operation] += 1
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def create_account(self, login_name, password, first_name, security_question, security_answer):
+        """
+        Handles the creation of a new account.
+
+        Args:
+            login_name (str): The user's login name or email.
+            password (str): The user's password.
+            first_name (str): The user's first name.
+            security_question (str): The custom security question.
+            security_answer (str): The answer to the security question.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+
+        Raises:
+            ServiceBusy: If the service is at capacity.
+        """
+        if not all([login_name, password, first_name, security_question, security_answer]):
+            return False, "All fields are required."
+
+        async with self.admit('create_account'):
+            return await self.account_manager.register(
+                login_name, password, first_name, security_question, security_answer
+            )
+
+    async def login(self, login_name, password, client_id=None):
+        """
+        Handles user login by validating credentials.
+
+        Args:
+            login_name (str): The user's login name or email.
+            password (str): The user's password.
+            client_id (str, optional): The client's address, for rate limiting.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+
+        Raises:
+            RateLimitExceeded: If there have been too many attempts for this login name or client.
+            ServiceBusy: If the service is at capacity.
+        """
+        if not login_name or not password:
+            return False, "Login name and password required."
+
+        async with self.admit('login'):
+            if await self.account_manager.login(login_name, password, client_id):
+                return True, "Login successful!"
+            return False, "Incorrect login credentials."
+
+    async def get_security_question(self, login_name):
+        """
+        Retrieves the security question for a password reset.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            tuple: (str, str) - The security question, or None with an error message.
+
+        Raises:
+            ServiceBusy: If the service is at capacity.
+        """
+        if not login_name:
+            return None, "Login name is required."
+
+        async with self.admit('security_question'):
+            return await self.account_manager.get_security_question(login_name)
+
+    async def reset_password(self, login_name, security_answer, new_password, client_id=None):
+        """
+        Resets a password after checking the answer to the security question.
+
+        Args:
+            login_name (str): The user's login name or email.
+            security_answer (str): The answer to the security question.
+            new_password (str): The new password.
+            client_id (str, optional): The client's address, for rate limiting.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+
+        Raises:
+            RateLimitExceeded: If there have been too many attempts for this login name or client.
+            ServiceBusy: If the service is at capacity.
+        """
+        if not all([login_name, security_answer, new_password]):
+            return False, "Login name, security answer and new password are required."
+
+        async with self.admit('reset_password'):
+            return await self.account_manager.reset_password(login_name, security_answer, new_password, client_id)
+
+    def stats(self):
+        """
+        Reports the service's load.
+
+        Returns:
+            dict: Requests running and waiting, their limits, requests completed per
+                operation and rejected, and the repository's operations and round trips.
+        """
+        repository = self.account_manager.repository
+        return {
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'max_in_flight': self.max_in_flight,
+            'max_queue': self.max_queue,
+            'requests': dict(self.requests),
+            'operations': dict(repository.operations),
+            'round_trips': dict(repository.round_trips)
+        }
+
+    def close(self):
+        """
+        Shuts down the password hashing pool.
+        """
+        self.executor.shutdown(wait=False, cancel_futures=True)
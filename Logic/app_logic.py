@@ -1,40 +1,142 @@
-import bcrypt
-from Models.redis_client import RedisClient
-from Models.account import Account
-from Utils.data_loader import DataLoader
-from GUI.gui_helpers import show_popup
+import threading
+from Models.rate_limiter import RateLimitExceeded
+from Utils.config import ACCOUNT_FILTER_ENABLED, ACCOUNT_LAYOUT_SETTINGS, FIELD_CACHE_SETTINGS, RATE_LIMIT_SETTINGS
 
 class AppLogic:
     """
     Main application logic handling account management and data operations.
     """
 
-    def __init__(self):
+    def __init__(self, connect=True):
         """
         Initializes the application logic by setting up the Redis client and account manager.
+
+        Args:
+            connect (bool, optional): Connect and load the initial data immediately. Pass False
+                to construct the logic without touching the network and call start() later,
+                for example from a background thread. Defaults to True.
+        """
+        self.redis_client = None
+        self.account_manager = None
+        self.account_filter = None
+        self.field_cache = None
+        self.status = "Connecting to the database..."
+        self.ready = threading.Event()
+
+        if connect:
+            success, message = self.start()
+            if not success:
+                print(message)
+
+    def start(self, progress_callback=None):
         """
+        Connects to Redis and loads the initial data. Safe to call from a background thread.
+
+        Args:
+            progress_callback (function, optional): Called with a status message at each step
+                of the startup and after each chunk of initial data is loaded.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+        """
+        def report(message):
+            self.status = message
+            if progress_callback is not None:
+                progress_callback(message)
+
+        # The storage and account modules pull in redis, so they are imported here, on the
+        # thread that connects, rather than when the GUI imports the logic layer
+        from Models.storage import open_storage
+        from Models.account import Account
+        from Models.account_filter import AccountFilter
+        from Models.field_cache import FieldCache
+        from Models.rate_limiter import RateLimiter
+
         try:
-            # Initialize Redis client with connection details and set up account manager
-            self.redis_client = RedisClient(
-                host='mycampsiteredis.redis.cache.windows.net',
-                port=6380,
-                password='F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8=',
-                ssl=True
-            ).client
-            self.account_manager = Account(self.redis_client)
+            report("Connecting to the database...")
+
+            # Open the configured storage backend and set up the account manager
+            redis_client = open_storage()
+            if redis_client is None:
+                raise ConnectionError("the database is unreachable")
+            self.redis_client = redis_client
+            rate_limiter = RateLimiter(self.redis_client) if RATE_LIMIT_SETTINGS['enabled'] else None
+            self.account_filter = AccountFilter(self.redis_client) if ACCOUNT_FILTER_ENABLED else None
+            # Compact buckets are shared by many accounts, so tracking them would evict too much
+            if FIELD_CACHE_SETTINGS['enabled'] and ACCOUNT_LAYOUT_SETTINGS['layout'] != 'compact':
+                self.field_cache = FieldCache(
+                    self.redis_client,
+                    max_entries=FIELD_CACHE_SETTINGS['max_entries'],
+                    ttl=FIELD_CACHE_SETTINGS['ttl']
+                )
+                if not self.field_cache.start():
+                    # Only a standalone Redis server can push invalidations
+                    self.field_cache = None
+            self.account_manager = Account(self.redis_client, rate_limiter=rate_limiter,
+                                           account_filter=self.account_filter,
+                                           field_cache=self.field_cache)
 
             # Load initial data if needed #NOTE CSV data is not in the root folder, if you want to test on that, take it out of the Assets folder, this is due to a startup lag from encryption the CSV data and fixing the security questions. No lag if you dont load the csv
-            self.load_initial_data()
+            report("Loading account data...")
+            self.load_initial_data(report)
+
+            # Build the filter after the initial data so it includes the loaded accounts
+            if self.account_filter is not None:
+                report("Indexing accounts...")
+                self.account_filter.start()
+
+            report("Ready")
+            self.ready.set()
+            return True, self.status
+        except Exception as e:
+            report(f"Failed to connect to Redis: {e}")
+            return False, self.status
+
+    def stop(self):
+        """
+        Stops the background work started by start(). Safe to call more than once.
+        """
+        if self.account_filter is not None:
+            self.account_filter.stop()
+        if self.field_cache is not None:
+            self.field_cache.stop()
+
+    def is_ready(self):
+        """
+        Checks whether the backend is connected and the initial data has been loaded.
 
-        except Exception as e: 
-            show_popup("Connection Error", f"Failed to connect to Redis: {e}")
+        Returns:
+            bool: True once start() has completed successfully.
+        """
+        return self.ready.is_set()
 
-    def load_initial_data(self):
+    def load_initial_data(self, progress_callback=None):
         """
         Loads initial test data into Redis from a CSV file for testing purposes. NOTE it is currently in Assets, drag into root next to gui_main.py to test.
+
+        Args:
+            progress_callback (function, optional): Called with a status message after each chunk is loaded.
         """
+        from Utils.data_loader import DataLoader
+        from Utils.load_manifest import LoadManifest
+
+        rows_done = 0
+
+        def report_chunk(chunk_report):
+            nonlocal rows_done
+            rows_done += chunk_report['rows']
+            if progress_callback is not None:
+                progress_callback(f"Loading account data... {rows_done} rows")
+
         try:
-            data_loader = DataLoader(self.redis_client)
+            # Hash the CSV passwords on every core to cut the startup lag, and use the load
+            # manifest so rows that are already stored are not hashed and written again
+            data_loader = DataLoader(
+                self.redis_client,
+                workers=None,
+                manifest=LoadManifest(self.redis_client),
+                progress_callback=report_chunk
+            )
             data_loader.load_initial_data('ICT320 - Task 2 - Initial Database.csv')
             print("Initial data loaded into Redis successfully.")
         except FileNotFoundError:
@@ -60,13 +162,8 @@ class AppLogic:
             return False, "All fields are required."
 
         try:
-            # Check if the account already exists
-            if self.redis_client.hexists(login_name, 'password'):
-                return False, "Account already exists."
-
-            # Create the new account
-            self.account_manager.create_account(login_name, password, first_name, security_question, security_answer)
-            return True, "Account created successfully."
+            # Create the new account, which fails if it already exists
+            return self.account_manager.register(login_name, password, first_name, security_question, security_answer)
 
         except Exception as e:
             return False, f"Failed to create account: {str(e)}"
@@ -85,7 +182,12 @@ class AppLogic:
         if not login_name or not password:
             return False, "Login name and password required."
 
-        if self.account_manager.login(login_name, password):
+        try:
+            logged_in = self.account_manager.login(login_name, password)
+        except RateLimitExceeded as e:
+            return False, str(e)
+
+        if logged_in:
             return True, "Login successful!"
         else:
             return False, "Incorrect login credentials."
@@ -103,13 +205,14 @@ class AppLogic:
         if not login_name:
             return None, "Login name is required."
 
-        # Grabs the security question from Redis
-        security_question = self.redis_client.hget(login_name, 'security_question')
-        security_answer = self.redis_client.hget(login_name, 'security_answer')
-
-        if not self.redis_client.exists(login_name):
+        # Grabs the security question and answer from Redis in one round trip
+        account = self.account_manager.repository.get_account(login_name)
+        if not account:
             return None, "Account does not exist."
 
+        security_question = account.get('security_question')
+        security_answer = account.get('security_answer')
+
         # Provide a default security question if none is set NOTE this is for test data
         if not security_question and security_answer:
             security_question = "What is the name of your first pet?"  # Default question
@@ -128,17 +231,22 @@ class AppLogic:
             user_answer (str): The answer provided by the user.
 
         Returns:
-            bool: True if the answer is correct, False otherwise.
+            tuple: (bool, str) - Whether the answer is correct, and a message.
         """
         login_name = login_name.strip()
         user_answer = user_answer.strip()
-        
-        stored_answer = self.redis_client.hget(login_name, 'security_answer')
+
+        # Throttle guesses at the answer. This is the one check of the reset flow, so
+        # the password update that follows does not take a second attempt.
+        try:
+            self.account_manager.check_rate_limit('reset', login_name)
+        except RateLimitExceeded as e:
+            return False, str(e)
+
+        stored_answer = self.account_manager.repository.get_field(login_name, 'security_answer')
         if stored_answer and stored_answer.strip() == user_answer:
-            return True
-        else:
-            show_popup("Error", "Incorrect security answer.")
-            return False
+            return True, "Security answer verified."
+        return False, "Incorrect security answer."
 
     def reset_password(self, login_name, new_password):
         """
@@ -152,9 +260,11 @@ class AppLogic:
             tuple: (bool, str) - Success status and message.
         """
         try:
-            # Hash the new password and update it in Redis
-            hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-            self.redis_client.hset(login_name, mapping={'password': hashed_password.decode('utf-8')})
+            # Hash the new password under the current policy and update it in Redis. The
+            # attempt was already counted against the rate limit by verify_security_answer.
+            hashed_password = self.account_manager.password_policy.hash(new_password)
+            if not self.account_manager.repository.update(login_name, {'password': hashed_password}):
+                return False, "Account does not exist."
             return True, "Password updated successfully."
         except Exception as e:
             return False, f"Failed to reset password: {e}"
@@ -1,19 +1,47 @@
-import bcrypt
 import re
+from Models.account_repository import AccountRepository
+from Models.compact_accounts import CompactAccountRepository
+from Models.password_policy import get_password_policy
+from Utils.config import ACCOUNT_LAYOUT_SETTINGS
 
 class Account:
     """
     Manages user account operations including creation, login, and password recovery.
+
+    All reads and writes go through an AccountRepository, so each step costs a single
+    Redis round trip. Passwords are hashed under a PasswordPolicy, and a hash made under
+    an older policy is upgraded when its owner next logs in. With a RateLimiter, login and
+    password-reset attempts are throttled before any password is hashed or checked. With an
+    AccountFilter, lookups for accounts that were never registered skip Redis entirely, and
+    with a FieldCache, an account read more than once is only fetched the first time.
+    In the compact layout accounts are stored through a CompactAccountRepository instead,
+    which uses no FieldCache.
     """
 
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, password_policy=None, rate_limiter=None, account_filter=None,
+                 field_cache=None, layout=None):
         """
         Initializes the Account manager with a Redis client.
         
         Args:
             redis_client (redis.Redis): Redis client for database operations.
+            password_policy (PasswordPolicy, optional): How passwords are hashed. Defaults to
+                the application's policy (see Models.password_policy).
+            rate_limiter (RateLimiter, optional): Throttles login and reset attempts. Defaults
+                to None, which does not limit them.
+            account_filter (AccountFilter, optional): Filter of registered login names used to
+                answer lookups for unknown accounts locally. Defaults to None.
+            field_cache (FieldCache, optional): Cache of account hashes kept fresh by Redis
+                client tracking. Defaults to None.
+            layout (str, optional): 'hash' or 'compact'. Defaults to the CAMPSITE_ACCOUNT_LAYOUT setting.
         """
         self.redis_client = redis_client
+        if (layout or ACCOUNT_LAYOUT_SETTINGS['layout']) == 'compact':
+            self.repository = CompactAccountRepository(redis_client, account_filter=account_filter)
+        else:
+            self.repository = AccountRepository(redis_client, account_filter=account_filter, field_cache=field_cache)
+        self.password_policy = password_policy or get_password_policy()
+        self.rate_limiter = rate_limiter
 
     def create_account(self, login_name, password, first_name, security_question=None, security_answer=None):
         """
@@ -30,31 +58,61 @@ class Account:
             print("Invalid email format. Please enter a valid email address.")
             return
 
-        if self.redis_client.exists(login_name):
-            print("Account already exists.")
-        else:
+        if not security_question or not security_answer:
+            # Check before prompting so the user is not asked questions for an existing account
+            if self.repository.exists(login_name):
+                print("Account already exists.")
+                return
+
             # Prompt for security question and answer if not provided
             if not security_question:
                 security_question = input("Enter your custom security question: ").strip()
-            
+
             # Ensure the security question ends with a question mark
             if not security_question.endswith('?'):
                 security_question += '?'
 
             if not security_answer:
                 security_answer = input(f"{security_question} ").strip()
-            
-            # Hash the password before storing it
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-            
-            # Store the account details in Redis
-            self.redis_client.hset(login_name, mapping={
-                'password': hashed_password.decode('utf-8'),
-                'first_name': first_name,
-                'security_question': security_question,
-                'security_answer': security_answer
-            })
-            print("Account created successfully.")
+
+        _, message = self.register(login_name, password, first_name, security_question, security_answer)
+        print(message)
+
+    def register(self, login_name, password, first_name, security_question, security_answer):
+        """
+        Creates a new account without prompting. The existence check and the write are one
+        atomic Redis operation, so two concurrent registrations cannot both succeed.
+
+        Args:
+            login_name (str): The user's login name or email.
+            password (str): The user's password.
+            first_name (str): The user's first name.
+            security_question (str): The custom security question.
+            security_answer (str): The answer to the security question.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+        """
+        if not self.is_valid_email(login_name):
+            return False, "Invalid email format. Please enter a valid email address."
+
+        # Ensure the security question ends with a question mark
+        if not security_question.endswith('?'):
+            security_question += '?'
+
+        # Hash the password before storing it
+        hashed_password = self.password_policy.hash(password)
+
+        # Store the account details in Redis unless the account already exists
+        created = self.repository.create(login_name, {
+            'password': hashed_password,
+            'first_name': first_name,
+            'security_question': security_question,
+            'security_answer': security_answer
+        })
+        if not created:
+            return False, "Account already exists."
+        return True, "Account created successfully."
 
     def is_valid_email(self, email):
         """
@@ -78,17 +136,21 @@ class Account:
 
         Returns:
             bool: True if login is successful, otherwise False.
+
+        Raises:
+            RateLimitExceeded: If there have been too many attempts for this login name or client.
         """
         login_name = login_name.strip()
-        
-        # Check if an account exists for the provided login name
-        if self.redis_client.exists(login_name):
-            # Retrieve the stored password hash from Redis
-            stored_password = self.redis_client.hget(login_name, 'password').encode('utf-8')
-            
+        self.check_rate_limit('login', login_name)
+
+        # Retrieve the stored password hash from Redis, which is None if the account does not exist
+        stored_password = self.repository.get_password_hash(login_name)
+        if stored_password:
             # Verify the provided password against the stored hash
-            if bcrypt.checkpw(password.encode('utf-8'), stored_password):
+            if self.password_policy.verify(password, stored_password):
                 print("Login successful!")
+                if self.password_policy.needs_rehash(stored_password):
+                    self.upgrade_password_hash(login_name, password, stored_password)
                 return True
             else:
                 print("Incorrect password.")
@@ -97,6 +159,44 @@ class Account:
             print(f"Account for '{login_name}' does not exist.")
             return False
 
+    def upgrade_password_hash(self, login_name, password, stored_password):
+        """
+        Replaces a hash made under an older policy with one made under the current policy.
+
+        Called after a successful login, when the plain-text password is known. The stored
+        hash is only replaced if it has not changed since it was verified, and a failure
+        never affects the login itself.
+
+        Args:
+            login_name (str): The user's login name.
+            password (str): The verified plain-text password.
+            stored_password (str): The hash the password was verified against.
+
+        Returns:
+            bool: True if the hash was replaced.
+        """
+        try:
+            return self.repository.replace_password_hash(
+                login_name, stored_password, self.password_policy.hash(password)
+            )
+        except Exception as e:
+            print(f"Failed to upgrade password hash: {e}")
+            return False
+
+    def check_rate_limit(self, action, login_name):
+        """
+        Takes a token from the rate limiter for an attempt, if a limiter is configured.
+
+        Args:
+            action (str): 'login' or 'reset'.
+            login_name (str): The login name the attempt is for.
+
+        Raises:
+            RateLimitExceeded: If the attempt is over the limit.
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.check(action, login_name)
+
     def forgot_password(self, login_name, user_answer, new_password, confirm_password):
         """
         Handles password recovery using a custom security question.
@@ -109,10 +209,16 @@ class Account:
 
         Returns:
             bool: True if password reset is successful, otherwise False.
+
+        Raises:
+            RateLimitExceeded: If there have been too many attempts for this login name or client.
         """
-        if self.redis_client.exists(login_name):
-            # Retrieve the security answer from Redis
-            stored_security_answer = self.redis_client.hget(login_name, 'security_answer')
+        self.check_rate_limit('reset', login_name.strip())
+
+        # Retrieve the account, which is None if it does not exist
+        account = self.repository.get_account(login_name)
+        if account:
+            stored_security_answer = account.get('security_answer')
 
             # Decode the stored answer if it is in bytes
             if isinstance(stored_security_answer, bytes):
@@ -129,8 +235,10 @@ class Account:
                     return False
 
                 # Hash the new password and update it in Redis
-                hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt())
-                self.redis_client.hset(login_name, mapping={'password': hashed_password.decode('utf-8')})
+                hashed_password = self.password_policy.hash(new_password)
+                if not self.repository.update(login_name, {'password': hashed_password}):
+                    print("Account does not exist.")
+                    return False
                 print("Password updated successfully.")
                 return True
             else:
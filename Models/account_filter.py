@@ -0,0 +1,326 @@
+import threading
+import types
+import uuid
+from collections import Counter
+from Models.account_keys import ACCOUNT_KEY_PREFIX, LEGACY_FALLBACK, is_legacy_account_key, login_name_from_key
+from Models.cluster_pipeline import batch_pipeline
+from Models.compact_accounts import COMPACT_KEY_PREFIX, compact_account_count
+from Models.cuckoo_filter import CuckooFilter
+from Models.redis_client import dbsize, scan_batches
+from Utils.config import ACCOUNT_LAYOUT_SETTINGS
+from Utils.metrics import ACCOUNT_FILTER
+
+# Channel on which app instances announce account changes to each other's filters.
+# Messages are 'created <origin> <login>', 'deleted <origin> <login>' or 'rebuild <origin>'.
+ACCOUNT_EVENTS_CHANNEL = "account:events"
+
+def account_event(event, login_name=None, origin="-"):
+    """
+    Formats an announcement for ACCOUNT_EVENTS_CHANNEL.
+
+    Writers that keep no filter of their own, such as the asyncio repository, announce
+    with origin '-' so that every running filter applies the change.
+
+    Args:
+        event (str): 'created', 'deleted' or 'rebuild'.
+        login_name (str, optional): The account changed. Not used for 'rebuild'.
+        origin (str, optional): The announcing filter's origin, which ignores its own
+            announcements. Defaults to '-'.
+
+    Returns:
+        str: The message to publish.
+    """
+    return f"{event} {origin}" if login_name is None else f"{event} {origin} {login_name}"
+
+def publish_account_rebuild(redis_client):
+    """
+    Asks every running app instance to rebuild its account filter, e.g. after accounts were
+    deleted or written in bulk outside the app.
+
+    Args:
+        redis_client (redis.Redis): Redis client. Storage backends without publish/subscribe
+            are skipped, as only the local process uses them.
+    """
+    if hasattr(redis_client, 'publish'):
+        try:
+            redis_client.publish(ACCOUNT_EVENTS_CHANNEL, account_event('rebuild'))
+        except Exception as e:
+            print(f"Failed to announce the account filter rebuild: {e}")
+
+class AccountFilter:
+    """
+    An in-process mirror of the registered login names, so lookups for accounts that do not
+    exist are answered without a Redis round trip.
+
+    The names are held in a cuckoo filter, built with one SCAN when the app starts. Accounts
+    created or deleted by this process update it directly; other app instances announce
+    their changes over Redis publish/subscribe. If the subscription drops, the filter
+    answers "maybe" for every name (so every lookup goes to Redis) until it has
+    resubscribed and rebuilt, so a stale filter can never hide an account.
+    """
+
+    def __init__(self, redis_client, legacy_fallback=LEGACY_FALLBACK, retry_interval=5):
+        """
+        Initializes an empty filter. Call start() to build it.
+
+        Args:
+            redis_client (redis.Redis): Redis client, or a storage backend.
+            legacy_fallback (bool, optional): Also index accounts under legacy bare keys.
+                Defaults to the CAMPSITE_LEGACY_ACCOUNT_KEYS setting.
+            retry_interval (float, optional): Seconds before resubscribing after the
+                subscription fails. Defaults to 5.
+        """
+        self.redis_client = redis_client
+        self.legacy_fallback = legacy_fallback
+        self.retry_interval = retry_interval
+        self.origin = uuid.uuid4().hex
+        self.lookups = Counter()
+        self.ready = False
+        self._filter = None
+        self._pending = None
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()
+        self._pubsub = None
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        """
+        Subscribes to account changes, then builds the filter from the stored accounts.
+
+        Subscribing first means no change made during the scan can be missed.
+        """
+        self._stopped = False
+        if hasattr(self.redis_client, 'pubsub'):
+            try:
+                self._pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+                # The client reconnects and resubscribes by itself, but anything published
+                # while it was disconnected is lost, so rebuild after each reconnect
+                resubscribe = self._pubsub.on_connect
+
+                def on_connect(pubsub, connection):
+                    resubscribe(connection)
+                    self._on_reconnect(pubsub)
+
+                # The connection only keeps a weak reference to its callback, so it must be bound to the pubsub
+                self._pubsub.on_connect = types.MethodType(on_connect, self._pubsub)
+                self._pubsub.subscribe(**{ACCOUNT_EVENTS_CHANNEL: self._on_message})
+                self._thread = self._pubsub.run_in_thread(
+                    sleep_time=1, daemon=True, exception_handler=self._on_subscription_error
+                )
+            except Exception as e:
+                print(f"Could not subscribe to account changes, the account filter is disabled: {e}")
+                self._schedule_restart()
+                return
+        self.rebuild()
+
+    def stop(self):
+        """
+        Stops listening for changes and stops answering from the filter.
+        """
+        self._stopped = True
+        with self._lock:
+            self.ready = False
+        # The listener thread closes its subscription once it notices it was stopped
+        if self._thread is not None:
+            self._thread.stop()
+        self._pubsub = self._thread = None
+
+    def rebuild(self):
+        """
+        Builds a new filter by scanning every account key, and swaps it in. Compact buckets
+        are read with a pipelined HKEYS per scan batch.
+
+        Accounts created during the scan are replayed onto the new filter before it is used.
+
+        Returns:
+            bool: True if the new filter is in use.
+        """
+        with self._rebuild_lock:
+            return self._rebuild()
+
+    def _rebuild(self):
+        with self._lock:
+            self._pending = []
+        try:
+            # A compact bucket is one key but holds many accounts, so those are counted apart
+            capacity = dbsize(self.redis_client)
+            if ACCOUNT_LAYOUT_SETTINGS['layout'] == 'compact':
+                capacity += compact_account_count(self.redis_client)
+            accounts = CuckooFilter(max(1024, 2 * capacity))
+            for keys in scan_batches(self.redis_client, type='hash'):
+                login_names = [self._login_name(key) for key in keys]
+                buckets = [key for key in keys if key.startswith(COMPACT_KEY_PREFIX)]
+                if buckets:
+                    pipeline = batch_pipeline(self.redis_client, transaction=False)
+                    for key in buckets:
+                        pipeline.hkeys(key)
+                    for bucket_login_names in pipeline.execute():
+                        login_names.extend(bucket_login_names)
+                for login_name in login_names:
+                    if login_name is not None and not accounts.add(login_name):
+                        raise OverflowError("the account filter is full")
+        except Exception as e:
+            print(f"Failed to build the account filter: {e}")
+            with self._lock:
+                self._pending = None
+                self.ready = False
+            return False
+
+        with self._lock:
+            # Only creations are replayed: the scan may not have seen an account deleted
+            # during it, and removing a name that was never added could remove another
+            # name's fingerprint. A deleted name left in the filter is a false positive.
+            replayed = all(
+                accounts.add(login_name) for event, login_name in self._pending if event == 'created'
+            )
+            self._pending = None
+            if not replayed:
+                print("Failed to build the account filter: the account filter is full")
+                self.ready = False
+                return False
+            self._filter = accounts
+            self.ready = not self._stopped
+        return True
+
+    def might_exist(self, login_name):
+        """
+        Checks whether an account may exist, without a round trip.
+
+        Args:
+            login_name (str): The login name.
+
+        Returns:
+            bool: False only if the account definitely does not exist.
+        """
+        with self._lock:
+            if not self.ready:
+                self._count('bypassed')
+                return True
+            if login_name in self._filter:
+                self._count('maybe')
+                return True
+            self._count('absent')
+            return False
+
+    def record_false_positive(self, login_name):
+        """
+        Records that a name the filter reported as present turned out not to exist.
+
+        Args:
+            login_name (str): The login name that was looked up.
+        """
+        with self._lock:
+            self._count('false_positive')
+
+    def added(self, login_name):
+        """
+        Adds a newly created account and announces it to the other app instances.
+
+        Args:
+            login_name (str): The login name.
+        """
+        self._change('created', login_name)
+
+    def removed(self, login_name):
+        """
+        Removes a deleted account and announces it to the other app instances.
+
+        Args:
+            login_name (str): The login name.
+        """
+        self._change('deleted', login_name)
+
+    def stats(self):
+        """
+        Reports how the filter is doing.
+
+        Returns:
+            dict: Lookup counts by result ('absent' answered locally, 'maybe' sent to Redis,
+                'false_positive' sent to Redis and not found, 'bypassed' while not ready),
+                the observed false-positive rate among names that do not exist, the expected
+                rate, and the number of names held.
+        """
+        with self._lock:
+            lookups = dict(self.lookups)
+            accounts = self._filter
+        absent, false_positives = lookups.get('absent', 0), lookups.get('false_positive', 0)
+        return {
+            'ready': self.ready,
+            'lookups': lookups,
+            'false_positive_rate': false_positives / (absent + false_positives) if absent + false_positives else 0.0,
+            'expected_false_positive_rate': accounts.false_positive_rate if accounts else None,
+            'accounts': len(accounts) if accounts else 0,
+            'load_factor': len(accounts) / accounts.capacity if accounts else 0.0
+        }
+
+    def _login_name(self, key):
+        if key.startswith(ACCOUNT_KEY_PREFIX):
+            return login_name_from_key(key)
+        if self.legacy_fallback and is_legacy_account_key(key):
+            return key
+        return None
+
+    def _change(self, event, login_name):
+        with self._lock:
+            self._record(event, login_name)
+        if hasattr(self.redis_client, 'publish'):
+            try:
+                self.redis_client.publish(ACCOUNT_EVENTS_CHANNEL, account_event(event, login_name, self.origin))
+            except Exception as e:
+                print(f"Failed to announce account change: {e}")
+
+    def _record(self, event, login_name):
+        # Called with the lock held
+        if self._pending is not None:
+            self._pending.append((event, login_name))
+        if self._filter is not None and not self._apply(self._filter, event, login_name):
+            self.ready = False
+            threading.Thread(target=self.rebuild, daemon=True).start()
+
+    @staticmethod
+    def _apply(accounts, event, login_name):
+        if event == 'created':
+            return accounts.add(login_name)
+        accounts.remove(login_name)
+        return True
+
+    def _on_message(self, message):
+        event, origin, *rest = message['data'].split(" ", 2)
+        if origin == self.origin:
+            return
+        if event == 'rebuild':
+            threading.Thread(target=self.rebuild, daemon=True).start()
+        elif event in ('created', 'deleted') and rest:
+            with self._lock:
+                self._record(event, rest[0])
+
+    def _on_reconnect(self, pubsub):
+        if self._stopped or pubsub is not self._pubsub:
+            return
+        print("Reconnected to account changes, rebuilding the account filter.")
+        with self._lock:
+            self.ready = False
+        threading.Thread(target=self.rebuild, daemon=True).start()
+
+    def _on_subscription_error(self, error, pubsub, thread):
+        thread.stop()
+        if self._stopped or pubsub is not self._pubsub:
+            return
+        print(f"Lost the account change subscription, the account filter is paused: {error}")
+        with self._lock:
+            self.ready = False
+        self._pubsub = self._thread = None
+        self._schedule_restart()
+
+    def _schedule_restart(self):
+        if self._stopped:
+            return
+        timer = threading.Timer(self.retry_interval, self.start)
+        timer.daemon = True
+        timer.start()
+
+    def _count(self, result):
+        # Called with the lock held
+        self.lookups[result] += 1
+        ACCOUNT_FILTER.inc(result)
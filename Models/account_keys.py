@@ -0,0 +1,66 @@
+import os
+
+# Accounts are stored under a versioned prefix so they can be scanned by pattern and kept
+# apart from other data. The login name is wrapped in a hash tag ({...}) so Redis Cluster
+# places every key of one account in the same slot. That slot is also the slot of the
+# legacy bare key, so an account can be moved between the two with a single RENAME.
+ACCOUNT_KEY_VERSION = 2
+ACCOUNT_KEY_PREFIX = f"account:v{ACCOUNT_KEY_VERSION}:"
+ACCOUNT_KEY_PATTERN = f"{ACCOUNT_KEY_PREFIX}*"
+
+# Hash holding the progress of the migration from bare login name keys
+MIGRATION_PROGRESS_KEY = f"migration:{ACCOUNT_KEY_PREFIX}progress"
+
+# Reads fall back to the legacy bare key until every account has been migrated.
+# Set CAMPSITE_LEGACY_ACCOUNT_KEYS=0 once the migration tool reports it is complete.
+LEGACY_FALLBACK = os.environ.get("CAMPSITE_LEGACY_ACCOUNT_KEYS", "1").lower() not in ("0", "false", "no")
+
+def account_key(login_name):
+    """
+    Builds the Redis key of an account.
+
+    Args:
+        login_name (str): The user's login name or email.
+
+    Returns:
+        str: The namespaced key, e.g. 'account:v2:{user@example.com}'.
+    """
+    return f"{ACCOUNT_KEY_PREFIX}{{{login_name}}}"
+
+def legacy_account_key(login_name):
+    """
+    Builds the key an account was stored under before keys were namespaced.
+
+    Args:
+        login_name (str): The user's login name or email.
+
+    Returns:
+        str: The bare login name.
+    """
+    return login_name
+
+def login_name_from_key(key):
+    """
+    Extracts the login name from a namespaced account key.
+
+    Args:
+        key (str): An account key built by account_key().
+
+    Returns:
+        str: The login name, or None if the key is not a namespaced account key.
+    """
+    if key.startswith(ACCOUNT_KEY_PREFIX + "{") and key.endswith("}"):
+        return key[len(ACCOUNT_KEY_PREFIX) + 1:-1]
+    return None
+
+def is_legacy_account_key(key):
+    """
+    Tells whether a key could be a legacy account key, i.e. is not in any known namespace.
+
+    Args:
+        key (str): A Redis key.
+
+    Returns:
+        bool: True for bare keys such as 'user@example.com'.
+    """
+    return ":" not in key
@@ -0,0 +1,380 @@
+from collections import Counter
+from Models.account_keys import LEGACY_FALLBACK, account_key, legacy_account_key
+from Models.storage_backend import script_fallback
+
+# Creates the account hash only if the account does not exist yet, under either its
+# namespaced or its legacy key, so the existence check and the write happen atomically
+# in a single round trip.
+# KEYS[1] = account key, KEYS[2] = legacy account key (optional),
+# ARGV = field1, value1, field2, value2, ...
+CREATE_ACCOUNT_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        return 0
+    end
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+# Updates fields of an existing account. An account still stored under its legacy key is
+# moved to the namespaced key first, so a partial write never shadows the legacy hash.
+# KEYS[1] = account key, KEYS[2] = legacy account key (optional),
+# ARGV = field1, value1, field2, value2, ...
+UPDATE_ACCOUNT_SCRIPT = """
+if #KEYS > 1 and redis.call('EXISTS', KEYS[1]) == 0 and redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('RENAME', KEYS[2], KEYS[1])
+end
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+# Replaces the password hash only if it is still the one the caller verified, so upgrading
+# a hash after login can never undo a password reset that happened in between. The first
+# existing key is the one reads use.
+# KEYS[1] = account key, KEYS[2] = legacy account key (optional),
+# ARGV[1] = expected hash, ARGV[2] = new hash
+REPLACE_PASSWORD_HASH_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        if redis.call('HGET', key, 'password') ~= ARGV[1] then
+            return 0
+        end
+        redis.call('HSET', key, 'password', ARGV[2])
+        return 1
+    end
+end
+return 0
+"""
+
+# Deletes an account under both its namespaced and its legacy key.
+# KEYS[1] = account key, KEYS[2] = legacy account key (optional)
+DELETE_ACCOUNT_SCRIPT = """
+return redis.call('DEL', unpack(KEYS))
+"""
+
+@script_fallback(CREATE_ACCOUNT_SCRIPT)
+def _create_account(storage, keys, args):
+    if storage.exists(*keys):
+        return 0
+    storage.hset(keys[0], mapping=dict(zip(args[0::2], args[1::2])))
+    return 1
+
+@script_fallback(UPDATE_ACCOUNT_SCRIPT)
+def _update_account(storage, keys, args):
+    if len(keys) > 1 and not storage.exists(keys[0]) and storage.exists(keys[1]):
+        storage.rename(keys[1], keys[0])
+    if not storage.exists(keys[0]):
+        return 0
+    storage.hset(keys[0], mapping=dict(zip(args[0::2], args[1::2])))
+    return 1
+
+@script_fallback(DELETE_ACCOUNT_SCRIPT)
+def _delete_account(storage, keys, args):
+    return storage.delete(*keys)
+
+@script_fallback(REPLACE_PASSWORD_HASH_SCRIPT)
+def _replace_password_hash(storage, keys, args):
+    for key in keys:
+        if storage.exists(key):
+            if storage.hget(key, 'password') != args[0]:
+                return 0
+            storage.hset(key, 'password', args[1])
+            return 1
+    return 0
+
+class AccountRepository:
+    """
+    Stores and reads account hashes, using exactly one Redis round trip per operation.
+
+    Accounts live under namespaced keys (see Models.account_keys). While the key migration
+    is running, reads also look at the legacy bare key in the same round trip and use it
+    when the namespaced key does not exist yet.
+
+    With an AccountFilter, lookups for login names that were never registered return
+    straight away without a round trip, and with a FieldCache, repeated reads of the same
+    account are served from memory until Redis reports that it changed.
+
+    Every operation is counted, along with the round trips it used, so callers and tests
+    can check the network cost of each logical operation.
+
+    How an account is laid out in Redis is kept to the scripts below and the _keys,
+    _reads, _decode, _exists_call and _script_args hooks, which CompactAccountRepository
+    overrides (see Models.compact_accounts).
+    """
+
+    CREATE_SCRIPT = CREATE_ACCOUNT_SCRIPT
+    UPDATE_SCRIPT = UPDATE_ACCOUNT_SCRIPT
+    DELETE_SCRIPT = DELETE_ACCOUNT_SCRIPT
+    REPLACE_PASSWORD_HASH_SCRIPT = REPLACE_PASSWORD_HASH_SCRIPT
+
+    def __init__(self, redis_client, legacy_fallback=LEGACY_FALLBACK, account_filter=None, field_cache=None):
+        """
+        Initializes the repository with a Redis client.
+
+        Args:
+            redis_client (redis.Redis): Redis client for database operations.
+            legacy_fallback (bool, optional): Whether to fall back to legacy bare keys.
+                Defaults to the CAMPSITE_LEGACY_ACCOUNT_KEYS setting.
+            account_filter (AccountFilter, optional): Filter of registered login names,
+                kept up to date by create() and delete(). Defaults to None.
+            field_cache (FieldCache, optional): Cache of account hashes, invalidated by Redis
+                and by this repository's own writes. Defaults to None.
+        """
+        self.redis_client = redis_client
+        self.legacy_fallback = legacy_fallback
+        self.account_filter = account_filter
+        self.field_cache = field_cache
+        self.operations = Counter()
+        self.round_trips = Counter()
+        self._create_script = None
+        self._update_script = None
+        self._delete_script = None
+        self._replace_password_hash_script = None
+
+    def get_password_hash(self, login_name):
+        """
+        Fetches the stored password hash of an account.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            str: The password hash, or None if the account does not exist.
+        """
+        return self._read('get_password_hash', 'hget', login_name, 'password')
+
+    def get_account(self, login_name):
+        """
+        Fetches all fields of an account. An empty result doubles as the existence check.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            dict: The account fields, or None if the account does not exist.
+        """
+        return self._read('get_account', 'hgetall', login_name) or None
+
+    def get_field(self, login_name, field):
+        """
+        Fetches a single field of an account.
+
+        Args:
+            login_name (str): The user's login name or email.
+            field (str): The field to read.
+
+        Returns:
+            str: The field value, or None if the account or field does not exist.
+        """
+        return self._read('get_field', 'hget', login_name, field)
+
+    def exists(self, login_name):
+        """
+        Checks whether an account exists.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            bool: True if the account exists.
+        """
+        if not self._might_exist(login_name):
+            self._count('exists', round_trips=0)
+            return False
+        if self._cached(login_name):
+            self._count('exists', round_trips=0)
+            return True
+        self._count('exists')
+        command, args = self._exists_call(login_name)
+        found = bool(getattr(self.redis_client, command)(*args))
+        if not found:
+            self._record_false_positive(login_name)
+        return found
+
+    def create(self, login_name, fields):
+        """
+        Creates an account unless one already exists, atomically and in one round trip.
+
+        Args:
+            login_name (str): The user's login name or email.
+            fields (dict): The account fields to store.
+
+        Returns:
+            bool: True if the account was created, False if it already existed.
+        """
+        self._count('create')
+        if self._create_script is None:
+            self._create_script = self.redis_client.register_script(self.CREATE_SCRIPT)
+        created = self._create_script(
+            keys=self._keys(login_name), args=self._script_args(login_name, self._flatten(fields))
+        ) == 1
+        self._invalidate(login_name)
+        if created and self.account_filter is not None:
+            self.account_filter.added(login_name)
+        return created
+
+    def update(self, login_name, fields):
+        """
+        Updates fields of an existing account, atomically and in one round trip.
+
+        Args:
+            login_name (str): The user's login name or email.
+            fields (dict): The fields to set.
+
+        Returns:
+            bool: True if the account was updated, False if it does not exist.
+        """
+        self._count('update')
+        if self._update_script is None:
+            self._update_script = self.redis_client.register_script(self.UPDATE_SCRIPT)
+        updated = self._update_script(
+            keys=self._keys(login_name), args=self._script_args(login_name, self._flatten(fields))
+        ) == 1
+        self._invalidate(login_name)
+        return updated
+
+    def delete(self, login_name):
+        """
+        Deletes an account, under both its namespaced and its legacy key, in one round trip.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            bool: True if the account was deleted, False if it did not exist.
+        """
+        self._count('delete')
+        if self._delete_script is None:
+            self._delete_script = self.redis_client.register_script(self.DELETE_SCRIPT)
+        deleted = self._delete_script(keys=self._keys(login_name), args=self._script_args(login_name, [])) > 0
+        self._invalidate(login_name)
+        if deleted and self.account_filter is not None:
+            self.account_filter.removed(login_name)
+        return deleted
+
+    def replace_password_hash(self, login_name, expected_hash, new_hash):
+        """
+        Swaps the stored password hash for a new one, only if it has not changed since it was read.
+
+        Args:
+            login_name (str): The user's login name or email.
+            expected_hash (str): The hash the caller read and verified.
+            new_hash (str): The replacement hash.
+
+        Returns:
+            bool: True if the hash was replaced, False if the account is gone or its hash changed.
+        """
+        self._count('replace_password_hash')
+        if self._replace_password_hash_script is None:
+            self._replace_password_hash_script = self.redis_client.register_script(self.REPLACE_PASSWORD_HASH_SCRIPT)
+        replaced = self._replace_password_hash_script(
+            keys=self._keys(login_name), args=self._script_args(login_name, [expected_hash, new_hash])
+        ) == 1
+        self._invalidate(login_name)
+        return replaced
+
+    def reset_stats(self):
+        """
+        Clears the operation and round-trip counters.
+        """
+        self.operations.clear()
+        self.round_trips.clear()
+
+    def _keys(self, login_name):
+        keys = [account_key(login_name)]
+        if self.legacy_fallback:
+            keys.append(legacy_account_key(login_name))
+        return keys
+
+    def _reads(self, command, login_name, args):
+        # The reads answering a hget or hgetall of the account, preferred one first
+        return [(command, key, args) for key in self._keys(login_name)]
+
+    def _decode(self, command, result, args):
+        # Turns one read's reply into what the hget or hgetall of the account would return
+        return result
+
+    def _exists_call(self, login_name):
+        # The command and arguments counting whether the account exists
+        return 'exists', self._keys(login_name)
+
+    def _script_args(self, login_name, args):
+        # The ARGV of a script call, for scripts that need to know more than the keys
+        return args
+
+    def _might_exist(self, login_name):
+        return self.account_filter is None or self.account_filter.might_exist(login_name)
+
+    def _record_false_positive(self, login_name):
+        if self.account_filter is not None:
+            self.account_filter.record_false_positive(login_name)
+
+    def _cached(self, login_name):
+        # Legacy keys are not tracked, so only the namespaced key is ever cached
+        if self.field_cache is None:
+            return None
+        return self.field_cache.get(account_key(login_name))
+
+    def _invalidate(self, login_name):
+        # Drop our own write now rather than when Redis pushes the invalidation
+        if self.field_cache is not None:
+            self.field_cache.invalidate(account_key(login_name))
+
+    @staticmethod
+    def _select(command, fields, args):
+        return fields.get(args[0]) if command == 'hget' else fields
+
+    def _read(self, operation, command, login_name, *args):
+        if not self._might_exist(login_name):
+            self._count(operation, round_trips=0)
+            return None
+
+        cached = self._cached(login_name)
+        if cached:
+            self._count(operation, round_trips=0)
+            return self._select(command, cached, args)
+
+        self._count(operation)
+        keys = self._keys(login_name)
+        reads = self._reads(command, login_name, args)
+        if self.field_cache is not None:
+            # Read the whole hash so that later reads of any of its fields hit the cache
+            token = self.field_cache.begin()
+            reads[0] = ('hgetall', keys[0], ())
+
+        if len(reads) == 1:
+            read_command, key, read_args = reads[0]
+            results = [getattr(self.redis_client, read_command)(key, *read_args)]
+        else:
+            # Read both keys in one round trip and prefer the namespaced one
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for read_command, key, read_args in reads:
+                getattr(pipeline, read_command)(key, *read_args)
+            results = pipeline.execute()
+
+        if self.field_cache is not None:
+            self.field_cache.store(keys[0], results[0], token)
+            results[0] = self._select(command, results[0], args)
+        else:
+            results = [self._decode(command, result, args) for result in results]
+        result = next((result for result in results if result), None)
+
+        # A missing field does not mean the account is missing, so only whole-account reads count
+        if not result and operation != 'get_field':
+            self._record_false_positive(login_name)
+        return result
+
+    @staticmethod
+    def _flatten(fields):
+        args = []
+        for field, value in fields.items():
+            args.extend([field, value])
+        return args
+
+    def _count(self, operation, round_trips=1):
+        self.operations[operation] += 1
+        self.round_trips[operation] += round_trips
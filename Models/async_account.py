@@ -0,0 +1,375 @@
+import asyncio
+import re
+from Models.account_filter import ACCOUNT_EVENTS_CHANNEL, account_event
+from Models.account_keys import LEGACY_FALLBACK
+from Models.account_repository import AccountRepository
+from Models.compact_accounts import CompactAccountRepository
+from Models.password_policy import get_password_policy
+from Utils.config import ACCOUNT_LAYOUT_SETTINGS
+
+class AsyncAccountRepository(AccountRepository):
+    """
+    The asyncio counterpart of AccountRepository, for a redis.asyncio client or an
+    AsyncStorageAdapter. It stores accounts under the same keys with the same scripts, in
+    one round trip per operation, and counts operations and round trips the same way.
+
+    The AccountFilter and FieldCache are tied to the synchronous client and its threads,
+    so this repository always asks the server. It still announces the accounts it creates
+    and deletes, so the filters of running app instances never hide them.
+    """
+
+    def __init__(self, redis_client, legacy_fallback=LEGACY_FALLBACK):
+        """
+        Initializes the repository with an asyncio client.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Client for database operations.
+            legacy_fallback (bool, optional): Whether to fall back to legacy bare keys.
+                Defaults to the CAMPSITE_LEGACY_ACCOUNT_KEYS setting.
+        """
+        super().__init__(redis_client, legacy_fallback)
+
+    async def get_password_hash(self, login_name):
+        """
+        Fetches the stored password hash of an account.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            str: The password hash, or None if the account does not exist.
+        """
+        return await self._read('get_password_hash', 'hget', login_name, 'password')
+
+    async def get_account(self, login_name):
+        """
+        Fetches all fields of an account.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            dict: The account fields, or None if the account does not exist.
+        """
+        return await self._read('get_account', 'hgetall', login_name) or None
+
+    async def get_field(self, login_name, field):
+        """
+        Fetches a single field of an account.
+
+        Args:
+            login_name (str): The user's login name or email.
+            field (str): The field to read.
+
+        Returns:
+            str: The field value, or None if the account or field does not exist.
+        """
+        return await self._read('get_field', 'hget', login_name, field)
+
+    async def exists(self, login_name):
+        """
+        Checks whether an account exists.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            bool: True if the account exists.
+        """
+        self._count('exists')
+        command, args = self._exists_call(login_name)
+        return bool(await getattr(self.redis_client, command)(*args))
+
+    async def create(self, login_name, fields):
+        """
+        Creates an account unless one already exists, atomically and in one round trip.
+
+        Args:
+            login_name (str): The user's login name or email.
+            fields (dict): The account fields to store.
+
+        Returns:
+            bool: True if the account was created, False if it already existed.
+        """
+        self._count('create')
+        if self._create_script is None:
+            self._create_script = self.redis_client.register_script(self.CREATE_SCRIPT)
+        created = await self._create_script(
+            keys=self._keys(login_name), args=self._script_args(login_name, self._flatten(fields))
+        ) == 1
+        if created:
+            await self._announce('created', login_name)
+        return created
+
+    async def update(self, login_name, fields):
+        """
+        Updates fields of an existing account, atomically and in one round trip.
+
+        Args:
+            login_name (str): The user's login name or email.
+            fields (dict): The fields to set.
+
+        Returns:
+            bool: True if the account was updated, False if it does not exist.
+        """
+        self._count('update')
+        if self._update_script is None:
+            self._update_script = self.redis_client.register_script(self.UPDATE_SCRIPT)
+        return await self._update_script(
+            keys=self._keys(login_name), args=self._script_args(login_name, self._flatten(fields))
+        ) == 1
+
+    async def delete(self, login_name):
+        """
+        Deletes an account, under both its namespaced and its legacy key, in one round trip.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            bool: True if the account was deleted, False if it did not exist.
+        """
+        self._count('delete')
+        if self._delete_script is None:
+            self._delete_script = self.redis_client.register_script(self.DELETE_SCRIPT)
+        deleted = await self._delete_script(keys=self._keys(login_name), args=self._script_args(login_name, [])) > 0
+        if deleted:
+            await self._announce('deleted', login_name)
+        return deleted
+
+    async def replace_password_hash(self, login_name, expected_hash, new_hash):
+        """
+        Swaps the stored password hash for a new one, only if it has not changed since it was read.
+
+        Args:
+            login_name (str): The user's login name or email.
+            expected_hash (str): The hash the caller read and verified.
+            new_hash (str): The replacement hash.
+
+        Returns:
+            bool: True if the hash was replaced, False if the account is gone or its hash changed.
+        """
+        self._count('replace_password_hash')
+        if self._replace_password_hash_script is None:
+            self._replace_password_hash_script = self.redis_client.register_script(self.REPLACE_PASSWORD_HASH_SCRIPT)
+        return await self._replace_password_hash_script(
+            keys=self._keys(login_name), args=self._script_args(login_name, [expected_hash, new_hash])
+        ) == 1
+
+    async def _announce(self, event, login_name):
+        # The same announcement AccountFilter.added/removed make; storage backends without
+        # publish/subscribe serve only the local process, which has no filter to tell
+        if not hasattr(self.redis_client, 'publish'):
+            return
+        try:
+            await self.redis_client.publish(ACCOUNT_EVENTS_CHANNEL, account_event(event, login_name))
+        except Exception as e:
+            print(f"Failed to announce account change: {e}")
+
+    async def _read(self, operation, command, login_name, *args):
+        self._count(operation)
+        reads = self._reads(command, login_name, args)
+        if len(reads) == 1:
+            read_command, key, read_args = reads[0]
+            results = [await getattr(self.redis_client, read_command)(key, *read_args)]
+        else:
+            # Read both keys in one round trip and prefer the namespaced one
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for read_command, key, read_args in reads:
+                getattr(pipeline, read_command)(key, *read_args)
+            results = await pipeline.execute()
+        results = [self._decode(command, result, args) for result in results]
+        return next((result for result in results if result), None)
+
+class AsyncCompactAccountRepository(AsyncAccountRepository, CompactAccountRepository):
+    """
+    The asyncio counterpart of CompactAccountRepository: AsyncAccountRepository's
+    operations over the compact layout's keys, reads and scripts.
+    """
+
+    def __init__(self, redis_client, buckets=None):
+        """
+        Initializes the repository with an asyncio client.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Client for database operations.
+            buckets (int, optional): Number of buckets. Defaults to the CAMPSITE_COMPACT_BUCKETS setting.
+        """
+        CompactAccountRepository.__init__(self, redis_client, buckets=buckets)
+
+class AsyncAccount:
+    """
+    The asyncio counterpart of Account, for serving many clients from one event loop.
+
+    Redis calls are awaited, and password hashing and checking, which take milliseconds of
+    CPU each, run in an executor so they never block the loop. Results are returned as
+    (bool, str) pairs, like AppLogic's, instead of being printed.
+    """
+
+    def __init__(self, redis_client, password_policy=None, rate_limiter=None, executor=None, layout=None):
+        """
+        Initializes the account manager.
+
+        Args:
+            redis_client (redis.asyncio.Redis): Asyncio client for database operations.
+            password_policy (PasswordPolicy, optional): How passwords are hashed. Defaults to
+                the application's policy.
+            rate_limiter (AsyncRateLimiter, optional): Throttles login and reset attempts.
+                Defaults to None, which does not limit them.
+            executor (concurrent.futures.Executor, optional): Where passwords are hashed.
+                Defaults to the event loop's default thread pool.
+            layout (str, optional): 'hash' or 'compact'. Defaults to the CAMPSITE_ACCOUNT_LAYOUT setting.
+        """
+        self.redis_client = redis_client
+        if (layout or ACCOUNT_LAYOUT_SETTINGS['layout']) == 'compact':
+            self.repository = AsyncCompactAccountRepository(redis_client)
+        else:
+            self.repository = AsyncAccountRepository(redis_client)
+        self.password_policy = password_policy or get_password_policy()
+        self.rate_limiter = rate_limiter
+        self.executor = executor
+
+    async def register(self, login_name, password, first_name, security_question, security_answer):
+        """
+        Creates a new account. The existence check and the write are one atomic operation.
+
+        Args:
+            login_name (str): The user's login name or email.
+            password (str): The user's password.
+            first_name (str): The user's first name.
+            security_question (str): The custom security question.
+            security_answer (str): The answer to the security question.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+        """
+        if not self.is_valid_email(login_name):
+            return False, "Invalid email format. Please enter a valid email address."
+
+        # Ensure the security question ends with a question mark
+        if not security_question.endswith('?'):
+            security_question += '?'
+
+        created = await self.repository.create(login_name, {
+            'password': await self._run(self.password_policy.hash, password),
+            'first_name': first_name,
+            'security_question': security_question,
+            'security_answer': security_answer
+        })
+        if not created:
+            return False, "Account already exists."
+        return True, "Account created successfully."
+
+    def is_valid_email(self, email):
+        """
+        Validates the email format.
+
+        Args:
+            email (str): The email address to validate.
+
+        Returns:
+            bool: True if email is valid, False otherwise.
+        """
+        return bool(re.match(r"[^@]+@[^@]+\.[^@]+", email))
+
+    async def login(self, login_name, password, client_id=None):
+        """
+        Verifies a login, upgrading the stored hash if it was made under an older policy.
+
+        Args:
+            login_name (str): The user's login name or email.
+            password (str): The password provided by the user.
+            client_id (str, optional): The client making the attempt, for rate limiting.
+
+        Returns:
+            bool: True if login is successful, otherwise False.
+
+        Raises:
+            RateLimitExceeded: If there have been too many attempts for this login name or client.
+        """
+        login_name = login_name.strip()
+        await self.check_rate_limit('login', login_name, client_id)
+
+        stored_password = await self.repository.get_password_hash(login_name)
+        if not stored_password or not await self._run(self.password_policy.verify, password, stored_password):
+            return False
+
+        if self.password_policy.needs_rehash(stored_password):
+            try:
+                await self.repository.replace_password_hash(
+                    login_name, stored_password, await self._run(self.password_policy.hash, password)
+                )
+            except Exception as e:
+                print(f"Failed to upgrade password hash: {e}")
+        return True
+
+    async def get_security_question(self, login_name):
+        """
+        Retrieves the security question for a password reset.
+
+        Args:
+            login_name (str): The user's login name or email.
+
+        Returns:
+            tuple: (str, str) - The security question, or None with an error message.
+        """
+        account = await self.repository.get_account(login_name.strip())
+        if not account:
+            return None, "Account does not exist."
+
+        security_question = account.get('security_question')
+        # Provide a default security question if none is set NOTE this is for test data
+        if not security_question and account.get('security_answer'):
+            security_question = "What is the name of your first pet?"
+        if security_question:
+            return security_question, None
+        return None, "Account does not exist or security question not set up."
+
+    async def reset_password(self, login_name, security_answer, new_password, client_id=None):
+        """
+        Sets a new password if the security answer is correct.
+
+        The answer is checked in the same call as the reset, since a client of the service
+        keeps no session between requests.
+
+        Args:
+            login_name (str): The user's login name or email.
+            security_answer (str): The answer to the security question.
+            new_password (str): The new password.
+            client_id (str, optional): The client making the attempt, for rate limiting.
+
+        Returns:
+            tuple: (bool, str) - Success status and message.
+
+        Raises:
+            RateLimitExceeded: If there have been too many attempts for this login name or client.
+        """
+        login_name = login_name.strip()
+        await self.check_rate_limit('reset', login_name, client_id)
+
+        stored_answer = await self.repository.get_field(login_name, 'security_answer')
+        if not stored_answer or stored_answer.strip() != security_answer.strip():
+            return False, "Incorrect security answer."
+
+        hashed_password = await self._run(self.password_policy.hash, new_password)
+        if not await self.repository.update(login_name, {'password': hashed_password}):
+            return False, "Account does not exist."
+        return True, "Password updated successfully."
+
+    async def check_rate_limit(self, action, login_name, client_id=None):
+        """
+        Takes a token from the rate limiter for an attempt, if a limiter is configured.
+
+        Args:
+            action (str): 'login' or 'reset'.
+            login_name (str): The login name the attempt is for.
+            client_id (str, optional): The client making the attempt.
+
+        Raises:
+            RateLimitExceeded: If the attempt is over the limit.
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.check(action, login_name, client_id)
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
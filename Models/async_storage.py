@@ -0,0 +1,171 @@
+import asyncio
+import redis.asyncio
+from redis.asyncio.client import Pipeline
+from redis.asyncio.cluster import RedisCluster
+from Models.storage import open_storage
+from Utils.config import REDIS_SETTINGS, STORAGE_SETTINGS
+from Utils.metrics import REDIS_COMMANDS
+
+class InstrumentedAsyncPipeline(Pipeline):
+    """
+    The asyncio counterpart of InstrumentedPipeline: each execute() is recorded as one
+    'PIPELINE' (or 'MULTI' for a transaction) in the Redis command metrics.
+    """
+
+    async def execute(self, raise_on_error=True):
+        with REDIS_COMMANDS.time('MULTI' if self.is_transaction else 'PIPELINE'):
+            return await super().execute(raise_on_error)
+
+class InstrumentedAsyncRedis(redis.asyncio.Redis):
+    """
+    The asyncio counterpart of InstrumentedRedis, recording every command in the Redis
+    command metrics. A command's latency includes any wait for a free connection.
+    """
+
+    async def execute_command(self, *args, **options):
+        with REDIS_COMMANDS.time(str(args[0]).upper()):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedAsyncPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+class InstrumentedAsyncRedisCluster(RedisCluster):
+    """
+    The asyncio counterpart of InstrumentedRedisCluster.
+    """
+
+    async def execute_command(self, *args, **kwargs):
+        with REDIS_COMMANDS.time(str(args[0]).upper()):
+            return await super().execute_command(*args, **kwargs)
+
+class AsyncStorageAdapter:
+    """
+    Offers a synchronous storage backend (see Models.storage_backend) through the coroutine
+    interface of redis.asyncio, so the asyncio account stack also runs on SQLite and in
+    memory. Each call runs in a worker thread; the backend's own lock keeps them atomic.
+    """
+
+    def __init__(self, storage):
+        """
+        Initializes the adapter.
+
+        Args:
+            storage (StorageBackend): The backend to wrap.
+        """
+        self.storage = storage
+
+    def __getattr__(self, name):
+        attribute = getattr(self.storage, name)
+        if not callable(attribute):
+            return attribute
+
+        async def command(*args, **kwargs):
+            return await asyncio.to_thread(attribute, *args, **kwargs)
+        return command
+
+    def pipeline(self, transaction=True):
+        return AsyncPipelineAdapter(self.storage.pipeline(transaction=transaction))
+
+    def register_script(self, source):
+        script = self.storage.register_script(source)
+
+        async def run(keys=None, args=None):
+            return await asyncio.to_thread(script, keys=keys, args=args)
+        return run
+
+    async def aclose(self):
+        """
+        Closes the wrapped backend.
+        """
+        self.storage.close()
+
+class AsyncPipelineAdapter:
+    """
+    A storage backend pipeline whose execute() is a coroutine, as in redis.asyncio.
+    Commands are queued synchronously, as they are on a redis.asyncio pipeline.
+    """
+
+    def __init__(self, pipeline):
+        """
+        Args:
+            pipeline (StoragePipeline): The backend pipeline to wrap.
+        """
+        self.pipeline = pipeline
+
+    def __getattr__(self, name):
+        return getattr(self.pipeline, name)
+
+    async def execute(self):
+        return await asyncio.to_thread(self.pipeline.execute)
+
+async def open_async_storage(backend=None, path=None, max_connections=50, pool_timeout=20):
+    """
+    Opens the configured storage backend for use from asyncio code.
+
+    For 'redis' this is a redis.asyncio client on its own bounded connection pool, separate
+    from the pools of the synchronous RedisClient; the other backends are wrapped in an
+    AsyncStorageAdapter.
+
+    Args:
+        backend (str, optional): 'redis', 'sqlite' or 'memory'. Defaults to STORAGE_SETTINGS['backend'].
+        path (str, optional): SQLite database file. Defaults to STORAGE_SETTINGS['path'].
+        max_connections (int, optional): Most Redis connections open at once (per node on
+            a cluster). Commands beyond that wait for a free connection. Defaults to 50.
+        pool_timeout (float, optional): Seconds a command waits for a free connection before
+            failing. Defaults to 20.
+
+    Returns:
+        The asyncio storage client, or None if Redis is unreachable.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    backend = backend or STORAGE_SETTINGS['backend']
+    if backend != 'redis':
+        return AsyncStorageAdapter(open_storage(backend, path))
+
+    settings = REDIS_SETTINGS
+    if settings['cluster']:
+        client = InstrumentedAsyncRedisCluster(
+            host=settings['host'],
+            port=settings['port'],
+            password=settings['password'],
+            ssl=settings['ssl'],
+            max_connections=max_connections,
+            health_check_interval=30,
+            decode_responses=True
+        )
+    else:
+        pool = redis.asyncio.BlockingConnectionPool(
+            max_connections=max_connections,
+            timeout=pool_timeout,
+            connection_class=redis.asyncio.SSLConnection if settings['ssl'] else redis.asyncio.Connection,
+            host=settings['host'],
+            port=settings['port'],
+            password=settings['password'],
+            health_check_interval=30,
+            decode_responses=True
+        )
+        client = InstrumentedAsyncRedis(connection_pool=pool)
+
+    try:
+        # A cluster client discovers the nodes on its first command
+        await client.ping()
+        print("Connected to Redis successfully.")
+        return client
+    except (redis.ConnectionError, redis.exceptions.RedisClusterException) as e:
+        print(f"Failed to connect to Redis: {e}")
+        await close_async_storage(client)
+        return None
+
+async def close_async_storage(client):
+    """
+    Closes an asyncio storage client opened by open_async_storage() and its connections.
+
+    Args:
+        client: The client.
+    """
+    if isinstance(client, InstrumentedAsyncRedis):
+        await client.aclose(close_connection_pool=True)
+    else:
+        await client.aclose()
@@ -0,0 +1,138 @@
+from concurrent.futures import ThreadPoolExecutor
+import redis
+from redis.cluster import RedisCluster
+from redis.exceptions import RedisClusterException
+from Utils.metrics import REDIS_COMMANDS
+
+# Commands whose arguments are all keys; every other command is routed by its first argument
+MULTI_KEY_COMMANDS = {'delete', 'exists', 'touch', 'unlink'}
+
+class NodePipeline:
+    """
+    A pipeline for Redis Cluster that splits the buffered commands per node and sends each
+    node's share in parallel.
+
+    Commands are routed by the hash slot of their key when they are queued, so every node
+    gets one pipelined round trip per execute() and the batch takes about as long as the
+    slowest node rather than the sum of all of them. Results come back in queue order,
+    like a normal pipeline.
+
+    Redis Cluster only runs a transaction when all of its keys are in one hash slot, so with
+    transaction=True a node's commands are wrapped in MULTI/EXEC only if they share a slot,
+    and are otherwise just pipelined. Each command is still atomic on its own, and commands
+    that touch several keys must keep them in one slot, e.g. with a {hash tag}.
+    """
+
+    def __init__(self, cluster, transaction=True, max_workers=None):
+        """
+        Initializes an empty pipeline.
+
+        Args:
+            cluster (redis.cluster.RedisCluster): The cluster client.
+            transaction (bool, optional): Wrap each node's commands in MULTI/EXEC. Defaults to True.
+            max_workers (int, optional): Nodes sent to at the same time. Defaults to one per node.
+        """
+        self.cluster = cluster
+        self.transaction = transaction
+        self.max_workers = max_workers
+        self.node_pipelines = {}
+        self.queued = []
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if not callable(getattr(redis.client.Pipeline, name, None)):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            slot = self._slot(name, args)
+            node = self.cluster.nodes_manager.get_node_from_slot(slot)
+            commands = self.node_pipelines.setdefault(node.name, (node, []))[1]
+            self.queued.append((node.name, len(commands), name, args, kwargs))
+            commands.append((slot, name, args, kwargs))
+            return self
+        return queue
+
+    def __len__(self):
+        return len(self.queued)
+
+    def execute(self):
+        """
+        Sends every node's commands in parallel.
+
+        If a node answers with a redirection because slots moved during the batch, the
+        cluster's slot map is refreshed and that node's commands are replayed through the
+        cluster client, which follows redirections (without MULTI/EXEC).
+
+        Returns:
+            list: The result of each queued command, in queue order.
+        """
+        node_pipelines, self.node_pipelines = self.node_pipelines, {}
+        queued, self.queued = self.queued, []
+        if not node_pipelines:
+            return []
+
+        workers = self.max_workers or len(node_pipelines)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                name: executor.submit(self._execute_node, node, commands)
+                for name, (node, commands) in node_pipelines.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        return [results[name][index] for name, index, _, _, _ in queued]
+
+    def reset(self):
+        """
+        Discards the buffered commands.
+        """
+        self.node_pipelines = {}
+        self.queued = []
+
+    def _slot(self, name, args):
+        # Worked out locally, so queuing a command never costs a round trip
+        if name in ('eval', 'evalsha'):
+            keys = args[2:2 + int(args[1])]
+        elif name in MULTI_KEY_COMMANDS:
+            keys = args
+        else:
+            keys = args[:1]
+
+        slots = {self.cluster.keyslot(key) for key in keys}
+        if len(slots) != 1:
+            raise RedisClusterException(f"{name.upper()} must name keys in exactly one hash slot: {keys}")
+        return slots.pop()
+
+    def _execute_node(self, node, commands):
+        single_slot = len({slot for slot, _, _, _ in commands}) == 1
+        transaction = self.transaction and single_slot
+        pipeline = self.cluster.get_redis_connection(node).pipeline(transaction=transaction)
+        for _, command, args, kwargs in commands:
+            getattr(pipeline, command)(*args, **kwargs)
+        try:
+            with REDIS_COMMANDS.time('MULTI' if transaction else 'PIPELINE'):
+                return pipeline.execute()
+        except (redis.exceptions.MovedError, redis.exceptions.AskError, redis.exceptions.TryAgainError):
+            pipeline.reset()
+            self.cluster.nodes_manager.initialize()
+            replay = self.cluster.pipeline()
+            for _, command, args, kwargs in commands:
+                getattr(replay, command)(*args, **kwargs)
+            return replay.execute()
+
+def batch_pipeline(client, transaction=True, max_workers=None):
+    """
+    Creates the right pipeline for a client: a NodePipeline for Redis Cluster, otherwise a
+    normal pipeline.
+
+    Args:
+        client (redis.Redis or redis.cluster.RedisCluster): The client to batch commands for.
+        transaction (bool, optional): Wrap the commands in MULTI/EXEC (per node on a cluster).
+            Defaults to True.
+        max_workers (int, optional): Cluster nodes sent to at the same time. Defaults to one per node.
+
+    Returns:
+        The pipeline. Call execute() to send the buffered commands.
+    """
+    if isinstance(client, RedisCluster):
+        return NodePipeline(client, transaction=transaction, max_workers=max_workers)
+    return client.pipeline(transaction=transaction)
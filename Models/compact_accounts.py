@@ -0,0 +1,324 @@
+import zlib
+from Models.account_keys import account_key
+from Models.account_repository import AccountRepository
+from Models.storage_backend import script_fallback
+from Utils.config import ACCOUNT_LAYOUT_SETTINGS
+
+ACCOUNT_LAYOUTS = ('hash', 'compact')
+
+# In the compact layout accounts share bucket hashes, picked by a CRC32 of the login name.
+# Each account is one field of its bucket: the field is the login name, and the value holds
+# the account's fields in COMPACT_FIELDS order, without their names, joined by
+# RECORD_SEPARATOR. Small buckets of short values stay listpack-encoded, so an account
+# costs a few bytes of framing instead of a key, a hash and four field names of its own.
+COMPACT_KEY_PREFIX = "account:c:"
+COMPACT_KEY_PATTERN = f"{COMPACT_KEY_PREFIX}*"
+COMPACT_FIELDS = ('password', 'first_name', 'security_question', 'security_answer')
+RECORD_SEPARATOR = "\x1f"
+
+# Matches the account hashes and the compact buckets, so one SCAN finds both layouts
+ACCOUNT_SCAN_PATTERN = "account:*"
+
+# Lua helpers shared by the compact scripts: ARGV[1] is always the login name, and the
+# fields to set follow as field1, value1, field2, value2, ...
+_RECORD_FUNCTIONS = """
+local SEPARATOR = string.char(%d)
+local FIELDS = {%s}
+
+local function decode(record)
+    local values = {}
+    for value in string.gmatch(record .. SEPARATOR, '([^' .. SEPARATOR .. ']*)' .. SEPARATOR) do
+        values[#values + 1] = value
+    end
+    return values
+end
+
+local function encode(values)
+    local last = 0
+    for index = 1, %d do
+        values[index] = values[index] or ''
+        if values[index] ~= '' then
+            last = index
+        end
+    end
+    return table.concat(values, SEPARATOR, 1, last)
+end
+
+local function set_fields(values)
+    for i = 2, #ARGV, 2 do
+        values[FIELDS[ARGV[i]]] = ARGV[i + 1]
+    end
+    return values
+end
+""" % (
+    ord(RECORD_SEPARATOR),
+    ", ".join(f"{field} = {index}" for index, field in enumerate(COMPACT_FIELDS, 1)),
+    len(COMPACT_FIELDS)
+)
+
+# Creates the account's record unless the login name is already taken.
+# KEYS[1] = bucket key, ARGV = login name, field1, value1, ...
+COMPACT_CREATE_ACCOUNT_SCRIPT = _RECORD_FUNCTIONS + """
+return redis.call('HSETNX', KEYS[1], ARGV[1], encode(set_fields({})))
+"""
+
+# Updates fields of an existing account's record.
+# KEYS[1] = bucket key, ARGV = login name, field1, value1, ...
+COMPACT_UPDATE_ACCOUNT_SCRIPT = _RECORD_FUNCTIONS + """
+local record = redis.call('HGET', KEYS[1], ARGV[1])
+if not record then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], encode(set_fields(decode(record))))
+return 1
+"""
+
+# Sets fields of an account, creating its record if needed; the bulk-load write.
+# KEYS[1] = bucket key, ARGV = login name, field1, value1, ...
+COMPACT_STORE_ACCOUNT_SCRIPT = _RECORD_FUNCTIONS + """
+local record = redis.call('HGET', KEYS[1], ARGV[1])
+redis.call('HSET', KEYS[1], ARGV[1], encode(set_fields(record and decode(record) or {})))
+return 1
+"""
+
+# Replaces the password hash only if it is still the one the caller verified.
+# KEYS[1] = bucket key, ARGV[1] = login name, ARGV[2] = expected hash, ARGV[3] = new hash
+COMPACT_REPLACE_PASSWORD_HASH_SCRIPT = _RECORD_FUNCTIONS + """
+local record = redis.call('HGET', KEYS[1], ARGV[1])
+if not record then
+    return 0
+end
+local values = decode(record)
+if (values[1] or '') ~= ARGV[2] then
+    return 0
+end
+values[1] = ARGV[3]
+redis.call('HSET', KEYS[1], ARGV[1], encode(values))
+return 1
+"""
+
+# Deletes an account's record.
+# KEYS[1] = bucket key, ARGV[1] = login name
+COMPACT_DELETE_ACCOUNT_SCRIPT = """
+return redis.call('HDEL', KEYS[1], ARGV[1])
+"""
+
+def bucket_key(login_name, buckets=None):
+    """
+    Builds the key of the bucket hash holding an account in the compact layout.
+
+    Args:
+        login_name (str): The user's login name or email.
+        buckets (int, optional): Number of buckets. Defaults to the CAMPSITE_COMPACT_BUCKETS setting.
+
+    Returns:
+        str: The bucket key, e.g. 'account:c:1f3a'.
+    """
+    buckets = buckets or ACCOUNT_LAYOUT_SETTINGS['buckets']
+    return f"{COMPACT_KEY_PREFIX}{zlib.crc32(login_name.encode('utf-8')) % buckets:x}"
+
+def encode_record(fields):
+    """
+    Packs account fields into a compact record. Empty trailing fields are left out.
+
+    Args:
+        fields (dict): Account fields, named as in COMPACT_FIELDS.
+
+    Returns:
+        str: The record, e.g. '$2b$12$...<US>Alice<US>Pet?<US>Rex'.
+
+    Raises:
+        ValueError: If a field is not one of COMPACT_FIELDS or a value contains the separator.
+    """
+    unknown = set(fields) - set(COMPACT_FIELDS)
+    if unknown:
+        raise ValueError(f"The compact layout cannot store the fields: {', '.join(sorted(unknown))}")
+    values = []
+    for field in COMPACT_FIELDS:
+        value = fields.get(field)
+        value = "" if value is None else str(value)
+        if RECORD_SEPARATOR in value:
+            raise ValueError(f"The {field} contains the record separator")
+        values.append(value)
+    return RECORD_SEPARATOR.join(values).rstrip(RECORD_SEPARATOR)
+
+def decode_record(record):
+    """
+    Unpacks a compact record into account fields.
+
+    Args:
+        record (str): A record made by encode_record(), or None.
+
+    Returns:
+        dict: The fields that are set, empty for None.
+    """
+    if not record:
+        return {}
+    return {field: value for field, value in zip(COMPACT_FIELDS, record.split(RECORD_SEPARATOR)) if value}
+
+def account_writer(redis_client, layout=None, buckets=None):
+    """
+    Returns a function queueing account writes on a pipeline, for bulk loads.
+
+    The written fields are merged into the stored account, like HSET on its hash, in
+    whichever layout is used.
+
+    Args:
+        redis_client (redis.Redis): The client the pipelines belong to.
+        layout (str, optional): 'hash' or 'compact'. Defaults to the CAMPSITE_ACCOUNT_LAYOUT setting.
+        buckets (int, optional): Number of compact buckets. Defaults to the CAMPSITE_COMPACT_BUCKETS setting.
+
+    Returns:
+        function: write(pipeline, login_name, fields).
+    """
+    if (layout or ACCOUNT_LAYOUT_SETTINGS['layout']) != 'compact':
+        def write(pipeline, login_name, fields):
+            pipeline.hset(account_key(login_name), mapping=fields)
+        return write
+
+    store = redis_client.register_script(COMPACT_STORE_ACCOUNT_SCRIPT)
+
+    def write(pipeline, login_name, fields):
+        encode_record(fields)
+        store(keys=[bucket_key(login_name, buckets)], args=[login_name, *AccountRepository._flatten(fields)],
+              client=pipeline)
+    return write
+
+def compact_account_count(redis_client, count=1000):
+    """
+    Counts the accounts stored in the compact layout, with one SCAN of the bucket keys and
+    a pipelined HLEN of each batch of buckets.
+
+    Args:
+        redis_client (redis.Redis): Redis client, or a storage backend.
+        count (int, optional): SCAN count hint and buckets counted per round trip. Defaults to 1000.
+
+    Returns:
+        int: The number of accounts.
+    """
+    from Models.cluster_pipeline import batch_pipeline
+    from Models.redis_client import scan_batches
+
+    accounts = 0
+    for keys in scan_batches(redis_client, match=COMPACT_KEY_PATTERN, count=count):
+        if keys:
+            pipeline = batch_pipeline(redis_client, transaction=False)
+            for key in keys:
+                pipeline.hlen(key)
+            accounts += sum(pipeline.execute())
+    return accounts
+
+def compact_account_batches(redis_client, count=1000):
+    """
+    Reads every account stored in the compact layout, one SCAN batch of buckets at a time,
+    with a pipelined HGETALL of each batch.
+
+    Args:
+        redis_client (redis.Redis): Redis client, or a storage backend.
+        count (int, optional): SCAN count hint and buckets read per round trip. Defaults to 1000.
+
+    Yields:
+        list: (login_name, fields) pairs of the accounts in one batch of buckets.
+    """
+    from Models.cluster_pipeline import batch_pipeline
+    from Models.redis_client import scan_batches
+
+    for keys in scan_batches(redis_client, match=COMPACT_KEY_PATTERN, count=count):
+        if not keys:
+            continue
+        pipeline = batch_pipeline(redis_client, transaction=False)
+        for key in keys:
+            pipeline.hgetall(key)
+        yield [
+            (login_name, decode_record(record))
+            for bucket in pipeline.execute()
+            for login_name, record in bucket.items()
+        ]
+
+def _set_fields(record, args):
+    fields = decode_record(record)
+    fields.update(zip(args[1::2], args[2::2]))
+    return encode_record(fields)
+
+@script_fallback(COMPACT_CREATE_ACCOUNT_SCRIPT)
+def _create_account(storage, keys, args):
+    return storage.hsetnx(keys[0], args[0], _set_fields(None, args))
+
+@script_fallback(COMPACT_UPDATE_ACCOUNT_SCRIPT)
+def _update_account(storage, keys, args):
+    record = storage.hget(keys[0], args[0])
+    if record is None:
+        return 0
+    storage.hset(keys[0], args[0], _set_fields(record, args))
+    return 1
+
+@script_fallback(COMPACT_STORE_ACCOUNT_SCRIPT)
+def _store_account(storage, keys, args):
+    storage.hset(keys[0], args[0], _set_fields(storage.hget(keys[0], args[0]), args))
+    return 1
+
+@script_fallback(COMPACT_REPLACE_PASSWORD_HASH_SCRIPT)
+def _replace_password_hash(storage, keys, args):
+    record = storage.hget(keys[0], args[0])
+    if record is None:
+        return 0
+    fields = decode_record(record)
+    if fields.get('password', "") != args[1]:
+        return 0
+    fields['password'] = args[2]
+    storage.hset(keys[0], args[0], encode_record(fields))
+    return 1
+
+@script_fallback(COMPACT_DELETE_ACCOUNT_SCRIPT)
+def _delete_account(storage, keys, args):
+    return storage.hdel(keys[0], args[0])
+
+class CompactAccountRepository(AccountRepository):
+    """
+    An AccountRepository for the compact layout: every account is one field of a bucket
+    hash, holding its fields as a compact record (see encode_record()).
+
+    Operations still take one round trip each: reads are a single HGET of the account's
+    record, and writes are scripts that rewrite the record atomically. Accounts in the
+    compact layout have no legacy keys, and only the fields in COMPACT_FIELDS can be stored.
+    A FieldCache tracks whole keys, which are shared buckets here, so none is used.
+    """
+
+    CREATE_SCRIPT = COMPACT_CREATE_ACCOUNT_SCRIPT
+    UPDATE_SCRIPT = COMPACT_UPDATE_ACCOUNT_SCRIPT
+    DELETE_SCRIPT = COMPACT_DELETE_ACCOUNT_SCRIPT
+    REPLACE_PASSWORD_HASH_SCRIPT = COMPACT_REPLACE_PASSWORD_HASH_SCRIPT
+
+    def __init__(self, redis_client, account_filter=None, buckets=None):
+        """
+        Initializes the repository with a Redis client.
+
+        Args:
+            redis_client (redis.Redis): Redis client for database operations.
+            account_filter (AccountFilter, optional): Filter of registered login names,
+                kept up to date by create() and delete(). Defaults to None.
+            buckets (int, optional): Number of buckets. Defaults to the CAMPSITE_COMPACT_BUCKETS setting.
+        """
+        super().__init__(redis_client, legacy_fallback=False, account_filter=account_filter)
+        self.buckets = buckets or ACCOUNT_LAYOUT_SETTINGS['buckets']
+
+    def _keys(self, login_name):
+        return [bucket_key(login_name, self.buckets)]
+
+    def _reads(self, command, login_name, args):
+        return [('hget', bucket_key(login_name, self.buckets), (login_name,))]
+
+    def _decode(self, command, result, args):
+        return self._select(command, decode_record(result), args)
+
+    def _exists_call(self, login_name):
+        return 'hexists', [bucket_key(login_name, self.buckets), login_name]
+
+    def _script_args(self, login_name, args):
+        return [login_name, *args]
+
+    @staticmethod
+    def _flatten(fields):
+        # Rejects what a record cannot hold before anything is sent
+        encode_record(fields)
+        return AccountRepository._flatten(fields)
@@ -0,0 +1,122 @@
+import threading
+import time
+from queue import Empty, Full
+import redis
+
+class ReapingConnectionPool(redis.BlockingConnectionPool):
+    """
+    A bounded, thread-safe Redis connection pool that closes connections left idle too long.
+
+    Connections are handed out most-recently-used first, so the ones that sit idle at the
+    bottom of the pool are the ones a reaper thread disconnects. A reaped connection keeps
+    its slot and reconnects lazily the next time it is needed. The pool also keeps simple
+    counters that can be read with stats().
+    """
+
+    def __init__(self, idle_timeout=300, **kwargs):
+        """
+        Initializes the pool.
+
+        Args:
+            idle_timeout (float, optional): Seconds a connection may stay idle before it is
+                disconnected. 0 or None disables reaping. Defaults to 300.
+            **kwargs: Passed to redis.BlockingConnectionPool, e.g. max_connections, timeout,
+                and connection arguments such as host, port, password and health_check_interval.
+        """
+        self.idle_timeout = idle_timeout
+        self.checkouts = 0
+        self.reaped = 0
+        self._stats_lock = threading.Lock()
+        self._closed = threading.Event()
+        super().__init__(**kwargs)
+
+        if idle_timeout:
+            reaper = threading.Thread(target=self._reap_loop, name="redis-pool-reaper", daemon=True)
+            reaper.start()
+
+    def get_connection(self, *args, **kwargs):
+        connection = super().get_connection(*args, **kwargs)
+        with self._stats_lock:
+            self.checkouts += 1
+        return connection
+
+    def release(self, connection):
+        connection.last_released_at = time.monotonic()
+        super().release(connection)
+
+    def reap_idle(self, idle_timeout=None):
+        """
+        Disconnects the idle connections that have not been used for idle_timeout seconds.
+
+        The pool is drained for a moment so no other thread can check out a connection while
+        it is being closed, then refilled in the same order.
+
+        Args:
+            idle_timeout (float, optional): Overrides the pool's idle timeout.
+
+        Returns:
+            int: The number of connections disconnected.
+        """
+        idle_timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        cutoff = time.monotonic() - idle_timeout
+        drained = []
+        reaped = 0
+        try:
+            while True:
+                try:
+                    drained.append(self.pool.get_nowait())
+                except Empty:
+                    break
+
+            for connection in drained:
+                if connection is None or getattr(connection, '_sock', None) is None:
+                    continue
+                if getattr(connection, 'last_released_at', 0) <= cutoff:
+                    connection.disconnect()
+                    reaped += 1
+        finally:
+            for connection in reversed(drained):
+                try:
+                    self.pool.put_nowait(connection)
+                except Full:
+                    break
+
+        with self._stats_lock:
+            self.reaped += reaped
+        return reaped
+
+    def stats(self):
+        """
+        Reports how the pool's connections are being used.
+
+        Returns:
+            dict: max_connections, created (connection objects made so far), connected (open
+                sockets), in_use, idle, checkouts (total) and reaped (total).
+        """
+        connections = list(self._connections)
+        available = [connection for connection in list(self.pool.queue) if connection is not None]
+        with self._stats_lock:
+            return {
+                'max_connections': self.max_connections,
+                'created': len(connections),
+                'connected': sum(1 for connection in connections if getattr(connection, '_sock', None) is not None),
+                'in_use': len(connections) - len(available),
+                'idle': len(available),
+                'checkouts': self.checkouts,
+                'reaped': self.reaped
+            }
+
+    def close(self):
+        """
+        Stops the reaper thread and disconnects every connection.
+        """
+        self._closed.set()
+        self.disconnect()
+
+    def _reap_loop(self):
+        interval = max(1.0, self.idle_timeout / 2)
+        while not self._closed.wait(interval):
+            try:
+                self.reap_idle()
+            except Exception as e:
+                print(f"Failed to reap idle Redis connections: {e}")
@@ -0,0 +1,127 @@
+import hashlib
+import random
+from array import array
+
+class CuckooFilter:
+    """
+    A compact set of strings that answers "definitely not present" or "probably present".
+
+    Each item is stored as a 16-bit fingerprint in one of two buckets. Unlike a Bloom
+    filter, items can also be removed, which keeps the filter accurate when accounts are
+    deleted. With four slots per bucket the chance of a false "probably present" is about
+    8 in 65536 (0.012%) and each item costs about 2 bytes.
+
+    Only remove items that were added, and add each item once: removing an item that was
+    never added can remove another item's fingerprint.
+    """
+
+    def __init__(self, capacity, bucket_size=4, max_kicks=500):
+        """
+        Initializes an empty filter.
+
+        Args:
+            capacity (int): Number of items the filter should hold. The table is sized so
+                it stays below 95% full at this count.
+            bucket_size (int, optional): Fingerprints per bucket. Defaults to 4.
+            max_kicks (int, optional): Relocations tried before an insert gives up. Defaults to 500.
+        """
+        wanted = max(1, int(capacity / bucket_size / 0.95) + 1)
+        # A power of two, so the alternate bucket can be found from either bucket with XOR
+        self.num_buckets = 1 << (wanted - 1).bit_length()
+        self.bucket_size = bucket_size
+        self.max_kicks = max_kicks
+        self.count = 0
+        self._slots = array('H', bytes(2 * self.num_buckets * bucket_size))
+        self._random = random.Random(0)
+
+    @property
+    def capacity(self):
+        """
+        Returns the number of slots in the table.
+        """
+        return self.num_buckets * self.bucket_size
+
+    @property
+    def false_positive_rate(self):
+        """
+        Returns the upper bound on the chance that an absent item is reported present.
+        """
+        return 2 * self.bucket_size / 65536
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, item):
+        fingerprint, index = self._locate(item)
+        return (self._bucket_has(index, fingerprint)
+                or self._bucket_has(self._alternate(index, fingerprint), fingerprint))
+
+    def add(self, item):
+        """
+        Adds an item.
+
+        Args:
+            item (str): The item to add.
+
+        Returns:
+            bool: True if it was added, False if the filter is too full. A full filter still
+                answers correctly for the items it holds, but one other fingerprint may have
+                been evicted, so it should be rebuilt larger.
+        """
+        fingerprint, index = self._locate(item)
+        alternate = self._alternate(index, fingerprint)
+        if self._insert(index, fingerprint) or self._insert(alternate, fingerprint):
+            self.count += 1
+            return True
+
+        # Both buckets are full: move fingerprints to their other bucket to make room
+        index = self._random.choice((index, alternate))
+        for _ in range(self.max_kicks):
+            slot = index * self.bucket_size + self._random.randrange(self.bucket_size)
+            fingerprint, self._slots[slot] = self._slots[slot], fingerprint
+            index = self._alternate(index, fingerprint)
+            if self._insert(index, fingerprint):
+                self.count += 1
+                return True
+        return False
+
+    def remove(self, item):
+        """
+        Removes an item that was added before.
+
+        Args:
+            item (str): The item to remove.
+
+        Returns:
+            bool: True if a matching fingerprint was removed.
+        """
+        fingerprint, index = self._locate(item)
+        for bucket in (index, self._alternate(index, fingerprint)):
+            start = bucket * self.bucket_size
+            for slot in range(start, start + self.bucket_size):
+                if self._slots[slot] == fingerprint:
+                    self._slots[slot] = 0
+                    self.count -= 1
+                    return True
+        return False
+
+    def _locate(self, item):
+        digest = int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+        # 0 marks an empty slot, so it is never used as a fingerprint
+        fingerprint = (digest >> 32) & 0xFFFF or 1
+        return fingerprint, digest & (self.num_buckets - 1)
+
+    def _alternate(self, index, fingerprint):
+        return (index ^ ((fingerprint * 0x5BD1E995) & 0xFFFFFFFF)) & (self.num_buckets - 1)
+
+    def _bucket_has(self, index, fingerprint):
+        start = index * self.bucket_size
+        return fingerprint in self._slots[start:start + self.bucket_size]
+
+    def _insert(self, index, fingerprint):
+        start = index * self.bucket_size
+        for slot in range(start, start + self.bucket_size):
+            if self._slots[slot] == 0:
+                self._slots[slot] = fingerprint
+                return True
+        return False
@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from Models.account_keys import ACCOUNT_KEY_PREFIX
+from Utils.metrics import FIELD_CACHE
+
+class FieldCache:
+    """
+    An in-process cache of whole hashes, such as accounts, kept fresh by Redis itself.
+
+    A dedicated RESP3 connection turns on client tracking in broadcast mode for the key
+    prefix, so Redis pushes an invalidation whenever any client writes a key under it, on
+    this machine or any other. Entries are also evicted least-recently-used beyond
+    max_entries and dropped after ttl seconds as a safety net.
+
+    The cache only answers while that connection is up. When it drops, the cache is cleared
+    and every read goes to Redis until tracking is back, so it never serves data that may
+    have changed. A read that overlaps an invalidation is not stored, as its result may
+    predate the write.
+    """
+
+    def __init__(self, redis_client, prefix=ACCOUNT_KEY_PREFIX, max_entries=10000, ttl=300,
+                 retry_interval=5, health_check_interval=30):
+        """
+        Initializes an empty cache. Call start() to begin tracking.
+
+        Args:
+            redis_client (redis.Redis): Redis client whose connection details the tracking
+                connection uses.
+            prefix (str, optional): Only keys under this prefix are tracked and cached.
+                Defaults to the account key prefix.
+            max_entries (int, optional): Hashes kept before the least recently used is
+                evicted. Defaults to 10000.
+            ttl (float, optional): Seconds an entry is served for. Defaults to 300.
+            retry_interval (float, optional): Seconds before reconnecting the tracking
+                connection after it fails. Defaults to 5.
+            health_check_interval (float, optional): Seconds between PINGs on the idle
+                tracking connection, so a dead connection is noticed. Defaults to 30.
+        """
+        self.redis_client = redis_client
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.retry_interval = retry_interval
+        self.health_check_interval = health_check_interval
+        self.lookups = Counter()
+        self.ready = False
+        self._entries = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the tracking connection in a background thread and waits briefly for it, so
+        the cache is normally serving by the time this returns.
+
+        Returns:
+            bool: False if the client cannot be tracked (storage backends and Redis Cluster).
+        """
+        if getattr(self.redis_client, 'connection_pool', None) is None:
+            return False
+        self._stopped.clear()
+        connected = threading.Event()
+        self._thread = threading.Thread(target=self._listen, args=(connected,), daemon=True)
+        self._thread.start()
+        connected.wait(timeout=5)
+        return True
+
+    def stop(self):
+        """
+        Stops tracking and empties the cache.
+        """
+        self._stopped.set()
+        self._pause()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def get(self, key):
+        """
+        Returns a cached hash.
+
+        Args:
+            key (str): The Redis key.
+
+        Returns:
+            dict: The cached fields ({} for a hash known not to exist), or None on a miss.
+        """
+        with self._lock:
+            if not self.ready or not key.startswith(self.prefix):
+                self._count('bypassed')
+                return None
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self._count('miss')
+                return None
+            self._entries.move_to_end(key)
+            self._count('hit')
+            return dict(entry[1])
+
+    def begin(self):
+        """
+        Marks the start of a read whose result will be stored with store().
+
+        Returns:
+            int: A token to pass to store().
+        """
+        with self._lock:
+            return self._generation
+
+    def store(self, key, fields, token):
+        """
+        Caches a hash read from Redis, unless an invalidation arrived since begin().
+
+        Args:
+            key (str): The Redis key.
+            fields (dict): All the fields of the hash, or {} if it does not exist.
+            token (int): The value begin() returned before the read was sent.
+
+        Returns:
+            bool: True if the hash was cached.
+        """
+        with self._lock:
+            if not self.ready or token != self._generation or not key.startswith(self.prefix):
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, dict(fields))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count('evicted')
+            return True
+
+    def invalidate(self, *keys):
+        """
+        Drops cached hashes, e.g. straight after this process writes them, without waiting
+        for Redis to push the invalidation.
+
+        Args:
+            *keys (str): The Redis keys. With no keys, the whole cache is dropped.
+        """
+        with self._lock:
+            self._generation += 1
+            if not keys:
+                self._entries.clear()
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._count('invalidated')
+
+    def stats(self):
+        """
+        Reports how the cache is doing.
+
+        Returns:
+            dict: Lookup counts by result ('hit', 'miss', 'bypassed' while tracking is down,
+                'invalidated', 'evicted'), the hit rate among served lookups, and the
+                number of cached hashes.
+        """
+        with self._lock:
+            lookups = dict(self.lookups)
+            entries = len(self._entries)
+        hits, misses = lookups.get('hit', 0), lookups.get('miss', 0)
+        return {
+            'ready': self.ready,
+            'lookups': lookups,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+            'entries': entries
+        }
+
+    def _listen(self, connected):
+        while not self._stopped.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                connected.set()
+                last_ping = time.monotonic()
+                awaiting_pong = False
+                while not self._stopped.is_set():
+                    if connection.can_read(timeout=1):
+                        if connection.read_response(push_request=True) == 'PONG':
+                            awaiting_pong = False
+                    elif time.monotonic() - last_ping > self.health_check_interval:
+                        if awaiting_pong:
+                            raise ConnectionError("no reply to PING")
+                        connection.send_command('PING')
+                        last_ping, awaiting_pong = time.monotonic(), True
+            except Exception as e:
+                if not self._stopped.is_set():
+                    print(f"Lost the field cache invalidation connection, the cache is paused: {e}")
+            finally:
+                self._pause()
+                if connection is not None:
+                    connection.disconnect()
+            connected.set()
+            self._stopped.wait(self.retry_interval)
+
+    def _connect(self):
+        pool = self.redis_client.connection_pool
+        # RESP3 delivers invalidations on the tracking connection itself. The idle health
+        # check is done here, as the connection's own would mistake a pushed message for its reply.
+        connection = pool.connection_class(**dict(pool.connection_kwargs, protocol=3, health_check_interval=0))
+        connection.connect()
+        connection._parser.set_invalidation_push_handler(self._on_invalidation)
+        connection.send_command('CLIENT', 'TRACKING', 'ON', 'BCAST', 'PREFIX', self.prefix)
+        connection.read_response()
+        with self._lock:
+            # Anything cached before may have changed while tracking was off
+            self._entries.clear()
+            self._generation += 1
+            self.ready = True
+        return connection
+
+    def _on_invalidation(self, message):
+        keys = message[1]
+        if keys is None:
+            # The database was flushed
+            self.invalidate()
+        else:
+            self.invalidate(*(key.decode('utf-8') if isinstance(key, bytes) else key for key in keys))
+
+    def _pause(self):
+        with self._lock:
+            self.ready = False
+            self._entries.clear()
+            self._generation += 1
+
+    def _count(self, result):
+        # Called with the lock held
+        self.lookups[result] += 1
+        FIELD_CACHE.inc(result)
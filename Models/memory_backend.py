@@ -0,0 +1,125 @@
+import bisect
+from Models.storage_backend import StorageBackend
+
+class MemoryBackend(StorageBackend):
+    """
+    Keeps every hash in a dictionary inside the process.
+
+    Nothing is persisted, which makes it the fastest backend for tests and offline runs.
+    Before a hash is first changed inside an atomic block its old contents are saved, so
+    the block can be rolled back.
+
+    The key names are also kept in a sorted list, so each SCAN page is a slice of it
+    instead of a pass over every key. The sorted fields of a hash are kept for HSCAN
+    until the hash gains or loses a field.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty database.
+        """
+        super().__init__()
+        self.data = {}
+        self._sorted_keys = []
+        self._sorted_fields = {}
+        # The contents of each hash changed since the last commit, before the change
+        self._undo = {}
+
+    def _commit(self):
+        self._undo.clear()
+
+    def _rollback(self):
+        for name, fields in self._undo.items():
+            if fields is None:
+                if self.data.pop(name, None) is not None:
+                    self._unindex(name)
+            else:
+                if name not in self.data:
+                    bisect.insort(self._sorted_keys, name)
+                self.data[name] = fields
+                self._sorted_fields.pop(name, None)
+        self._undo.clear()
+
+    def _save(self, name):
+        if name not in self._undo:
+            self._undo[name] = dict(self.data[name]) if name in self.data else None
+
+    def _unindex(self, name):
+        # Called after the hash was removed from self.data
+        self._sorted_keys.pop(bisect.bisect_left(self._sorted_keys, name))
+        self._sorted_fields.pop(name, None)
+
+    def _hset(self, name, fields):
+        self._save(name)
+        if name not in self.data:
+            bisect.insort(self._sorted_keys, name)
+            self.data[name] = {}
+        stored = self.data[name]
+        added = sum(1 for field in fields if field not in stored)
+        stored.update(fields)
+        if added:
+            self._sorted_fields.pop(name, None)
+        return added
+
+    def _hget(self, name, field):
+        return self.data.get(name, {}).get(field)
+
+    def _hgetall(self, name):
+        return dict(self.data.get(name, {}))
+
+    def _hdel(self, name, field):
+        self._save(name)
+        stored = self.data.get(name, {})
+        if field not in stored:
+            return False
+        del stored[field]
+        self._sorted_fields.pop(name, None)
+        if not stored:
+            del self.data[name]
+            self._unindex(name)
+        return True
+
+    def _exists(self, name):
+        return bool(self.data.get(name))
+
+    def _delete(self, name):
+        self._save(name)
+        if self.data.pop(name, None) is None:
+            return False
+        self._unindex(name)
+        return True
+
+    def _rename(self, src, dst):
+        self._save(src)
+        self._save(dst)
+        self._delete(dst)
+        self.data[dst] = self.data.pop(src)
+        self._unindex(src)
+        bisect.insort(self._sorted_keys, dst)
+
+    def _dbsize(self):
+        return len(self.data)
+
+    def _flush(self):
+        for name in self.data:
+            self._save(name)
+        self.data.clear()
+        self._sorted_keys.clear()
+        self._sorted_fields.clear()
+
+    def _keys_after(self, last, limit):
+        return _page_after(self._sorted_keys, last, limit)
+
+    def _fields_after(self, name, last, limit):
+        stored = self.data.get(name)
+        if not stored:
+            return []
+        fields = self._sorted_fields.get(name)
+        if fields is None:
+            fields = self._sorted_fields[name] = sorted(stored)
+        return [(field, stored[field]) for field in _page_after(fields, last, limit)]
+
+def _page_after(items, last, limit):
+    # Up to `limit` items of a sorted list that come after `last`
+    start = 0 if last is None else bisect.bisect_right(items, last)
+    return items[start:] if limit is None else items[start:start + limit]
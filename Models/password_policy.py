@@ -0,0 +1,252 @@
+import re
+import threading
+import time
+import bcrypt
+from Utils.config import PASSWORD_SETTINGS
+from Utils.metrics import PASSWORD_HASHING
+
+try:
+    import argon2
+except ImportError:  # argon2-cffi is optional and only needed for the argon2id scheme
+    argon2 = None
+
+SCHEMES = ('bcrypt', 'argon2id')
+
+# Calibration never goes below these costs, however slow the machine is
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+ARGON2_MAX_TIME_COST = 10
+
+_BCRYPT_HASH = re.compile(r"^\$2[aby]?\$(\d\d)\$")
+_ARGON2_HASH = re.compile(r"^\$argon2(id|i|d)\$")
+
+class PasswordPolicy:
+    """
+    Decides how passwords are hashed: the scheme and its work factor.
+
+    Hashes made under an older policy still verify, whatever their scheme or cost, and
+    needs_rehash() reports them so they can be replaced after a successful login. That
+    lets the cost be raised (or lowered) in one place without resetting any passwords.
+    """
+
+    def __init__(self, scheme='bcrypt', bcrypt_rounds=12, argon2_time_cost=3, argon2_memory_cost=65536,
+                 argon2_parallelism=4):
+        """
+        Initializes the policy.
+
+        Args:
+            scheme (str, optional): 'bcrypt' or 'argon2id'. Defaults to 'bcrypt'.
+            bcrypt_rounds (int, optional): bcrypt cost factor; each extra round doubles the work.
+                Defaults to 12.
+            argon2_time_cost (int, optional): Argon2 passes over memory. Defaults to 3.
+            argon2_memory_cost (int, optional): Argon2 memory in KiB. Defaults to 65536 (64 MiB).
+            argon2_parallelism (int, optional): Argon2 lanes. Defaults to 4.
+
+        Raises:
+            ValueError: If the scheme is unknown, or is argon2id without argon2-cffi installed.
+        """
+        if scheme not in SCHEMES:
+            raise ValueError(f"Unknown password scheme '{scheme}', expected one of: {', '.join(SCHEMES)}")
+        if scheme == 'argon2id' and argon2 is None:
+            raise ValueError("The argon2id scheme needs the argon2-cffi package: pip install argon2-cffi")
+        self.scheme = scheme
+        self.bcrypt_rounds = bcrypt_rounds
+        self.argon2_time_cost = argon2_time_cost
+        self.argon2_memory_cost = argon2_memory_cost
+        self.argon2_parallelism = argon2_parallelism
+
+    @classmethod
+    def calibrated(cls, scheme='bcrypt', target_ms=250, **kwargs):
+        """
+        Creates a policy whose work factor makes one hash take about target_ms on this machine.
+
+        Args:
+            scheme (str, optional): 'bcrypt' or 'argon2id'. Defaults to 'bcrypt'.
+            target_ms (float, optional): Wanted time per hash in milliseconds. Defaults to 250.
+            **kwargs: Other PasswordPolicy arguments, e.g. argon2_memory_cost.
+
+        Returns:
+            PasswordPolicy: The calibrated policy.
+        """
+        policy = cls(scheme, **kwargs)
+        if scheme == 'bcrypt':
+            policy.bcrypt_rounds = calibrate_bcrypt_rounds(target_ms)
+        else:
+            policy.argon2_time_cost = calibrate_argon2_time_cost(
+                target_ms, policy.argon2_memory_cost, policy.argon2_parallelism
+            )
+        return policy
+
+    def hash(self, password):
+        """
+        Hashes a password under this policy.
+
+        Args:
+            password (str): The plain-text password.
+
+        Returns:
+            str: The encoded hash, including its scheme, cost and salt.
+        """
+        with PASSWORD_HASHING.time(f"{self.scheme}_hash"):
+            if self.scheme == 'argon2id':
+                return self._argon2_hasher().hash(password)
+            return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.bcrypt_rounds)).decode('utf-8')
+
+    def verify(self, password, stored_hash):
+        """
+        Checks a password against a stored hash of any supported scheme and cost.
+
+        Args:
+            password (str): The plain-text password.
+            stored_hash (str): The stored hash.
+
+        Returns:
+            bool: True if the password matches.
+        """
+        if _ARGON2_HASH.match(stored_hash):
+            if argon2 is None:
+                print("Cannot verify an Argon2 password hash: the argon2-cffi package is not installed.")
+                return False
+            with PASSWORD_HASHING.time('argon2id_verify'):
+                try:
+                    return self._argon2_hasher().verify(stored_hash, password)
+                except argon2.exceptions.VerificationError:
+                    return False
+                except argon2.exceptions.InvalidHashError:
+                    print("Stored password hash is not a valid Argon2 hash.")
+                    return False
+
+        with PASSWORD_HASHING.time('bcrypt_verify'):
+            try:
+                return bcrypt.checkpw(password.encode('utf-8'), stored_hash.encode('utf-8'))
+            except ValueError:
+                print("Stored password hash is not a valid bcrypt hash.")
+                return False
+
+    def needs_rehash(self, stored_hash):
+        """
+        Checks whether a stored hash was made with another scheme or work factor than this policy's.
+
+        Args:
+            stored_hash (str): The stored hash.
+
+        Returns:
+            bool: True if the hash should be replaced the next time the password is known.
+        """
+        if self.scheme == 'bcrypt':
+            match = _BCRYPT_HASH.match(stored_hash)
+            return match is None or int(match.group(1)) != self.bcrypt_rounds
+        if not stored_hash.startswith('$argon2id$'):
+            return True
+        return self._argon2_hasher().check_needs_rehash(stored_hash)
+
+    def describe(self):
+        """
+        Returns a short description of the policy, e.g. 'bcrypt (cost 12)'.
+        """
+        if self.scheme == 'bcrypt':
+            return f"bcrypt (cost {self.bcrypt_rounds})"
+        return (f"argon2id (time cost {self.argon2_time_cost}, {self.argon2_memory_cost} KiB, "
+                f"{self.argon2_parallelism} lanes)")
+
+    def _argon2_hasher(self):
+        return argon2.PasswordHasher(
+            time_cost=self.argon2_time_cost,
+            memory_cost=self.argon2_memory_cost,
+            parallelism=self.argon2_parallelism,
+            type=argon2.Type.ID
+        )
+
+def _fastest(operation, repeats=3):
+    # The fastest run is the least disturbed by other work on the machine
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+def calibrate_bcrypt_rounds(target_ms=250, min_rounds=BCRYPT_MIN_ROUNDS, max_rounds=BCRYPT_MAX_ROUNDS):
+    """
+    Finds the highest bcrypt cost whose hash takes no longer than target_ms on this machine.
+
+    Only the minimum cost is timed: each extra round doubles the work, so the cost of the
+    others follows from it.
+
+    Args:
+        target_ms (float, optional): Wanted time per hash in milliseconds. Defaults to 250.
+        min_rounds (int, optional): Lowest cost returned. Defaults to BCRYPT_MIN_ROUNDS.
+        max_rounds (int, optional): Highest cost returned. Defaults to BCRYPT_MAX_ROUNDS.
+
+    Returns:
+        int: The cost factor.
+    """
+    seconds = _fastest(lambda: bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds=min_rounds)))
+    rounds = min_rounds
+    while rounds < max_rounds and seconds * 2 <= target_ms / 1000:
+        rounds += 1
+        seconds *= 2
+    return rounds
+
+def calibrate_argon2_time_cost(target_ms=250, memory_cost=65536, parallelism=4, max_time_cost=ARGON2_MAX_TIME_COST):
+    """
+    Finds the highest Argon2 time cost whose hash takes no longer than target_ms at the given
+    memory cost. The time grows about linearly with the number of passes.
+
+    Args:
+        target_ms (float, optional): Wanted time per hash in milliseconds. Defaults to 250.
+        memory_cost (int, optional): Argon2 memory in KiB. Defaults to 65536.
+        parallelism (int, optional): Argon2 lanes. Defaults to 4.
+        max_time_cost (int, optional): Highest time cost returned. Defaults to ARGON2_MAX_TIME_COST.
+
+    Returns:
+        int: The time cost, at least 1.
+
+    Raises:
+        ValueError: If argon2-cffi is not installed.
+    """
+    if argon2 is None:
+        raise ValueError("Calibrating Argon2 needs the argon2-cffi package: pip install argon2-cffi")
+    hasher = argon2.PasswordHasher(time_cost=1, memory_cost=memory_cost, parallelism=parallelism, type=argon2.Type.ID)
+    seconds = _fastest(lambda: hasher.hash("calibration"))
+    return max(1, min(max_time_cost, int(target_ms / 1000 / seconds)))
+
+_policy = None
+_policy_lock = threading.Lock()
+
+def get_password_policy():
+    """
+    Returns the application's password policy, built from PASSWORD_SETTINGS on first use
+    (and calibrated then if CAMPSITE_PASSWORD_CALIBRATE is set).
+
+    Returns:
+        PasswordPolicy: The shared policy.
+    """
+    global _policy
+    with _policy_lock:
+        if _policy is None:
+            settings = dict(PASSWORD_SETTINGS)
+            calibrate, target_ms = settings.pop('calibrate'), settings.pop('target_ms')
+            if calibrate:
+                scheme = settings.pop('scheme')
+                settings.pop('bcrypt_rounds')
+                settings.pop('argon2_time_cost')
+                _policy = PasswordPolicy.calibrated(scheme, target_ms, **settings)
+            else:
+                _policy = PasswordPolicy(**settings)
+        return _policy
+
+def set_password_policy(policy):
+    """
+    Replaces the application's password policy, e.g. in benchmarks and tests.
+
+    Args:
+        policy (PasswordPolicy): The new policy, or None to rebuild it from the settings.
+
+    Returns:
+        PasswordPolicy: The previous policy, or None if none had been built.
+    """
+    global _policy
+    with _policy_lock:
+        previous, _policy = _policy, policy
+        return previous
@@ -0,0 +1,214 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from Models.storage_backend import script_fallback
+from Utils.config import RATE_LIMIT_SETTINGS
+from Utils.metrics import RATE_LIMITED
+
+# Takes one token from a bucket, refilling it first for the time since it was last used.
+# Redis's own clock is used so every app instance sees the same time. An idle bucket
+# expires once it would have refilled completely, so abandoned buckets cost no memory.
+# KEYS[1] = bucket key, ARGV[1] = capacity, ARGV[2] = tokens refilled per second,
+# ARGV[3] = tokens this attempt costs
+# Returns {1, 0} if allowed, or {0, milliseconds until enough tokens are back}.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local allowed = tokens >= cost
+if allowed then
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+if allowed then
+    return {1, 0}
+end
+return {0, math.ceil((cost - tokens) / rate * 1000)}
+"""
+
+@script_fallback(TOKEN_BUCKET_SCRIPT)
+def _take_token(storage, keys, args):
+    # The storage backends have no key expiry, so buckets are kept until deleted
+    capacity, rate, cost = (float(arg) for arg in args)
+    now = time.time()
+    tokens, updated_at = storage.hmget(keys[0], ['tokens', 'updated_at'])
+    tokens = capacity if tokens is None else float(tokens)
+    updated_at = now if updated_at is None else float(updated_at)
+    tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+    allowed = tokens >= cost
+    if allowed:
+        tokens -= cost
+    storage.hset(keys[0], mapping={'tokens': repr(tokens), 'updated_at': repr(now)})
+    if allowed:
+        return [1, 0]
+    return [0, math.ceil((cost - tokens) / rate * 1000)]
+
+# Words used for each action in the message shown to the user
+ACTION_NAMES = {'login': "login", 'reset': "password reset"}
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when an attempt is rejected because one of its token buckets is empty.
+    """
+
+    def __init__(self, action, scope, retry_after):
+        """
+        Args:
+            action (str): The limited action, e.g. 'login'.
+            scope (str): The bucket that ran out: the action (per login name) or 'client'.
+            retry_after (float): Seconds until the attempt would be allowed.
+        """
+        self.action = action
+        self.scope = scope
+        self.retry_after = retry_after
+        super().__init__(
+            f"Too many {ACTION_NAMES.get(action, action)} attempts. "
+            f"Try again in {max(1, math.ceil(retry_after))} seconds."
+        )
+
+class RateLimiter:
+    """
+    Limits login and password-reset attempts with token buckets kept in Redis.
+
+    Each attempt takes a token from two buckets: one for the login name and action, and one
+    for the client making the attempt, so neither hammering one account nor spraying many
+    accounts from one client gets through. Both buckets are checked in a single pipelined
+    round trip, each atomically in a Lua script, so a rejected attempt costs well under a
+    millisecond instead of a password hash.
+    """
+
+    def __init__(self, redis_client, limits=None, client_id=None):
+        """
+        Initializes the limiter.
+
+        Args:
+            redis_client (redis.Redis): Redis client, or a storage backend, holding the buckets.
+            limits (dict, optional): (attempts, window in seconds) for each action and for
+                'client'. Defaults to the RATE_LIMIT_SETTINGS values.
+            client_id (str, optional): Identifies this client in the per-client bucket.
+                Defaults to the CAMPSITE_CLIENT_ID setting, or the host name.
+        """
+        self.redis_client = redis_client
+        self.limits = limits or {scope: RATE_LIMIT_SETTINGS[scope] for scope in ('login', 'reset', 'client')}
+        self.client_id = client_id or RATE_LIMIT_SETTINGS['client_id']
+        self.attempts = Counter()
+        self.rejected = Counter()
+        self._script = None
+
+    def check(self, action, login_name, client_id=None):
+        """
+        Takes a token for an attempt, or rejects it.
+
+        Args:
+            action (str): The action being attempted, e.g. 'login' or 'reset'.
+            login_name (str): The login name the attempt is for.
+            client_id (str, optional): The client making the attempt. Defaults to this limiter's.
+
+        Raises:
+            RateLimitExceeded: If the login name's or the client's bucket is empty.
+        """
+        buckets = self._buckets(action, login_name, client_id)
+        self.attempts[action] += 1
+        self._reject(action, buckets, self._take_tokens(buckets))
+
+    def reset(self, action, login_name):
+        """
+        Refills the login name's bucket for an action, e.g. after an administrator unlocks an account.
+
+        Args:
+            action (str): The action, e.g. 'login'.
+            login_name (str): The login name.
+        """
+        self.redis_client.delete(f"ratelimit:{action}:{login_name.strip()}")
+
+    def _buckets(self, action, login_name, client_id):
+        return [
+            (action, f"ratelimit:{action}:{login_name.strip()}"),
+            ('client', f"ratelimit:client:{client_id or self.client_id}")
+        ]
+
+    def _reject(self, action, buckets, results):
+        rejected = [(scope, retry_after_ms) for (scope, _), (allowed, retry_after_ms) in zip(buckets, results)
+                    if not int(allowed)]
+        if rejected:
+            for scope, _ in rejected:
+                self.rejected[scope] += 1
+                RATE_LIMITED.inc(scope)
+            scope, retry_after_ms = max(rejected, key=lambda item: int(item[1]))
+            raise RateLimitExceeded(action, scope, int(retry_after_ms) / 1000)
+
+    def _take_tokens(self, buckets):
+        # Imported on first use so the logic layer can import RateLimitExceeded without redis
+        import redis
+        from Models.cluster_pipeline import batch_pipeline
+
+        if self._script is None:
+            self._script = self.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+            # Load the script on every node up front, as pipelined EVALSHA calls cannot load it themselves
+            self.redis_client.script_load(TOKEN_BUCKET_SCRIPT)
+
+        for attempt in range(2):
+            pipeline = batch_pipeline(self.redis_client, transaction=False)
+            for scope, key in buckets:
+                capacity, window = self.limits[scope]
+                self._script(keys=[key], args=[capacity, capacity / window, 1], client=pipeline)
+            try:
+                return pipeline.execute()
+            except redis.exceptions.NoScriptError:
+                # The server was restarted or flushed its script cache since the script was loaded
+                if attempt:
+                    raise
+                self.redis_client.script_load(TOKEN_BUCKET_SCRIPT)
+
+class AsyncRateLimiter(RateLimiter):
+    """
+    The asyncio counterpart of RateLimiter, for a redis.asyncio client or an
+    AsyncStorageAdapter. The buckets, limits and counters are the same; the two buckets of
+    an attempt are taken concurrently, so a check still costs one round trip of latency.
+    """
+
+    async def check(self, action, login_name, client_id=None):
+        """
+        Takes a token for an attempt, or rejects it.
+
+        Args:
+            action (str): The action being attempted, e.g. 'login' or 'reset'.
+            login_name (str): The login name the attempt is for.
+            client_id (str, optional): The client making the attempt, e.g. its address.
+                Defaults to this limiter's.
+
+        Raises:
+            RateLimitExceeded: If the login name's or the client's bucket is empty.
+        """
+        buckets = self._buckets(action, login_name, client_id)
+        self.attempts[action] += 1
+        self._reject(action, buckets, await self._take_tokens(buckets))
+
+    async def reset(self, action, login_name):
+        """
+        Refills the login name's bucket for an action.
+
+        Args:
+            action (str): The action, e.g. 'login'.
+            login_name (str): The login name.
+        """
+        await self.redis_client.delete(f"ratelimit:{action}:{login_name.strip()}")
+
+    async def _take_tokens(self, buckets):
+        # Script calls outside a pipeline load the script themselves if the server lacks it,
+        # and the two buckets may live on different cluster nodes
+        if self._script is None:
+            self._script = self.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        calls = []
+        for scope, key in buckets:
+            capacity, window = self.limits[scope]
+            calls.append(self._script(keys=[key], args=[capacity, capacity / window, 1]))
+        return await asyncio.gather(*calls)
@@ -1,49 +1,230 @@
+import threading
+import time
 import redis
+from redis.cluster import RedisCluster
+from Models.cluster_pipeline import batch_pipeline
+from Models.connection_pool import ReapingConnectionPool
 from Utils.error_handler import handle_redis_errors
+from Utils.metrics import REDIS_COMMANDS
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    """
+    A pipeline that records each execute() as one 'PIPELINE' (or 'MULTI' for a
+    transaction) in the Redis command metrics.
+    """
+
+    def execute(self, raise_on_error=True):
+        with REDIS_COMMANDS.time('MULTI' if self.transaction else 'PIPELINE'):
+            return super().execute(raise_on_error)
+
+class InstrumentedRedis(redis.Redis):
+    """
+    A Redis client that records the count, errors and latency of every command it sends
+    (see Utils.metrics), including those sent by the code that uses the raw client.
+    """
+
+    def execute_command(self, *args, **options):
+        with REDIS_COMMANDS.time(str(args[0]).upper()):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+class InstrumentedRedisCluster(RedisCluster):
+    """
+    The Redis Cluster counterpart of InstrumentedRedis. Per-node pipelines are recorded by
+    NodePipeline.
+    """
+
+    def execute_command(self, *args, **kwargs):
+        with REDIS_COMMANDS.time(str(args[0]).upper()):
+            return super().execute_command(*args, **kwargs)
 
 class RedisClient:
     """
     A class for managing Redis client operations with connection handling and error management.
+
+    Clients created with the same connection details share one connection pool, so the
+    application logic, the data loader and background workers reuse warm connections
+    instead of each opening their own.
+
+    With cluster=True the client talks to Redis Cluster instead: commands are routed to
+    the node owning each key's hash slot, and pipelines are split per node and sent in
+    parallel (see Models.cluster_pipeline).
     """
 
-    def __init__(self, host, port, password, ssl=False):
+    _pools = {}
+    _clusters = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, host, port, password, ssl=False, max_connections=20, pool_timeout=20,
+                 health_check_interval=30, idle_timeout=300, cluster=False):
         """
         Initializes the Redis client with the given parameters.
 
+        The pool options only take effect for the first client created for a given
+        host, port, password and SSL setting; later clients reuse that pool.
+
         Args:
             host (str): The Redis server host.
             port (int): The Redis server port.
             password (str): The password for authenticating with Redis.
             ssl (bool): Whether to use SSL for the connection.
+            max_connections (int, optional): Maximum connections in the shared pool. Defaults to 20.
+            pool_timeout (float, optional): Seconds to wait for a free connection when the pool
+                is exhausted before raising an error. Defaults to 20.
+            health_check_interval (int, optional): Connections idle for longer than this many
+                seconds are checked with a PING before reuse. Defaults to 30.
+            idle_timeout (float, optional): Seconds before an idle connection is closed by the
+                pool's reaper. Defaults to 300.
+            cluster (bool, optional): Whether host and port are a seed node of a Redis Cluster.
+                Defaults to False.
         """
+        self.cluster = cluster
         try:
-            # Create a Redis client connection
-            self.client = redis.Redis(
-                host=host,
-                port=port,
-                password=password,
-                ssl=ssl,
-                decode_responses=True  # Automatically decode responses to strings
+            if cluster:
+                self.pool = None
+                self.client = self.get_cluster(
+                    host, port, password, ssl,
+                    max_connections=max_connections,
+                    health_check_interval=health_check_interval
+                )
+                self.client.ping()
+                print(f"Connected to Redis Cluster with {len(self.client.get_primaries())} primary nodes.")
+                return
+
+            self.pool = self.get_pool(
+                host, port, password, ssl,
+                max_connections=max_connections,
+                pool_timeout=pool_timeout,
+                health_check_interval=health_check_interval,
+                idle_timeout=idle_timeout
             )
+            # Create a Redis client on the shared connection pool
+            self.client = InstrumentedRedis(connection_pool=self.pool)
             # Test the connection
             self.client.ping()
             print("Connected to Redis successfully.")
-        except redis.ConnectionError as e:
+        except (redis.ConnectionError, redis.exceptions.RedisClusterException) as e:
             print(f"Failed to connect to Redis: {e}")
             self.client = None
 
+    @classmethod
+    def get_pool(cls, host, port, password, ssl=False, max_connections=20, pool_timeout=20,
+                 health_check_interval=30, idle_timeout=300):
+        """
+        Returns the shared connection pool for the given connection details, creating it on first use.
+
+        Args:
+            host (str): The Redis server host.
+            port (int): The Redis server port.
+            password (str): The password for authenticating with Redis.
+            ssl (bool): Whether to use SSL for the connection.
+            max_connections (int, optional): Maximum connections in the pool. Defaults to 20.
+            pool_timeout (float, optional): Seconds to wait for a free connection. Defaults to 20.
+            health_check_interval (int, optional): Idle seconds before a PING check on reuse. Defaults to 30.
+            idle_timeout (float, optional): Idle seconds before a connection is closed. Defaults to 300.
+
+        Returns:
+            ReapingConnectionPool: The shared pool.
+        """
+        key = (host, port, password, ssl)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = ReapingConnectionPool(
+                    idle_timeout=idle_timeout,
+                    max_connections=max_connections,
+                    timeout=pool_timeout,
+                    connection_class=redis.SSLConnection if ssl else redis.Connection,
+                    host=host,
+                    port=port,
+                    password=password,
+                    health_check_interval=health_check_interval,
+                    decode_responses=True  # Automatically decode responses to strings
+                )
+                cls._pools[key] = pool
+            return pool
+
+    @classmethod
+    def get_cluster(cls, host, port, password, ssl=False, max_connections=20, health_check_interval=30):
+        """
+        Returns the shared Redis Cluster client for the given seed node, creating it on first use.
+
+        The cluster client discovers the other nodes and keeps one connection pool per node,
+        so it is shared in the same way as the standalone pools.
+
+        Args:
+            host (str): Host of any node in the cluster.
+            port (int): Port of that node.
+            password (str): The password for authenticating with Redis.
+            ssl (bool): Whether to use SSL for the connections.
+            max_connections (int, optional): Maximum connections per node. Defaults to 20.
+            health_check_interval (int, optional): Idle seconds before a PING check on reuse. Defaults to 30.
+
+        Returns:
+            InstrumentedRedisCluster: The shared cluster client.
+        """
+        key = (host, port, password, ssl)
+        with cls._pools_lock:
+            cluster = cls._clusters.get(key)
+            if cluster is None:
+                cluster = InstrumentedRedisCluster(
+                    host=host,
+                    port=port,
+                    password=password,
+                    ssl=ssl,
+                    max_connections=max_connections,
+                    health_check_interval=health_check_interval,
+                    decode_responses=True
+                )
+                cls._clusters[key] = cluster
+            return cluster
+
+    @classmethod
+    def close_all_pools(cls):
+        """
+        Disconnects and forgets every shared pool and cluster client, e.g. when the application exits.
+        """
+        with cls._pools_lock:
+            pools, cls._pools = list(cls._pools.values()), {}
+            clusters, cls._clusters = list(cls._clusters.values()), {}
+        for pool in pools:
+            pool.close()
+        for cluster in clusters:
+            cluster.close()
+
+    def pool_stats(self):
+        """
+        Reports the usage of this client's connection pool.
+
+        Returns:
+            dict: Pool statistics (see ReapingConnectionPool.stats). For a cluster, the
+                created, in_use and idle connection counts of each node, keyed by node name.
+        """
+        if self.pool is not None:
+            return self.pool.stats()
+
+        stats = {}
+        for node in self.client.get_nodes():
+            pool = node.redis_connection.connection_pool if node.redis_connection else None
+            in_use = len(pool._in_use_connections) if pool else 0
+            idle = len(pool._available_connections) if pool else 0
+            stats[node.name] = {'created': in_use + idle, 'in_use': in_use, 'idle': idle}
+        return stats
+
     @handle_redis_errors
-    def exists(self, key):
+    def exists(self, *keys):
         """
         Checks if a key exists in the Redis database.
 
         Args:
-            key (str): The key to check.
+            *keys (str): The key to check, or several keys to check in one command.
 
         Returns:
-            bool: True if the key exists, False otherwise.
+            bool: True if any of the keys exists, False otherwise.
         """
-        return self.client.exists(key) > 0
+        return self.client.exists(*keys) > 0
 
     @handle_redis_errors
     def hgetall(self, key):
@@ -86,6 +267,21 @@ class RedisClient:
         """
         return self.client.hset(key, mapping=mapping)
 
+    @handle_redis_errors
+    def hsetnx(self, key, field, value):
+        """
+        Sets a field in the hash stored at the specified key, only if the field does not exist yet.
+
+        Args:
+            key (str): The key of the hash.
+            field (str): The field in the hash.
+            value (str): The value to set.
+
+        Returns:
+            int: 1 if the field was set, 0 if it already existed.
+        """
+        return self.client.hsetnx(key, field, value)
+
     @handle_redis_errors
     def delete(self, key):
         """
@@ -99,10 +295,90 @@ class RedisClient:
         """
         return self.client.delete(key)
 
+    def register_script(self, script):
+        """
+        Registers a Lua script to run on the server.
+
+        Args:
+            script (str): The Lua source.
+
+        Returns:
+            redis.commands.core.Script: Callable that runs the script with EVALSHA, loading it on first use.
+        """
+        return self.client.register_script(script)
+
+    def pipeline(self, transaction=True):
+        """
+        Creates a pipeline that buffers commands and sends them in a single round trip.
+
+        On a cluster this is a NodePipeline, which sends one round trip to each node in parallel.
+
+        Args:
+            transaction (bool): Whether to wrap the buffered commands in MULTI/EXEC. Defaults to True.
+
+        Returns:
+            redis.client.Pipeline: The pipeline. Call execute() to send the buffered commands.
+        """
+        return batch_pipeline(self.client, transaction=transaction)
+
+    def scan_batches(self, match="*", count=1000, type=None):
+        """
+        Iterates over the keys matching a pattern one SCAN batch at a time (see scan_batches).
+
+        Args:
+            match (str, optional): The pattern to match keys. Defaults to '*'.
+            count (int, optional): Hint for the number of keys examined per round trip. Defaults to 1000.
+            type (str, optional): Only return keys of this Redis type, e.g. 'hash'.
+
+        Yields:
+            list: The keys returned by each SCAN call.
+        """
+        if not self.client:
+            return
+        yield from scan_batches(self.client, match=match, count=count, type=type)
+
+    def scan_keys(self, match="*", count=1000, type=None):
+        """
+        Lazily iterates over the keys matching a pattern without blocking the server.
+
+        Memory use stays constant however many keys match. SCAN can return a key more than
+        once if the keyspace changes during the iteration.
+
+        Args:
+            match (str, optional): The pattern to match keys. Defaults to '*'.
+            count (int, optional): Hint for the number of keys examined per round trip. Defaults to 1000.
+            type (str, optional): Only return keys of this Redis type, e.g. 'hash'.
+
+        Yields:
+            str: Each matching key.
+        """
+        for batch in self.scan_batches(match=match, count=count, type=type):
+            yield from batch
+
+    def hscan_fields(self, key, match=None, count=1000):
+        """
+        Lazily iterates over the fields of a hash without reading it all at once.
+
+        Args:
+            key (str): The key of the hash.
+            match (str, optional): Only return fields matching this pattern.
+            count (int, optional): Hint for the number of fields examined per round trip. Defaults to 1000.
+
+        Yields:
+            tuple: (field, value) for each field of the hash.
+        """
+        if not self.client:
+            return
+        for batch in hscan_batches(self.client, key, match=match, count=count):
+            yield from batch.items()
+
     def keys(self, pattern="*"):
         """
         Lists all keys matching a given pattern.
 
+        Built on SCAN rather than the blocking KEYS command. Prefer scan_keys() for large
+        databases, which does not hold every key in memory.
+
         Args:
             pattern (str): The pattern to match keys. Defaults to '*' (all keys).
 
@@ -110,7 +386,107 @@ class RedisClient:
             list: A list of matching keys.
         """
         try:
-            return self.client.keys(pattern) if self.client else []
+            return list(dict.fromkeys(self.scan_keys(pattern)))
         except redis.ConnectionError as e:
             print(f"Error listing keys: {e}")
             return []
+
+def _with_retries(command, retries, backoff):
+    """
+    Runs a cursor command, retrying it after connection errors.
+
+    SCAN cursors are kept by the client, not the server, so the same call can simply be
+    repeated once the connection pool has reconnected.
+
+    Args:
+        command (function): The call to make.
+        retries (int): How many consecutive failures to tolerate.
+        backoff (float): Seconds to wait after the first failure, doubled after each retry.
+
+    Returns:
+        The command's result.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return command()
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            if attempt == retries:
+                raise
+            delay = backoff * (2 ** attempt)
+            print(f"Lost connection during scan ({e}), retrying in {delay:.1f}s.")
+            time.sleep(delay)
+
+def scan_batches(client, match="*", count=1000, type=None, retries=5, backoff=0.5):
+    """
+    Iterates over the keys matching a pattern with incremental SCAN, one batch per round trip.
+
+    Works with any redis.Redis-compatible client and resumes from the current cursor
+    after a dropped connection. A Redis Cluster is scanned one primary node at a time.
+
+    Args:
+        client (redis.Redis): The client to scan with.
+        match (str, optional): The pattern to match keys. Defaults to '*'.
+        count (int, optional): Hint for the number of keys examined per round trip. Defaults to 1000.
+        type (str, optional): Only return keys of this Redis type, e.g. 'hash'.
+        retries (int, optional): Consecutive connection failures tolerated per batch. Defaults to 5.
+        backoff (float, optional): Initial delay between retries in seconds. Defaults to 0.5.
+
+    Yields:
+        list: The keys returned by each SCAN call. Batches can be empty.
+    """
+    if isinstance(client, RedisCluster):
+        for node in client.get_primaries():
+            yield from scan_batches(
+                client.get_redis_connection(node), match=match, count=count, type=type,
+                retries=retries, backoff=backoff
+            )
+        return
+
+    cursor = 0
+    while True:
+        cursor, keys = _with_retries(
+            lambda: client.scan(cursor=cursor, match=match, count=count, _type=type),
+            retries, backoff
+        )
+        yield keys
+        if cursor == 0:
+            break
+
+def dbsize(client):
+    """
+    Counts the keys in the database, summed over every primary node of a Redis Cluster.
+
+    Args:
+        client (redis.Redis): The client to count with.
+
+    Returns:
+        int: The number of keys.
+    """
+    if isinstance(client, RedisCluster):
+        return client.dbsize(target_nodes=RedisCluster.PRIMARIES)
+    return client.dbsize()
+
+def hscan_batches(client, key, match=None, count=1000, retries=5, backoff=0.5):
+    """
+    Iterates over the fields of a hash with incremental HSCAN, one batch per round trip.
+
+    Args:
+        client (redis.Redis): The client to scan with.
+        key (str): The key of the hash.
+        match (str, optional): Only return fields matching this pattern.
+        count (int, optional): Hint for the number of fields examined per round trip. Defaults to 1000.
+        retries (int, optional): Consecutive connection failures tolerated per batch. Defaults to 5.
+        backoff (float, optional): Initial delay between retries in seconds. Defaults to 0.5.
+
+    Yields:
+        dict: The fields and values returned by each HSCAN call.
+    """
+    cursor = 0
+    while True:
+        cursor, fields = _with_retries(
+            lambda: client.hscan(key, cursor=cursor, match=match, count=count),
+            retries, backoff
+        )
+        yield fields
+        if cursor == 0:
+            break
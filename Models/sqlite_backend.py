@@ -0,0 +1,113 @@
+import sqlite3
+from Models.storage_backend import StorageBackend
+
+class SQLiteBackend(StorageBackend):
+    """
+    Stores every hash in a single SQLite table of (key, field, value) rows.
+
+    The table is clustered on (key, field), so reading one hash or paging through the keys
+    in order are index range scans. Writes are committed when the outermost operation or
+    pipeline finishes, or rolled back if it raises, so a pipelined batch is one SQLite
+    transaction.
+    """
+
+    def __init__(self, path="campsite.db"):
+        """
+        Opens or creates the database.
+
+        Args:
+            path (str, optional): Database file, or ':memory:' for a private in-memory
+                database. Defaults to 'campsite.db'.
+        """
+        super().__init__()
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            # Readers do not block the writer, and commits do not wait for a full fsync
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "key TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (key, field)) WITHOUT ROWID"
+        )
+        self.connection.commit()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self.connection.close()
+
+    def _commit(self):
+        self.connection.commit()
+
+    def _rollback(self):
+        self.connection.rollback()
+
+    def _hset(self, name, fields):
+        existing = set(self._hmget_present(name, list(fields)))
+        self.connection.executemany(
+            "INSERT INTO hashes (key, field, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (key, field) DO UPDATE SET value = excluded.value",
+            [(name, field, value) for field, value in fields.items()]
+        )
+        return sum(1 for field in fields if field not in existing)
+
+    def _hmget_present(self, name, fields):
+        present = []
+        # Stay well under SQLite's limit on query parameters
+        for start in range(0, len(fields), 500):
+            batch = fields[start:start + 500]
+            rows = self.connection.execute(
+                f"SELECT field FROM hashes WHERE key = ? AND field IN ({', '.join('?' * len(batch))})",
+                [name, *batch]
+            )
+            present.extend(field for field, in rows)
+        return present
+
+    def _hget(self, name, field):
+        row = self.connection.execute(
+            "SELECT value FROM hashes WHERE key = ? AND field = ?", (name, field)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _hmget(self, name, fields):
+        stored = self._hgetall(name)
+        return [stored.get(field) for field in fields]
+
+    def _hgetall(self, name):
+        return dict(self.connection.execute("SELECT field, value FROM hashes WHERE key = ?", (name,)))
+
+    def _hdel(self, name, field):
+        return self.connection.execute("DELETE FROM hashes WHERE key = ? AND field = ?", (name, field)).rowcount > 0
+
+    def _exists(self, name):
+        return self.connection.execute("SELECT 1 FROM hashes WHERE key = ? LIMIT 1", (name,)).fetchone() is not None
+
+    def _delete(self, name):
+        return self.connection.execute("DELETE FROM hashes WHERE key = ?", (name,)).rowcount > 0
+
+    def _rename(self, src, dst):
+        self.connection.execute("UPDATE hashes SET key = ? WHERE key = ?", (dst, src))
+
+    def _dbsize(self):
+        return self.connection.execute("SELECT COUNT(DISTINCT key) FROM hashes").fetchone()[0]
+
+    def _flush(self):
+        self.connection.execute("DELETE FROM hashes")
+
+    def _keys_after(self, last, limit):
+        rows = self.connection.execute(
+            "SELECT DISTINCT key FROM hashes WHERE key > ? ORDER BY key LIMIT ?",
+            ('' if last is None else last, -1 if limit is None else limit)
+        )
+        return [key for key, in rows]
+
+    def _fields_after(self, name, last, limit):
+        rows = self.connection.execute(
+            "SELECT field, value FROM hashes WHERE key = ? AND field > ? ORDER BY field LIMIT ?",
+            (name, '' if last is None else last, -1 if limit is None else limit)
+        )
+        return list(rows)
@@ -0,0 +1,33 @@
+from Utils.config import REDIS_SETTINGS, STORAGE_SETTINGS
+
+STORAGE_BACKENDS = ('redis', 'sqlite', 'memory')
+
+def open_storage(backend=None, path=None):
+    """
+    Opens the configured storage backend.
+
+    Every backend offers the Redis hash, key and scan commands the app uses, so Account,
+    DataLoader and the tools work the same on each of them.
+
+    Args:
+        backend (str, optional): 'redis', 'sqlite' or 'memory'. Defaults to STORAGE_SETTINGS['backend'].
+        path (str, optional): SQLite database file. Defaults to STORAGE_SETTINGS['path'].
+
+    Returns:
+        The storage client (a redis.Redis for 'redis'), or None if Redis is unreachable.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    # Each backend is imported only when opened, so tools using SQLite or memory never load redis
+    backend = backend or STORAGE_SETTINGS['backend']
+    if backend == 'redis':
+        from Models.redis_client import RedisClient
+        return RedisClient(**REDIS_SETTINGS).client
+    if backend == 'sqlite':
+        from Models.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(path or STORAGE_SETTINGS['path'])
+    if backend == 'memory':
+        from Models.memory_backend import MemoryBackend
+        return MemoryBackend()
+    raise ValueError(f"Unknown storage backend '{backend}', expected one of {', '.join(STORAGE_BACKENDS)}.")
@@ -0,0 +1,427 @@
+import fnmatch
+import hashlib
+import threading
+from contextlib import contextmanager
+
+# Python equivalents of the Lua scripts the app runs on Redis, keyed by the Lua source
+SCRIPT_FALLBACKS = {}
+
+# Unfinished scans remembered at once; the oldest are forgotten beyond this, as a scan
+# that is abandoned part way never returns its cursor
+MAX_OPEN_CURSORS = 1024
+
+def script_fallback(source):
+    """
+    Registers a Python function as the equivalent of a Lua script for non-Redis backends.
+
+    The function is called as function(storage, keys, args) while the backend is locked, so
+    it runs atomically just like the script would on Redis.
+
+    Args:
+        source (str): The Lua source the function replaces.
+
+    Returns:
+        function: Decorator that registers the function and returns it unchanged.
+    """
+    def register(function):
+        SCRIPT_FALLBACKS[source] = function
+        return function
+    return register
+
+class StorageBackend:
+    """
+    Interface of the hash storage the app needs, with the same method names and return
+    values as redis.Redis created with decode_responses=True.
+
+    Only hashes are stored. Subclasses implement the primitive operations; this class adds
+    cursors for scan/hscan, pipelines, scripts and locking. Every public call holds the
+    backend's lock, so backends can be shared between the UI thread and background workers.
+    """
+
+    def __init__(self):
+        """
+        Initializes the lock and cursor table shared by every backend.
+        """
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._cursors = {}
+        self._next_cursor = 1
+
+    @contextmanager
+    def atomic(self):
+        """
+        Runs a block of operations as one unit: no other thread can interleave with it, its
+        writes are committed once at the end, and if the outermost block raises, every write
+        made inside it is rolled back.
+        """
+        with self._lock:
+            self._depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._rollback()
+                raise
+            self._depth -= 1
+            if self._depth == 0:
+                self._commit()
+
+    def ping(self):
+        """
+        Checks the backend is usable, like PING.
+        """
+        return True
+
+    def hset(self, name, key=None, value=None, mapping=None):
+        """
+        Sets fields of a hash.
+
+        Args:
+            name (str): The key of the hash.
+            key (str, optional): A single field to set.
+            value (str, optional): The value of that field.
+            mapping (dict, optional): Several fields and values to set.
+
+        Returns:
+            int: The number of fields that were added.
+        """
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        if not fields:
+            raise ValueError("hset needs at least one field and value")
+        with self.atomic():
+            return self._hset(name, {field: _encode(value) for field, value in fields.items()})
+
+    def hsetnx(self, name, key, value):
+        """
+        Sets a field of a hash only if it does not exist yet.
+
+        Returns:
+            int: 1 if the field was set, 0 if it already existed.
+        """
+        with self.atomic():
+            if self._hget(name, key) is not None:
+                return 0
+            self._hset(name, {key: _encode(value)})
+            return 1
+
+    def hget(self, name, key):
+        """
+        Reads one field of a hash.
+
+        Returns:
+            str: The value, or None if the hash or field does not exist.
+        """
+        with self.atomic():
+            return self._hget(name, key)
+
+    def hmget(self, name, keys, *args):
+        """
+        Reads several fields of a hash.
+
+        Returns:
+            list: One value per field, None for missing ones.
+        """
+        fields = list(keys) if isinstance(keys, (list, tuple)) else [keys]
+        fields.extend(args)
+        with self.atomic():
+            return self._hmget(name, fields)
+
+    def hgetall(self, name):
+        """
+        Reads every field of a hash.
+
+        Returns:
+            dict: The fields and values, empty if the hash does not exist.
+        """
+        with self.atomic():
+            return self._hgetall(name)
+
+    def hkeys(self, name):
+        """
+        Lists the fields of a hash.
+
+        Returns:
+            list: The field names, empty if the hash does not exist.
+        """
+        return list(self.hgetall(name))
+
+    def hlen(self, name):
+        """
+        Counts the fields of a hash.
+        """
+        return len(self.hgetall(name))
+
+    def hexists(self, name, key):
+        """
+        Checks whether a hash has a field.
+        """
+        return self.hget(name, key) is not None
+
+    def hdel(self, name, *keys):
+        """
+        Deletes fields of a hash; like Redis, a hash left without fields no longer exists.
+
+        Returns:
+            int: The number of fields that were removed.
+        """
+        with self.atomic():
+            return sum(1 for key in set(keys) if self._hdel(name, key))
+
+    def exists(self, *names):
+        """
+        Counts how many of the given keys exist.
+        """
+        # Like Redis, a key named twice is counted twice
+        with self.atomic():
+            return sum(1 for name in names if self._exists(name))
+
+    def delete(self, *names):
+        """
+        Deletes keys.
+
+        Returns:
+            int: The number of keys removed.
+        """
+        with self.atomic():
+            return sum(1 for name in names if self._delete(name))
+
+    def unlink(self, *names):
+        """
+        Deletes keys; the same as delete() here, as nothing is freed in the background.
+        """
+        return self.delete(*names)
+
+    def rename(self, src, dst):
+        """
+        Moves a hash to another key, replacing anything stored there.
+
+        Raises:
+            KeyError: If src does not exist.
+        """
+        with self.atomic():
+            if not self._exists(src):
+                raise KeyError(f"no such key: {src}")
+            self._delete(dst)
+            self._rename(src, dst)
+            return True
+
+    def type(self, name):
+        """
+        Returns the type of a key: 'hash', or 'none' if it does not exist.
+        """
+        return 'hash' if self.exists(name) else 'none'
+
+    def dbsize(self):
+        """
+        Counts the keys.
+        """
+        with self.atomic():
+            return self._dbsize()
+
+    def flushdb(self, *args, **kwargs):
+        """
+        Deletes every key.
+        """
+        with self.atomic():
+            self._flush()
+            self._cursors.clear()
+            return True
+
+    def keys(self, pattern="*"):
+        """
+        Lists the keys matching a pattern. Prefer scan() for large databases.
+        """
+        with self.atomic():
+            return [key for key in self._keys_after(None, None) if fnmatch.fnmatchcase(key, pattern)]
+
+    def scan(self, cursor=0, match=None, count=None, _type=None, **kwargs):
+        """
+        Returns the next batch of keys, like SCAN.
+
+        Keys are walked in sorted order and the cursor remembers the last key returned, so
+        keys added or removed during the scan never make it skip the others. A scan left
+        unfinished is forgotten once MAX_OPEN_CURSORS newer ones are open.
+
+        Returns:
+            tuple: (next cursor, list of keys). The cursor is 0 when the scan is complete.
+        """
+        with self.atomic():
+            cursor, keys = self._page(cursor, count, lambda last, limit: self._keys_after(last, limit))
+            if _type not in (None, 'hash'):
+                keys = []
+            return cursor, [key for key in keys if match is None or fnmatch.fnmatchcase(key, match)]
+
+    def hscan(self, name, cursor=0, match=None, count=None, **kwargs):
+        """
+        Returns the next batch of fields of a hash, like HSCAN.
+
+        Returns:
+            tuple: (next cursor, dict of fields and values).
+        """
+        with self.atomic():
+            cursor, items = self._page(cursor, count, lambda last, limit: self._fields_after(name, last, limit))
+            return cursor, {
+                field: value for field, value in items
+                if match is None or fnmatch.fnmatchcase(field, match)
+            }
+
+    def pipeline(self, transaction=True):
+        """
+        Creates a pipeline that runs the buffered calls together (see BackendPipeline).
+        """
+        return BackendPipeline(self, transaction)
+
+    def register_script(self, source):
+        """
+        Returns a callable that runs the Python fallback registered for a Lua script.
+        """
+        return BackendScript(self, source)
+
+    def script_load(self, source):
+        """
+        Returns the SHA1 of a script, like SCRIPT LOAD. Nothing needs loading here.
+        """
+        return hashlib.sha1(source.encode('utf-8')).hexdigest()
+
+    def close(self):
+        """
+        Releases the backend's resources.
+        """
+        pass
+
+    def _page(self, cursor, count, fetch):
+        count = count or 10
+        last = None
+        if cursor:
+            if cursor not in self._cursors:
+                return 0, []
+            last = self._cursors.pop(cursor)
+        items = fetch(last, count)
+        if len(items) < count:
+            return 0, items
+        next_cursor = self._next_cursor
+        self._next_cursor += 1
+        last_item = items[-1]
+        self._cursors[next_cursor] = last_item[0] if isinstance(last_item, tuple) else last_item
+        # Cursors are numbered in order, so the first entries are the oldest
+        while len(self._cursors) > MAX_OPEN_CURSORS:
+            del self._cursors[next(iter(self._cursors))]
+        return next_cursor, items
+
+    def _commit(self):
+        pass
+
+    def _rollback(self):
+        """
+        Discards every write made since the last commit.
+        """
+        raise NotImplementedError
+
+    def _hset(self, name, fields):
+        raise NotImplementedError
+
+    def _hget(self, name, field):
+        raise NotImplementedError
+
+    def _hmget(self, name, fields):
+        return [self._hget(name, field) for field in fields]
+
+    def _hgetall(self, name):
+        raise NotImplementedError
+
+    def _hdel(self, name, field):
+        raise NotImplementedError
+
+    def _exists(self, name):
+        raise NotImplementedError
+
+    def _delete(self, name):
+        raise NotImplementedError
+
+    def _rename(self, src, dst):
+        raise NotImplementedError
+
+    def _dbsize(self):
+        raise NotImplementedError
+
+    def _flush(self):
+        raise NotImplementedError
+
+    def _keys_after(self, last, limit):
+        """
+        Returns up to `limit` keys sorted after `last` (all keys if limit is None).
+        """
+        raise NotImplementedError
+
+    def _fields_after(self, name, last, limit):
+        """
+        Returns up to `limit` (field, value) pairs of a hash, sorted after the field `last`.
+        """
+        raise NotImplementedError
+
+class BackendPipeline:
+    """
+    Buffers backend calls and runs them together, mirroring redis.client.Pipeline.
+
+    The calls run one after another inside a single atomic() block, whether or not
+    transaction is set: no other thread can interleave with them, and if any call raises,
+    the writes of the calls before it are rolled back and the error is raised from
+    execute(), so nothing of the batch is stored.
+    """
+
+    def __init__(self, backend, transaction=True):
+        self.backend = backend
+        self.transaction = transaction
+        self.queued = []
+
+    def __getattr__(self, name):
+        if name.startswith('_') or not callable(getattr(self.backend, name, None)):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self.queued.append((getattr(self.backend, name), args, kwargs))
+            return self
+        return queue
+
+    def __len__(self):
+        return len(self.queued)
+
+    def execute(self):
+        queued, self.queued = self.queued, []
+        with self.backend.atomic():
+            return [command(*args, **kwargs) for command, args, kwargs in queued]
+
+    def reset(self):
+        self.queued = []
+
+class BackendScript:
+    """
+    Runs the Python fallback registered for a Lua script, mirroring redis.commands.core.Script.
+    """
+
+    def __init__(self, backend, source):
+        if source not in SCRIPT_FALLBACKS:
+            raise NotImplementedError("No Python fallback is registered for this script.")
+        self.backend = backend
+        self.source = source
+        self.function = SCRIPT_FALLBACKS[source]
+
+    def __call__(self, keys=None, args=None, client=None):
+        keys, args = list(keys or []), [_encode(arg) for arg in args or []]
+        if isinstance(client, BackendPipeline):
+            client.queued.append((self._run, (keys, args), {}))
+            return client
+        return self._run(keys, args)
+
+    def _run(self, keys, args):
+        with self.backend.atomic():
+            return self.function(self.backend, keys, args)
+
+def _encode(value):
+    # Store values the way Redis returns them with decode_responses=True
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return str(value)
@@ -3,9 +3,9 @@ from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.textinput import TextInput
 from kivy.uix.label import Label
-from kivy.uix.image import Image
 from kivy.app import App
-from GUI.gui_helpers import create_button, show_popup, create_exit_button, create_help_button
+from GUI.gui_helpers import create_button, show_popup, create_exit_button, create_help_button, require_backend, create_background
+from GUI.task_runner import get_task_runner
 
 class CreateAccountScreen(Screen):
     """
@@ -28,7 +28,7 @@ class CreateAccountScreen(Screen):
         layout = FloatLayout()
 
         # Set the background image
-        self.background = Image(source="Assets/background.jpg", allow_stretch=True, keep_ratio=False)
+        self.background = create_background()
         layout.add_widget(self.background)
 
         # Layout for the form inputs and buttons
@@ -87,8 +87,10 @@ class CreateAccountScreen(Screen):
         form_layout.add_widget(self.security_answer_input)
 
         # Add submit and navigation buttons
-        form_layout.add_widget(create_button("Submit", (1, 0.1), {}, self.handle_create_account))
-        form_layout.add_widget(create_button("Back to Main Menu", (1, 0.1), {}, self.go_back_to_main))
+        self.submit_button = create_button("Submit", (1, 0.1), {}, self.handle_create_account)
+        self.back_button = create_button("Back to Main Menu", (1, 0.1), {}, self.go_back_to_main)
+        form_layout.add_widget(self.submit_button)
+        form_layout.add_widget(self.back_button)
 
         # Add form layout and other navigation buttons to the main layout
         layout.add_widget(form_layout)
@@ -109,17 +111,33 @@ class CreateAccountScreen(Screen):
     def handle_create_account(self, instance):
         """
         Handles the account creation process by gathering input data
-        and passing it to the logic handler.
+        and passing it to the logic handler on a worker thread.
         """
+        if not require_backend(self.logic):
+            return
+
         login_name = self.login_input.text
         password = self.password_input.text
         first_name = self.first_name_input.text
         security_question = self.security_question_input.text
         security_answer = self.security_answer_input.text
 
-        success, message = self.logic.create_account(
-            login_name, password, first_name, security_question, security_answer
+        get_task_runner().submit(
+            'create_account', self.logic.create_account,
+            login_name, password, first_name, security_question, security_answer,
+            on_done=self.on_create_account_done,
+            busy_button=self.submit_button,
+            disable=[self.back_button]
         )
+
+    def on_create_account_done(self, result):
+        """
+        Show the outcome of an account creation attempt.
+
+        Args:
+            result (tuple): (bool, str) - Success status and message from the logic handler.
+        """
+        success, message = result
         show_popup("Success" if success else "Error", message)
 
     def go_back_to_main(self, instance):
@@ -3,9 +3,9 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
-from kivy.uix.image import Image
 from kivy.app import App
-from GUI.gui_helpers import create_button, show_popup, create_exit_button, create_help_button
+from GUI.gui_helpers import create_button, show_popup, create_exit_button, create_help_button, require_backend, create_background
+from GUI.task_runner import get_task_runner
 
 class ForgotPasswordScreen(Screen):
     """
@@ -29,7 +29,7 @@ class ForgotPasswordScreen(Screen):
         layout = FloatLayout()
 
         # Set the background image
-        self.background = Image(source="Assets/background.jpg", allow_stretch=True, keep_ratio=False)
+        self.background = create_background()
         layout.add_widget(self.background)
 
         # Layout for input fields and buttons
@@ -94,43 +94,25 @@ class ForgotPasswordScreen(Screen):
     def handle_submit(self, instance):
         """
         Handles form submissions based on the current stage of the process.
+
+        Each stage's database work runs on a worker thread, and the matching
+        on_*_done method continues the process once it finishes.
         """
+        if not require_backend(self.logic):
+            return
+
         if self.stage == 1:
             #Verify login name and fetch the security question
             login_name = self.login_input.text
-            security_question, error_message = self.logic.handle_forgot_password(login_name)
-
-            if error_message:
-                show_popup("Error", error_message)
-            else:
-                # If the security question is missing, use a default question
-                if not security_question:
-                    security_question = "What is the name of your first pet?"
-
-                #Display the security question
-                self.stage = 2
-                self.title_label.text = security_question
-                self.remove_widget_from_parent(self.login_input)
-                self.form_layout.clear_widgets([self.submit_button, self.back_button])
-                self.form_layout.add_widget(self.security_answer_input)
-                self.form_layout.add_widget(self.submit_button)
-                self.form_layout.add_widget(self.back_button)
+            self.run_task(self.logic.handle_forgot_password, login_name, on_done=self.on_question_done)
 
         elif self.stage == 2:
             #Validate the security answer
             user_answer = self.security_answer_input.text
-            if self.logic.verify_security_answer(self.login_input.text, user_answer):
-                #Reset password
-                self.stage = 3
-                self.title_label.text = "Reset Your Password"
-                self.remove_widget_from_parent(self.security_answer_input)
-                self.form_layout.clear_widgets([self.submit_button, self.back_button])
-                self.form_layout.add_widget(self.new_password_input)
-                self.form_layout.add_widget(self.confirm_password_input)
-                self.form_layout.add_widget(self.submit_button)
-                self.form_layout.add_widget(self.back_button)
-            else:
-                show_popup("Error", "Incorrect security answer.")
+            self.run_task(
+                self.logic.verify_security_answer, self.login_input.text, user_answer,
+                on_done=self.on_answer_done
+            )
 
         elif self.stage == 3:
             # Update the password
@@ -140,10 +122,85 @@ class ForgotPasswordScreen(Screen):
                 show_popup("Error", "Passwords do not match.")
                 return
 
-            success, message = self.logic.reset_password(self.login_input.text, new_password)
-            show_popup("Success" if success else "Error", message)
-            if success:
-                self.go_back_to_main(None)
+            self.run_task(
+                self.logic.reset_password, self.login_input.text, new_password,
+                on_done=self.on_reset_done
+            )
+
+    def run_task(self, func, *args, on_done):
+        """
+        Run a logic call on a worker thread with the form buttons disabled.
+
+        Args:
+            func (function): The logic method to call.
+            *args: Arguments passed to the method.
+            on_done (function): Called on the UI thread with the method's result.
+        """
+        get_task_runner().submit(
+            'forgot_password', func, *args,
+            on_done=on_done,
+            busy_button=self.submit_button,
+            disable=[self.back_button]
+        )
+
+    def on_question_done(self, result):
+        """
+        Show the security question, or the error if the account could not be found.
+
+        Args:
+            result (tuple): (str, str) - The security question and an error message if applicable.
+        """
+        security_question, error_message = result
+
+        if error_message:
+            show_popup("Error", error_message)
+        else:
+            # If the security question is missing, use a default question
+            if not security_question:
+                security_question = "What is the name of your first pet?"
+
+            #Display the security question
+            self.stage = 2
+            self.title_label.text = security_question
+            self.remove_widget_from_parent(self.login_input)
+            self.form_layout.clear_widgets([self.submit_button, self.back_button])
+            self.form_layout.add_widget(self.security_answer_input)
+            self.form_layout.add_widget(self.submit_button)
+            self.form_layout.add_widget(self.back_button)
+
+    def on_answer_done(self, result):
+        """
+        Move on to the password fields if the security answer was correct.
+
+        Args:
+            result (tuple): (bool, str) - Whether the security answer matched, and the
+                message to show otherwise, such as a rate limit rejection.
+        """
+        is_correct, message = result
+        if is_correct:
+            #Reset password
+            self.stage = 3
+            self.title_label.text = "Reset Your Password"
+            self.remove_widget_from_parent(self.security_answer_input)
+            self.form_layout.clear_widgets([self.submit_button, self.back_button])
+            self.form_layout.add_widget(self.new_password_input)
+            self.form_layout.add_widget(self.confirm_password_input)
+            self.form_layout.add_widget(self.submit_button)
+            self.form_layout.add_widget(self.back_button)
+        else:
+            show_popup("Error", message)
+
+    def on_reset_done(self, result):
+        """
+        Show the outcome of the password reset and return to the main menu on success.
+
+        Args:
+            result (tuple): (bool, str) - Success status and message from the logic handler.
+        """
+        success, message = result
+        show_popup("Success" if success else "Error", message)
+        if success:
+            self.go_back_to_main(None)
 
     def go_back_to_main(self, instance):
         """
@@ -1,11 +1,11 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.label import Label
-from kivy.uix.image import Image
 from kivy.app import App
 from kivy.uix.button import Button
 from kivy.uix.boxlayout import BoxLayout
 from kivy.graphics import Color, Rectangle
+from GUI.gui_helpers import create_background
 
 class InfoScreen(Screen):
     """
@@ -23,7 +23,7 @@ class InfoScreen(Screen):
         layout = FloatLayout()
 
         # Set the background image
-        self.background = Image(source="Assets/background.jpg", allow_stretch=True)
+        self.background = create_background(keep_ratio=True)
         layout.add_widget(self.background)
 
         # BoxLayout for the text with a semi-transparent background
@@ -3,9 +3,9 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
-from kivy.uix.image import Image
 from kivy.app import App
-from GUI.gui_helpers import create_button, show_popup, create_exit_button, create_help_button
+from GUI.gui_helpers import create_button, show_popup, create_exit_button, create_help_button, require_backend, create_background
+from GUI.task_runner import get_task_runner
 
 class LoginScreen(Screen):
     """
@@ -28,7 +28,7 @@ class LoginScreen(Screen):
         layout = FloatLayout()
 
         # Set the background image
-        self.background = Image(source="Assets/background.jpg", allow_stretch=True, keep_ratio=False)
+        self.background = create_background()
         layout.add_widget(self.background)
 
         # Create a form layout for login inputs and buttons
@@ -61,8 +61,10 @@ class LoginScreen(Screen):
         # Add input fields and buttons to the form layout
         form_layout.add_widget(self.login_input)
         form_layout.add_widget(self.password_input)
-        form_layout.add_widget(create_button("Submit", (1, 0.1), {}, self.handle_login))
-        form_layout.add_widget(create_button("Back to Main Menu", (1, 0.1), {}, self.go_back_to_main))
+        self.submit_button = create_button("Submit", (1, 0.1), {}, self.handle_login)
+        self.back_button = create_button("Back to Main Menu", (1, 0.1), {}, self.go_back_to_main)
+        form_layout.add_widget(self.submit_button)
+        form_layout.add_widget(self.back_button)
 
         # Add the form layout to the main layout
         layout.add_widget(form_layout)
@@ -77,10 +79,30 @@ class LoginScreen(Screen):
     def handle_login(self, instance):
         """
         Process the login attempt using the provided credentials.
+
+        The check runs on a worker thread so the window stays responsive while the
+        password is verified.
         """
+        if not require_backend(self.logic):
+            return
+
         login_name = self.login_input.text
         password = self.password_input.text
-        success, message = self.logic.login(login_name, password)
+        get_task_runner().submit(
+            'login', self.logic.login, login_name, password,
+            on_done=self.on_login_done,
+            busy_button=self.submit_button,
+            disable=[self.back_button]
+        )
+
+    def on_login_done(self, result):
+        """
+        Show the outcome of a login attempt.
+
+        Args:
+            result (tuple): (bool, str) - Success status and message from the logic handler.
+        """
+        success, message = result
         show_popup("Success" if success else "Error", message)
 
     def go_back_to_main(self, instance):
@@ -1,8 +1,7 @@
 from kivy.uix.screenmanager import Screen
 from kivy.uix.floatlayout import FloatLayout
-from kivy.uix.image import Image
 from kivy.app import App
-from GUI.gui_helpers import create_button, create_exit_button, create_help_button
+from GUI.gui_helpers import create_button, create_exit_button, create_help_button, create_label, create_background
 
 class MainMenuScreen(Screen):
     """
@@ -23,7 +22,7 @@ class MainMenuScreen(Screen):
         layout = FloatLayout()
 
         # Set the background image
-        self.background = Image(source="Assets/background.jpg", allow_stretch=True, keep_ratio=False)
+        self.background = create_background()
         layout.add_widget(self.background)
 
         # Add navigation buttons with associated actions and icons
@@ -38,9 +37,24 @@ class MainMenuScreen(Screen):
         layout.add_widget(create_exit_button(self.exit_app))
         layout.add_widget(create_help_button(self.go_to_info))
 
+        # Show the backend startup progress until the database is ready
+        self.status_label = create_label("Connecting to the database...", font_size=18)
+        self.status_label.size_hint = (1, 0.05)
+        self.status_label.pos_hint = {'x': 0, 'y': 0.12}
+        layout.add_widget(self.status_label)
+
         # Add the layout to the screen
         self.add_widget(layout)
 
+    def set_status(self, message):
+        """
+        Update the backend status shown under the navigation buttons.
+
+        Args:
+            message (str): The status message to display.
+        """
+        self.status_label.text = message
+
     def go_to_create_account(self, instance):
         """Navigate to the Create Account screen."""
         self.manager.current = 'create_account'
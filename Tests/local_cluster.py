@@ -0,0 +1,106 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import redis
+
+# Path of the redis-server binary used to start test clusters
+REDIS_SERVER = os.environ.get('CAMPSITE_REDIS_SERVER') or shutil.which('redis-server')
+
+HASH_SLOTS = 16384
+
+class LocalCluster:
+    """
+    Starts a throwaway Redis Cluster of primary nodes on localhost for integration tests.
+
+    Each node runs as its own redis-server process in a temporary directory. The slots
+    are split evenly between the nodes and the nodes are introduced to each other with
+    CLUSTER MEET, so no redis-cli is needed.
+    """
+
+    def __init__(self, nodes=3, base_port=None):
+        """
+        Initializes the cluster settings. Call start() to launch it.
+
+        Args:
+            nodes (int, optional): Number of primary nodes. Defaults to 3.
+            base_port (int, optional): Port of the first node; the others follow it.
+                Defaults to a port derived from the process id.
+        """
+        self.node_count = nodes
+        self.base_port = base_port or 20000 + (os.getpid() % 1000) * 10
+        self.ports = [self.base_port + i for i in range(nodes)]
+        self.processes = []
+        self.directory = None
+
+    def start(self, timeout=20):
+        """
+        Launches the nodes, assigns the slots and waits until the cluster reports ok.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the cluster to form. Defaults to 20.
+
+        Returns:
+            LocalCluster: This cluster, so it can be used as `LocalCluster().start()`.
+        """
+        self.directory = tempfile.mkdtemp(prefix="campsite-cluster-")
+        for port in self.ports:
+            node_directory = os.path.join(self.directory, str(port))
+            os.makedirs(node_directory)
+            self.processes.append(subprocess.Popen(
+                [REDIS_SERVER, '--port', str(port), '--cluster-enabled', 'yes',
+                 '--cluster-config-file', 'nodes.conf', '--save', '', '--appendonly', 'no',
+                 '--dir', node_directory],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            ))
+
+        clients = [redis.Redis(port=port) for port in self.ports]
+        self._wait(lambda: all(client.ping() for client in clients), timeout)
+
+        per_node = HASH_SLOTS // self.node_count
+        for index, client in enumerate(clients):
+            first = index * per_node
+            last = HASH_SLOTS if index == self.node_count - 1 else first + per_node
+            client.execute_command('CLUSTER ADDSLOTS', *range(first, last))
+        for client in clients[1:]:
+            client.execute_command('CLUSTER MEET', '127.0.0.1', self.ports[0])
+
+        def formed():
+            # redis-py parses both replies into dictionaries
+            return all(
+                client.execute_command('CLUSTER INFO')['cluster_state'] == 'ok'
+                and len(client.execute_command('CLUSTER NODES')) == self.node_count
+                for client in clients
+            )
+
+        self._wait(formed, timeout)
+        for client in clients:
+            client.close()
+        return self
+
+    def stop(self):
+        """
+        Stops every node and removes their data.
+        """
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.wait(timeout=10)
+        self.processes = []
+        if self.directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.directory = None
+
+    @staticmethod
+    def _wait(condition, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if condition():
+                    return
+            except redis.ConnectionError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError("The local Redis Cluster did not start in time.")
+            time.sleep(0.1)
@@ -0,0 +1,212 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+import migrate_account_keys
+from Models.account import Account
+from Models.account_filter import AccountFilter
+from Models.account_keys import legacy_account_key
+from Models.compact_accounts import CompactAccountRepository
+from Models.cuckoo_filter import CuckooFilter
+from Models.password_policy import PasswordPolicy
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+from Utils.data_loader import DataLoader
+
+class TestCuckooFilter(unittest.TestCase):
+    """
+    Unit tests for the cuckoo filter behind the account filter.
+    """
+
+    def test_added_items_are_found_and_removed_items_are_not(self):
+        """
+        Test that the filter never misses an item it holds, and forgets removed items.
+        """
+        accounts = CuckooFilter(2000)
+        names = [f"user{i}@gmail.com" for i in range(2000)]
+        for name in names:
+            self.assertTrue(accounts.add(name))
+        self.assertEqual(len(accounts), 2000)
+        self.assertTrue(all(name in accounts for name in names))
+
+        for name in names[:1000]:
+            self.assertTrue(accounts.remove(name))
+        self.assertTrue(all(name in accounts for name in names[1000:]))
+        self.assertLess(sum(name in accounts for name in names[:1000]), 5)
+
+    def test_false_positive_rate_is_low(self):
+        """
+        Test that names that were never added are almost always reported absent.
+        """
+        accounts = CuckooFilter(10000)
+        for i in range(10000):
+            accounts.add(f"user{i}@gmail.com")
+        false_positives = sum(f"other{i}@gmail.com" in accounts for i in range(20000))
+        self.assertLessEqual(false_positives / 20000, 4 * accounts.false_positive_rate)
+
+class TestAccountFilter(unittest.TestCase):
+    """
+    Tests that the account filter answers for unknown accounts without a round trip.
+    """
+
+    def setUp(self):
+        """
+        Store one account, then start a filter and an Account manager that uses it.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.policy = PasswordPolicy(bcrypt_rounds=4)
+        Account(self.storage, self.policy).register("user@gmail.com", "pw", "User", "pet", "Rex")
+
+        self.account_filter = AccountFilter(self.storage, retry_interval=0.1)
+        self.addCleanup(self.account_filter.stop)
+        self.account_filter.start()
+        self.account_manager = Account(self.storage, self.policy, account_filter=self.account_filter)
+        self.repository = self.account_manager.repository
+
+    def test_unknown_account_costs_no_round_trip(self):
+        """
+        Test that lookups for an account that was never registered are answered locally.
+        """
+        self.assertFalse(self.account_manager.login("nobody@gmail.com", "pw"))
+        self.assertFalse(self.repository.exists("nobody@gmail.com"))
+        self.assertIsNone(self.repository.get_account("nobody@gmail.com"))
+
+        self.assertEqual(sum(self.repository.round_trips.values()), 0)
+        self.assertEqual(self.account_filter.stats()['lookups'], {'absent': 3})
+
+    def test_existing_account_is_still_read(self):
+        """
+        Test that the filter lets lookups for stored accounts through to the database.
+        """
+        self.assertTrue(self.account_manager.login("user@gmail.com", "pw"))
+        self.assertEqual(self.repository.round_trips['get_password_hash'], 1)
+        self.assertEqual(self.account_filter.stats()['lookups'], {'maybe': 1})
+
+    def test_created_and_deleted_accounts_update_the_filter(self):
+        """
+        Test that the filter follows accounts created and deleted through the repository.
+        """
+        self.assertFalse(self.account_filter.might_exist("new@gmail.com"))
+        self.assertTrue(self.account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")[0])
+        self.assertTrue(self.account_manager.login("new@gmail.com", "pw"))
+
+        self.assertTrue(self.repository.delete("new@gmail.com"))
+        self.assertFalse(self.repository.delete("new@gmail.com"))
+        self.assertFalse(self.account_filter.might_exist("new@gmail.com"))
+        self.assertEqual(self.account_filter.stats()['accounts'], 1)
+
+    def test_false_positives_are_counted(self):
+        """
+        Test that a "maybe" answer for a missing account is reported as a false positive.
+        """
+        self.account_filter._filter.add("ghost@gmail.com")
+        self.assertIsNone(self.repository.get_password_hash("ghost@gmail.com"))
+
+        stats = self.account_filter.stats()
+        self.assertEqual(stats['lookups'], {'maybe': 1, 'false_positive': 1})
+        self.assertEqual(stats['false_positive_rate'], 1.0)
+
+    def test_rebuild_picks_up_legacy_and_external_accounts(self):
+        """
+        Test that a rebuild indexes accounts written without going through the filter.
+        """
+        self.storage.hset(legacy_account_key("old@gmail.com"), mapping={'password': "x"})
+        self.assertFalse(self.account_filter.might_exist("old@gmail.com"))
+        self.assertTrue(self.account_filter.rebuild())
+        self.assertTrue(self.account_filter.might_exist("old@gmail.com"))
+
+    def test_rebuild_picks_up_compact_accounts(self):
+        """
+        Test that a rebuild indexes every account held in a compact bucket.
+        """
+        repository = CompactAccountRepository(self.storage, buckets=1)
+        repository.create("first@gmail.com", {'password': "x"})
+        repository.create("second@gmail.com", {'password': "x"})
+        self.assertTrue(self.account_filter.rebuild())
+        self.assertTrue(self.account_filter.might_exist("first@gmail.com"))
+        self.assertTrue(self.account_filter.might_exist("second@gmail.com"))
+
+    def test_rebuild_ignores_deletions_of_accounts_it_did_not_scan(self):
+        """
+        Test that a deletion announced during a rebuild cannot remove another account's fingerprint.
+        """
+        locate = CuckooFilter._locate
+
+        def colliding_locate(accounts, item):
+            # Gives the deleted account the same fingerprint and bucket as the stored one
+            return locate(accounts, "user@gmail.com" if item == "gone@gmail.com" else item)
+
+        def scan_with_deletion(*args, **kwargs):
+            with self.account_filter._lock:
+                self.account_filter._record('deleted', "gone@gmail.com")
+            yield from scan_batches(*args, **kwargs)
+
+        with patch.object(CuckooFilter, '_locate', colliding_locate), \
+                patch('Models.account_filter.scan_batches', side_effect=scan_with_deletion):
+            self.assertTrue(self.account_filter.rebuild())
+            self.assertTrue(self.account_filter.might_exist("user@gmail.com"))
+
+    def test_stopped_filter_is_bypassed(self):
+        """
+        Test that a filter that is not running lets every lookup through.
+        """
+        self.account_filter.stop()
+        self.assertTrue(self.account_filter.might_exist("nobody@gmail.com"))
+        self.assertEqual(self.account_filter.stats()['lookups'], {'bypassed': 1})
+
+    def test_changes_reach_other_instances(self):
+        """
+        Test that an account created through one app instance is visible to another's filter.
+        """
+        if not hasattr(self.storage, 'pubsub'):
+            self.skipTest("the storage backend has no publish/subscribe")
+        other_filter = AccountFilter(self.storage)
+        self.addCleanup(other_filter.stop)
+        other_filter.start()
+
+        self.account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")
+        deadline = time.monotonic() + 5
+        while not other_filter.might_exist("new@gmail.com") and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertTrue(other_filter.might_exist("new@gmail.com"))
+
+    def test_bulk_writes_rebuild_other_instances(self):
+        """
+        Test that accounts stored by the data loader or moved by the key migration are
+        picked up by running filters.
+        """
+        if not hasattr(self.storage, 'pubsub'):
+            self.skipTest("the storage backend has no publish/subscribe")
+        other_filter = AccountFilter(self.storage, legacy_fallback=False)
+        self.addCleanup(other_filter.stop)
+        other_filter.start()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        csv_file = os.path.join(directory.name, "accounts.csv")
+        with open(csv_file, 'w') as file:
+            file.write("username,password,firstname,first dogs name\nloaded@gmail.com,pw,Lou,Rex\n")
+        DataLoader(self.storage).load_initial_data(csv_file)
+        self.assertTrue(self.wait_until_present(other_filter, "loaded@gmail.com"))
+
+        self.storage.hset(legacy_account_key("old@gmail.com"), mapping={'password': "x"})
+        self.assertTrue(other_filter.rebuild())
+        self.assertFalse(other_filter.might_exist("old@gmail.com"))
+        migrate_account_keys.migrate_account_keys(redis_client=self.storage)
+        self.assertTrue(self.wait_until_present(other_filter, "old@gmail.com"))
+
+    def wait_until_present(self, account_filter, login_name):
+        """
+        Polls a filter for up to five seconds until it reports the account.
+        """
+        deadline = time.monotonic() + 5
+        while not account_filter.might_exist(login_name) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return account_filter.might_exist(login_name)
+
+if __name__ == '__main__':
+    unittest.main()
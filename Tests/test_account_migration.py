@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch
+from migrate_account_keys import migrate_account_keys as migrate, migration_progress
+from Models.account_keys import MIGRATION_PROGRESS_KEY, account_key
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+class TestAccountMigration(unittest.TestCase):
+    """
+    Unit tests for the tool that moves accounts to namespaced keys.
+    """
+
+    def setUp(self):
+        """
+        Store legacy accounts, one already rewritten by the app, and unrelated data.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+        for i in range(12):
+            self.storage.hset(f"user{i}@example.com", mapping={'password': f"hash{i}", 'first_name': f"Name{i}"})
+        self.storage.hset(account_key("user0@example.com"), mapping={'password': "newer"})
+        self.storage.hset("loader:manifest", mapping={'salt': "00"})
+        self.storage.hset("settings", mapping={'theme': "dark"})
+
+    def snapshot(self):
+        """
+        Reads every hash in the database.
+        """
+        return {key: self.storage.hgetall(key) for key in self.storage.keys()}
+
+    def test_accounts_are_moved_in_pipelined_batches(self):
+        """
+        Test that every legacy account is moved and each batch costs one pipelined round trip.
+        """
+        batches = []
+
+        def record_batches(*args, **kwargs):
+            for keys in scan_batches(*args, **kwargs):
+                batches.append(keys)
+                yield keys
+
+        with patch('migrate_account_keys.scan_batches', side_effect=record_batches), \
+                patch.object(self.storage, 'pipeline', wraps=self.storage.pipeline) as pipelines:
+            progress = migrate(batch_size=5, redis_client=self.storage)
+
+        for i in range(1, 12):
+            self.assertFalse(self.storage.exists(f"user{i}@example.com"))
+            self.assertEqual(self.storage.hget(account_key(f"user{i}@example.com"), 'first_name'), f"Name{i}")
+        self.assertEqual(self.storage.hgetall("settings"), {'theme': "dark"})
+        self.assertEqual(self.storage.hgetall("loader:manifest"), {'salt': "00"})
+        self.assertEqual(progress['status'], "complete")
+        self.assertEqual(progress['migrated'], 11)
+        self.assertGreater(len(batches), 1)
+        self.assertLessEqual(pipelines.call_count, len(batches))
+
+    def test_newer_namespaced_account_wins(self):
+        """
+        Test that an account already written under the new key is not overwritten by its legacy copy.
+        """
+        progress = migrate(batch_size=5, redis_client=self.storage)
+        self.assertEqual(progress['dropped'], 1)
+        self.assertEqual(self.storage.hgetall(account_key("user0@example.com")), {'password': "newer"})
+        self.assertFalse(self.storage.exists("user0@example.com"))
+
+    def test_dry_run_changes_nothing(self):
+        """
+        Test that a dry run counts the legacy keys without moving them or recording progress.
+        """
+        before = self.snapshot()
+        progress = migrate(batch_size=5, dry_run=True, redis_client=self.storage)
+        self.assertEqual(progress['migrated'], 13)
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(migration_progress(self.storage)['status'], "not started")
+
+    def test_progress_is_recorded_after_each_batch(self):
+        """
+        Test that the progress counter is stored in Redis while the migration runs.
+        """
+        seen = []
+        original_hset = self.storage.hset
+
+        def record_progress(name, key=None, value=None, mapping=None):
+            if name == MIGRATION_PROGRESS_KEY and mapping and 'scanned' in mapping:
+                seen.append(int(mapping['scanned']))
+            return original_hset(name, key, value, mapping=mapping)
+
+        with patch.object(self.storage, 'hset', side_effect=record_progress):
+            migrate(batch_size=5, redis_client=self.storage)
+        self.assertGreater(len(seen), 1)
+        self.assertEqual(seen, sorted(seen))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+import bcrypt
+from Models.account_keys import account_key
+from Models.account import Account
+from Models.password_policy import PasswordPolicy
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+class TestAccountRoundTrips(unittest.TestCase):
+    """
+    Tests that each account operation costs a single Redis round trip.
+    """
+
+    def setUp(self):
+        """
+        Create an Account manager on an empty database with one stored account.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+        self.account_manager = Account(self.storage, PasswordPolicy(bcrypt_rounds=4))
+        self.account_manager.register("test@gmail.com", "testpw123", "Harrison", "cat's name", "Percy")
+        self.repository = self.account_manager.repository
+        self.repository.reset_stats()
+
+    def test_register_is_one_atomic_round_trip(self):
+        """
+        Test that registering checks for an existing account and creates it in one round trip.
+        """
+        success, _ = self.account_manager.register("new@gmail.com", "pw", "New", "pet?", "Rex")
+        self.assertTrue(success)
+        self.assertEqual(self.repository.round_trips, {'create': 1})
+        self.assertEqual(self.storage.hget(account_key("new@gmail.com"), 'security_question'), "pet?")
+
+    def test_register_existing_account_fails(self):
+        """
+        Test that registering an existing login name fails without overwriting it.
+        """
+        success, message = self.account_manager.register("test@gmail.com", "other", "Other", "q?", "a")
+        self.assertFalse(success)
+        self.assertEqual(message, "Account already exists.")
+        self.assertEqual(self.storage.hget(account_key("test@gmail.com"), 'first_name'), "Harrison")
+        self.assertEqual(self.repository.round_trips, {'create': 1})
+
+    def test_login_is_one_round_trip(self):
+        """
+        Test that a login, successful or not, reads Redis once.
+        """
+        self.assertTrue(self.account_manager.login("test@gmail.com", "testpw123"))
+        self.assertFalse(self.account_manager.login("missing@gmail.com", "testpw123"))
+        self.assertEqual(self.repository.round_trips, {'get_password_hash': 2})
+
+    def test_forgot_password_reads_account_once(self):
+        """
+        Test that a password reset costs one read and one write.
+        """
+        result = self.account_manager.forgot_password("test@gmail.com", "Percy", "newpw", "newpw")
+        self.assertTrue(result)
+        self.assertEqual(self.repository.round_trips, {'get_account': 1, 'update': 1})
+
+class TestLegacyAccountKeys(unittest.TestCase):
+    """
+    Tests that accounts stored under legacy bare keys keep working during the key migration.
+    """
+
+    def setUp(self):
+        """
+        Store one account under its legacy key only.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+        self.account_manager = Account(self.storage, PasswordPolicy(bcrypt_rounds=4))
+        hashed_password = bcrypt.hashpw(b"oldpw", bcrypt.gensalt(4)).decode('utf-8')
+        self.storage.hset("legacy@gmail.com", mapping={
+            'password': hashed_password, 'first_name': "Legacy", 'security_answer': "Rex"
+        })
+
+    def test_reads_fall_back_to_legacy_key_in_one_round_trip(self):
+        """
+        Test that a login finds a legacy account with a single round trip.
+        """
+        self.assertTrue(self.account_manager.login("legacy@gmail.com", "oldpw"))
+        self.assertEqual(self.account_manager.repository.round_trips, {'get_password_hash': 1})
+
+    def test_register_refuses_legacy_login_name(self):
+        """
+        Test that an account cannot be created when the login name exists under the legacy key.
+        """
+        success, _ = self.account_manager.register("legacy@gmail.com", "pw", "New", "pet?", "Max")
+        self.assertFalse(success)
+        self.assertFalse(self.storage.exists(account_key("legacy@gmail.com")))
+
+    def test_update_moves_legacy_account_to_new_key(self):
+        """
+        Test that resetting a password moves the whole legacy account to the namespaced key.
+        """
+        self.assertTrue(self.account_manager.forgot_password("legacy@gmail.com", "Rex", "newpw", "newpw"))
+        self.assertFalse(self.storage.exists("legacy@gmail.com"))
+        self.assertEqual(self.storage.hget(account_key("legacy@gmail.com"), 'first_name'), "Legacy")
+        self.assertTrue(self.account_manager.login("legacy@gmail.com", "newpw"))
+
+    def test_update_of_missing_account_writes_nothing(self):
+        """
+        Test that updating an account that does not exist does not create a partial one.
+        """
+        self.assertFalse(self.account_manager.repository.update("missing@gmail.com", {'password': "x"}))
+        self.assertEqual(self.storage.keys(), ["legacy@gmail.com"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import asyncio
+import time
+import unittest
+from Benchmarks.load_test import HTTPClient
+from Logic.account_http import AccountHTTPServer
+from Logic.account_service import AccountService, ServiceBusy
+from Models.account_filter import AccountFilter
+from Models.account_repository import AccountRepository
+from Models.async_storage import AsyncStorageAdapter, close_async_storage, open_async_storage
+from Models.password_policy import PasswordPolicy
+from Models.rate_limiter import AsyncRateLimiter
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+ACCOUNT = {
+    'login_name': "user@gmail.com",
+    'password': "pw",
+    'first_name': "User",
+    'security_question': "pet",
+    'security_answer': "Rex"
+}
+
+class TestAccountService(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests the asyncio account service through its HTTP endpoint.
+    """
+
+    async def asyncSetUp(self):
+        """
+        Start a service with a fast password policy and a strict login limit on an empty database.
+        """
+        if TEST_STORAGE_BACKEND == 'redis':
+            self.storage = await open_async_storage('redis')
+        else:
+            self.storage = AsyncStorageAdapter(open_storage(TEST_STORAGE_BACKEND))
+        await self.storage.flushdb()
+
+        limits = {'login': (3, 60), 'reset': (3, 60), 'client': (100, 60)}
+        self.service = AccountService(
+            self.storage, PasswordPolicy(bcrypt_rounds=4), AsyncRateLimiter(self.storage, limits),
+            max_in_flight=1, max_queue=0, hash_workers=2
+        )
+        self.server = AccountHTTPServer(self.service, port=0)
+        self.client = HTTPClient('127.0.0.1', await self.server.start())
+
+    async def asyncTearDown(self):
+        """
+        Stop the service and empty the database.
+        """
+        await self.client.close()
+        await self.server.close()
+        self.service.close()
+        await self.storage.flushdb()
+        await close_async_storage(self.storage)
+
+    async def test_create_login_and_reset(self):
+        """
+        Test the account lifecycle: register, log in, reset the password and log in again.
+        """
+        self.assertEqual((await self.client.request('POST', '/accounts', ACCOUNT))[0], 201)
+        status, response = await self.client.request('POST', '/accounts', ACCOUNT)
+        self.assertEqual((status, response['message']), (400, "Account already exists."))
+
+        status, response = await self.client.request('POST', '/security-question', {'login_name': "user@gmail.com"})
+        self.assertEqual((status, response['security_question']), (200, "pet?"))
+
+        status, _ = await self.client.request('POST', '/password-reset', {
+            'login_name': "user@gmail.com", 'security_answer': "Max", 'new_password': "new"
+        })
+        self.assertEqual(status, 400)
+        status, _ = await self.client.request('POST', '/password-reset', {
+            'login_name': "user@gmail.com", 'security_answer': "Rex", 'new_password': "new"
+        })
+        self.assertEqual(status, 200)
+
+        for password, expected_status in (("pw", 401), ("new", 200)):
+            status, _ = await self.client.request('POST', '/login', {'login_name': "user@gmail.com", 'password': password})
+            self.assertEqual(status, expected_status)
+
+    async def test_rate_limited_attempts_get_429(self):
+        """
+        Test that attempts beyond the login limit are rejected with a retry hint.
+        """
+        statuses = []
+        for _ in range(4):
+            status, _ = await self.client.request('POST', '/login', {'login_name': "user@gmail.com", 'password': "x"})
+            statuses.append(status)
+        self.assertEqual(statuses, [401, 401, 401, 429])
+
+    async def test_requests_beyond_the_queue_are_rejected(self):
+        """
+        Test that a request arriving while every slot is taken and the queue is full gets a 503.
+        """
+        async with self.service.admit('test'):
+            with self.assertRaises(ServiceBusy):
+                await self.service.login("user@gmail.com", "pw")
+            status, _ = await self.client.request('POST', '/security-question', {'login_name': "user@gmail.com"})
+            self.assertEqual(status, 503)
+
+        self.assertEqual(self.service.stats()['requests']['rejected'], 2)
+        self.assertEqual((await self.client.request('POST', '/security-question', {'login_name': "user@gmail.com"}))[0], 404)
+
+    async def test_malformed_requests_are_rejected(self):
+        """
+        Test that unknown routes and bodies that are not JSON objects get client errors.
+        """
+        self.assertEqual((await self.client.request('POST', '/unknown'))[0], 404)
+        self.assertEqual((await self.client.request('POST', '/login', ["not", "an", "object"]))[0], 400)
+        self.assertEqual((await self.client.request('POST', '/login', {'login_name': "user@gmail.com"}))[0], 401)
+
+    async def send_raw(self, data):
+        """
+        Sends raw bytes to the endpoint and reads the status line of its answer, waiting
+        for the server to close the connection.
+        """
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+        try:
+            writer.write(data)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+        finally:
+            writer.close()
+        return response.split(b'\r\n', 1)[0].decode('latin-1')
+
+    async def test_slow_or_oversized_headers_are_rejected(self):
+        """
+        Test that a client stalling in its headers, or sending too many or too long ones,
+        is answered and disconnected instead of holding the connection.
+        """
+        self.server.request_timeout = 0.5
+        started = time.monotonic()
+        status = await self.send_raw(b"POST /login HTTP/1.1\r\nHost: x\r\n")
+        self.assertEqual(status, "HTTP/1.1 408 Request Timeout")
+        self.assertLess(time.monotonic() - started, 3)
+
+        status = await self.send_raw(b"POST /login HTTP/1.1\r\nX-Long: " + b"a" * 70000 + b"\r\n\r\n")
+        self.assertEqual(status, "HTTP/1.1 431 Request Header Fields Too Large")
+        headers = b"".join(b"X-Header-%d: 1\r\n" % i for i in range(200))
+        status = await self.send_raw(b"POST /login HTTP/1.1\r\n" + headers + b"\r\n")
+        self.assertEqual(status, "HTTP/1.1 431 Request Header Fields Too Large")
+
+        # The endpoint still serves well-formed requests
+        self.assertEqual((await self.client.request('POST', '/unknown'))[0], 404)
+
+    async def test_accounts_changed_by_the_service_reach_running_filters(self):
+        """
+        Test that an account created or deleted through the service is announced to the
+        account filter of another app instance.
+        """
+        if TEST_STORAGE_BACKEND != 'redis':
+            self.skipTest("the storage backend has no publish/subscribe")
+        storage = open_storage('redis')
+        self.addCleanup(storage.close)
+        account_filter = AccountFilter(storage)
+        self.addCleanup(account_filter.stop)
+        account_filter.start()
+        repository = AccountRepository(storage, account_filter=account_filter)
+
+        async def filter_reports(expected):
+            deadline = time.monotonic() + 5
+            while account_filter.might_exist("new@gmail.com") != expected and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            return account_filter.might_exist("new@gmail.com")
+
+        self.assertFalse(account_filter.might_exist("new@gmail.com"))
+        self.assertTrue((await self.service.create_account("new@gmail.com", "pw", "New", "pet", "Rex"))[0])
+        self.assertTrue(await filter_reports(True))
+        self.assertEqual(repository.get_field("new@gmail.com", 'first_name'), "New")
+
+        self.assertTrue(await self.service.account_manager.repository.delete("new@gmail.com"))
+        self.assertFalse(await filter_reports(False))
+
+if __name__ == '__main__':
+    unittest.main()
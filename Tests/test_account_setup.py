@@ -2,7 +2,9 @@ import unittest
 from unittest.mock import patch
 import logging
 from Models.account import Account
-from Models.redis_client import RedisClient
+from Models.account_keys import account_key
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
 
 # Configure logging to display INFO level messages
 logging.basicConfig(level=logging.INFO)
@@ -18,12 +20,7 @@ class TestAccountSetup(unittest.TestCase):
         Clears Redis data to ensure a clean state for testing.
         """
         logging.info("Setting up Redis client and Account manager.")
-        self.redis_client = RedisClient(
-            host="mycampsiteredis.redis.cache.windows.net",
-            port=6380,
-            password="F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8=",
-            ssl=True
-        )
+        self.redis_client = open_storage(TEST_STORAGE_BACKEND)
         self.account_manager = Account(self.redis_client)
         self.clear_redis_data()
 
@@ -46,7 +43,7 @@ class TestAccountSetup(unittest.TestCase):
             password="testpw123",
             first_name="Harrison"
         )
-        stored_account = self.redis_client.hgetall("test@gmail.com")
+        stored_account = self.redis_client.hgetall(account_key("test@gmail.com"))
         self.assertIn('first_name', stored_account)
         self.assertEqual(stored_account['first_name'], "Harrison")
         self.assertEqual(stored_account['security_question'], "cat's name?")
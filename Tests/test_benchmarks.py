@@ -0,0 +1,64 @@
+import unittest
+from Benchmarks.benchmark_suite import compare, percentile, run_suite
+
+def make_results(p50, p99, throughput, round_trips):
+    """
+    Builds a one-entry results document in the benchmark suite's format.
+    """
+    return {'results': {'login': {'100': {
+        'p50_ms': p50, 'p99_ms': p99, 'throughput_per_s': throughput, 'round_trips_per_op': round_trips
+    }}}}
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """
+    Unit tests for the benchmark suite and its baseline comparison.
+    """
+
+    def test_suite_reports_every_operation_and_size(self):
+        """
+        Test that a small run produces figures for each operation and dataset size.
+        """
+        results = run_suite(sizes=(10, 20), iterations=5, operations=['login', 'create_account', 'load_initial_data'])
+        self.assertEqual(results['meta']['backend'], 'memory')
+        for operation in ('login', 'create_account', 'load_initial_data'):
+            self.assertEqual(set(results['results'][operation]), {'10', '20'})
+        self.assertEqual(results['results']['login']['20']['round_trips_per_op'], 1.0)
+        self.assertEqual(results['results']['create_account']['20']['round_trips_per_op'], 1.0)
+        self.assertGreater(results['results']['load_initial_data']['20']['throughput_per_s'], 0)
+
+    def test_percentile_uses_nearest_rank(self):
+        """
+        Test the percentile calculation on a known sample.
+        """
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_compare_flags_regressions(self):
+        """
+        Test that slower latency, lower throughput and extra round trips are reported when timings are compared.
+        """
+        baseline = make_results(10.0, 20.0, 100.0, 1.0)
+        self.assertEqual(compare(make_results(10.5, 25.0, 95.0, 1.0), baseline, timings=True), [])
+        regressions = compare(make_results(20.0, 50.0, 50.0, 2.0), baseline, timings=True)
+        self.assertEqual(len(regressions), 4)
+
+    def test_compare_gates_only_on_round_trips_by_default(self):
+        """
+        Test that machine-dependent figures are not compared unless asked for.
+        """
+        baseline = make_results(10.0, 20.0, 100.0, 1.0)
+        self.assertEqual(compare(make_results(20.0, 50.0, 50.0, 1.0), baseline), [])
+        regressions = compare(make_results(10.0, 20.0, 100.0, 2.0), baseline)
+        self.assertEqual(regressions, ["login @ 100: round_trips_per_op 1.0 -> 2.0"])
+
+    def test_compare_ignores_timer_noise(self):
+        """
+        Test that a large relative change below the absolute noise floor is not reported.
+        """
+        baseline = make_results(0.02, 0.05, 100.0, 1.0)
+        self.assertEqual(compare(make_results(0.04, 0.2, 100.0, 1.0), baseline, timings=True), [])
+
+if __name__ == '__main__':
+    unittest.main()
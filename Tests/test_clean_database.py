@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+from clean_database import clean_redis_database
+from Models.account_keys import ACCOUNT_KEY_PATTERN, account_key
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+from Utils.load_manifest import LoadManifest
+from Utils.config import TEST_STORAGE_BACKEND
+
+class TestCleanDatabase(unittest.TestCase):
+    """
+    Unit tests for the SCAN-based database cleaning tool.
+    """
+
+    def setUp(self):
+        """
+        Fill an empty database with account and other keys.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+        for i in range(25):
+            self.storage.hset(f"account:{i}", mapping={'first_name': str(i)})
+        for i in range(5):
+            self.storage.hset(f"other:{i}", mapping={'value': str(i)})
+
+    def test_dry_run_counts_without_deleting(self):
+        """
+        Test that a dry run reports the matching keys and leaves them in place.
+        """
+        with patch.object(self.storage, 'pipeline', wraps=self.storage.pipeline) as pipelines:
+            count = clean_redis_database(match='account:*', dry_run=True, redis_client=self.storage)
+        self.assertEqual(count, 25)
+        self.assertEqual(self.storage.dbsize(), 30)
+        pipelines.assert_not_called()
+
+    def test_deletes_only_matching_keys_in_batches(self):
+        """
+        Test that matching keys are unlinked with one pipelined round trip per scanned batch.
+        """
+        batches = []
+
+        def record_batches(*args, **kwargs):
+            for keys in scan_batches(*args, **kwargs):
+                batches.append(keys)
+                yield keys
+
+        with patch('clean_database.scan_batches', side_effect=record_batches), \
+                patch.object(self.storage, 'pipeline', wraps=self.storage.pipeline) as pipelines, \
+                patch.object(self.storage, 'keys', wraps=self.storage.keys) as keys:
+            count = clean_redis_database(match='account:*', batch_size=10, redis_client=self.storage)
+        self.assertEqual(count, 25)
+        self.assertEqual(sorted(self.storage.keys()), [f"other:{i}" for i in range(5)])
+        self.assertEqual(pipelines.call_count, len([batch for batch in batches if batch]))
+        keys.assert_not_called()
+
+    def test_manifest_is_cleared_only_when_accounts_are_deleted(self):
+        """
+        Test that deleting unrelated keys keeps the loader's manifest and the account filters.
+        """
+        manifest = LoadManifest(self.storage)
+        self.storage.hset(manifest.key, mapping={'salt': "00"})
+        self.storage.hset(account_key("user@gmail.com"), mapping={'first_name': "User"})
+
+        with patch('clean_database.publish_account_rebuild') as publish:
+            clean_redis_database(match='other:*', redis_client=self.storage)
+        self.assertTrue(self.storage.exists(manifest.key))
+        publish.assert_not_called()
+
+        with patch('clean_database.publish_account_rebuild') as publish:
+            clean_redis_database(match=ACCOUNT_KEY_PATTERN, redis_client=self.storage)
+        self.assertFalse(self.storage.exists(manifest.key))
+        publish.assert_called_once_with(self.storage)
+
+    def test_clean_database_reports_when_empty(self):
+        """
+        Test that cleaning an empty database deletes nothing.
+        """
+        clean_redis_database(redis_client=self.storage)
+        self.assertEqual(clean_redis_database(redis_client=self.storage), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import time
+import unittest
+from unittest.mock import patch, mock_open
+from local_cluster import REDIS_SERVER, LocalCluster
+from migrate_account_keys import migrate_account_keys
+from Models.account import Account
+from Models.account_keys import account_key
+from Models.cluster_pipeline import NodePipeline, batch_pipeline
+from Models.redis_client import RedisClient, dbsize
+from Utils.data_loader import DataLoader
+
+CSV_HEADER = "username,password,firstname,first dogs name\n"
+
+def make_csv(row_count):
+    """
+    Builds CSV text with the given number of valid account rows.
+    """
+    rows = [f"user{i}@example.com,pass{i},Name{i},Dog{i}\n" for i in range(row_count)]
+    return CSV_HEADER + "".join(rows)
+
+@unittest.skipUnless(REDIS_SERVER, "redis-server is needed to start a local cluster")
+class TestRedisCluster(unittest.TestCase):
+    """
+    Integration tests for running the account code against a local three-node Redis Cluster.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """
+        Start the cluster once for all tests.
+        """
+        cls.cluster = LocalCluster(nodes=3).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stop the cluster.
+        """
+        RedisClient.close_all_pools()
+        cls.cluster.stop()
+
+    def setUp(self):
+        """
+        Connect to the cluster and start from an empty database.
+        """
+        self.redis_client = RedisClient("127.0.0.1", self.cluster.ports[0], None, cluster=True)
+        self.client = self.redis_client.client
+        self.client.flushdb()
+
+    def test_pipeline_is_split_per_node(self):
+        """
+        Test that a batch is sent as one pipeline per node and results keep the queue order.
+        """
+        pipeline = self.redis_client.pipeline(transaction=False)
+        self.assertIsInstance(pipeline, NodePipeline)
+        for i in range(300):
+            pipeline.hset(account_key(f"user{i}@example.com"), mapping={'first_name': f"Name{i}"})
+            pipeline.hget(account_key(f"user{i}@example.com"), 'first_name')
+        self.assertEqual(len(pipeline.node_pipelines), 3)
+
+        results = pipeline.execute()
+        self.assertEqual(results[1::2], [f"Name{i}" for i in range(300)])
+
+    def test_scan_covers_every_node(self):
+        """
+        Test that scanning the cluster returns the keys of every node.
+        """
+        pipeline = batch_pipeline(self.client, transaction=False)
+        for i in range(200):
+            pipeline.hset(f"key{i}", mapping={'value': i})
+        pipeline.execute()
+        self.assertEqual(sorted(self.redis_client.keys('key*')), sorted(f"key{i}" for i in range(200)))
+
+    @patch('builtins.open', new_callable=mock_open, read_data=make_csv(30))
+    def test_loaded_accounts_can_log_in(self, mock_file):
+        """
+        Test that the data loader writes across the cluster and the accounts work afterwards.
+        """
+        reports = DataLoader(self.client, workers=4, chunk_size=10).load_initial_data('accounts.csv')
+        self.assertEqual(sum(report['stored'] for report in reports), 30)
+
+        account_manager = Account(self.client)
+        self.assertTrue(account_manager.login("user7@example.com", "pass7"))
+        self.assertFalse(account_manager.login("user7@example.com", "wrong"))
+
+    def test_register_and_reset_password(self):
+        """
+        Test that account creation and password reset scripts run on the owning node.
+        """
+        account_manager = Account(self.client)
+        success, _ = account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")
+        self.assertTrue(success)
+        self.assertFalse(account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")[0])
+        self.assertTrue(account_manager.forgot_password("new@gmail.com", "Rex", "newpw", "newpw"))
+        self.assertTrue(account_manager.login("new@gmail.com", "newpw"))
+
+    def test_migration_runs_on_cluster(self):
+        """
+        Test that legacy keys on every node are moved to their namespaced keys.
+        """
+        for i in range(50):
+            self.client.hset(f"legacy{i}@example.com", mapping={'password': "hash", 'first_name': str(i)})
+        progress = migrate_account_keys(batch_size=20, redis_client=self.client)
+        self.assertEqual(progress['migrated'], 50)
+        self.assertEqual(self.client.hget(account_key("legacy3@example.com"), 'first_name'), "3")
+
+@unittest.skipUnless(REDIS_SERVER, "redis-server is needed to start a local cluster")
+class TestClusterThroughput(unittest.TestCase):
+    """
+    Measures batched write throughput as nodes are added to a local cluster.
+    """
+
+    def test_throughput_by_node_count(self):
+        """
+        Test that batched writes succeed on clusters of one to three nodes, printing the rate of each.
+        """
+        for nodes in (1, 2, 3):
+            cluster = LocalCluster(nodes=nodes, base_port=LocalCluster().base_port + 5).start()
+            try:
+                client = RedisClient("127.0.0.1", cluster.ports[0], None, cluster=True).client
+                started_at = time.perf_counter()
+                for batch in range(10):
+                    pipeline = batch_pipeline(client, transaction=False)
+                    for i in range(1000):
+                        pipeline.hset(account_key(f"user{batch}-{i}@example.com"), mapping={'first_name': "Name"})
+                    pipeline.execute()
+                elapsed = time.perf_counter() - started_at
+                print(f"{nodes} node(s): {10000 / elapsed:.0f} writes per second")
+                self.assertEqual(dbsize(client), 10000)
+            finally:
+                RedisClient.close_all_pools()
+                cluster.stop()
+
+if __name__ == '__main__':
+    unittest.main()
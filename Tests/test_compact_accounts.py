@@ -0,0 +1,190 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import memory_report
+from Models.account import Account
+from Models.async_account import AsyncAccount
+from Models.async_storage import AsyncStorageAdapter
+from Models.compact_accounts import (
+    RECORD_SEPARATOR, CompactAccountRepository, account_writer, bucket_key, compact_account_batches,
+    compact_account_count, decode_record, encode_record
+)
+from Models.password_policy import PasswordPolicy
+from Models.storage import open_storage
+from Utils.config import ACCOUNT_LAYOUT_SETTINGS, TEST_STORAGE_BACKEND
+from Utils.data_loader import DataLoader
+
+class TestCompactRecords(unittest.TestCase):
+    """
+    Tests the encoding of account fields into compact records.
+    """
+
+    def test_records_round_trip_without_field_names(self):
+        """
+        Test that fields are stored by position and missing ones come back missing.
+        """
+        record = encode_record({'security_question': "Pet?", 'password': "$2b$04$hash", 'first_name': "Ann"})
+        self.assertEqual(record, RECORD_SEPARATOR.join(["$2b$04$hash", "Ann", "Pet?"]))
+        self.assertEqual(decode_record(record),
+                         {'password': "$2b$04$hash", 'first_name': "Ann", 'security_question': "Pet?"})
+        self.assertEqual(decode_record(encode_record({'security_answer': "Rex"})), {'security_answer': "Rex"})
+        self.assertEqual(decode_record(None), {})
+
+    def test_unstorable_fields_are_rejected(self):
+        """
+        Test that unknown fields and values containing the separator raise ValueError.
+        """
+        with self.assertRaises(ValueError):
+            encode_record({'password': "x", 'nickname': "Al"})
+        with self.assertRaises(ValueError):
+            encode_record({'first_name': f"A{RECORD_SEPARATOR}B"})
+
+    def test_bucket_keys_are_stable_and_bounded(self):
+        """
+        Test that a login name always maps to the same one of the configured buckets.
+        """
+        keys = {bucket_key(f"user{i}@gmail.com", 16) for i in range(1000)}
+        self.assertEqual(len(keys), 16)
+        self.assertEqual(bucket_key("user1@gmail.com", 16), bucket_key("user1@gmail.com", 16))
+
+class TestCompactAccounts(unittest.TestCase):
+    """
+    Tests accounts stored in the compact layout.
+    """
+
+    def setUp(self):
+        """
+        Start an Account manager in the compact layout on an empty database.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+        self.account_manager = Account(self.storage, PasswordPolicy(bcrypt_rounds=4), layout='compact')
+        self.repository = self.account_manager.repository
+
+    def test_account_lifecycle_in_one_round_trip_per_operation(self):
+        """
+        Test registering, logging in, resetting the password and deleting a compact account.
+        """
+        self.assertIsInstance(self.repository, CompactAccountRepository)
+        self.assertEqual(self.account_manager.register("user@gmail.com", "pw", "User", "pet", "Rex"),
+                         (True, "Account created successfully."))
+        self.assertEqual(self.account_manager.register("user@gmail.com", "pw", "User", "pet", "Rex"),
+                         (False, "Account already exists."))
+        self.assertTrue(self.account_manager.login("user@gmail.com", "pw"))
+        self.assertTrue(self.account_manager.forgot_password("user@gmail.com", "Rex", "new", "new"))
+        self.assertFalse(self.account_manager.login("user@gmail.com", "pw"))
+        self.assertTrue(self.account_manager.login("user@gmail.com", "new"))
+        self.assertEqual(self.repository.get_field("user@gmail.com", 'security_question'), "pet?")
+        self.assertEqual(self.repository.round_trips, self.repository.operations)
+
+        # The account is one field of its bucket, not a key of its own
+        self.assertEqual(self.storage.dbsize(), 1)
+        self.assertEqual(list(self.storage.hgetall(bucket_key("user@gmail.com"))), ["user@gmail.com"])
+        self.assertTrue(self.repository.delete("user@gmail.com"))
+        self.assertFalse(self.repository.exists("user@gmail.com"))
+        self.assertEqual(self.storage.dbsize(), 0)
+
+    def test_stale_password_hash_is_not_replaced(self):
+        """
+        Test that a hash upgrade loses against a change made since the hash was read.
+        """
+        self.repository.create("user@gmail.com", {'password': "old", 'first_name': "User"})
+        self.assertFalse(self.repository.replace_password_hash("user@gmail.com", "other", "new"))
+        self.assertTrue(self.repository.replace_password_hash("user@gmail.com", "old", "new"))
+        self.assertEqual(self.repository.get_account("user@gmail.com"), {'password': "new", 'first_name': "User"})
+
+    def test_bulk_writes_merge_into_stored_accounts(self):
+        """
+        Test that the bulk-load writer keeps fields it does not set, and that buckets can be
+        counted and read back.
+        """
+        self.repository.create("user@gmail.com", {'password': "old", 'security_question': "pet?"})
+        write_account = account_writer(self.storage, 'compact')
+        pipeline = self.storage.pipeline(transaction=False)
+        write_account(pipeline, "user@gmail.com", {'password': "new", 'security_answer': "Rex"})
+        write_account(pipeline, "other@gmail.com", {'password': "pw"})
+        pipeline.execute()
+
+        self.assertEqual(self.repository.get_account("user@gmail.com"),
+                         {'password': "new", 'security_question': "pet?", 'security_answer': "Rex"})
+        self.assertEqual(compact_account_count(self.storage), 2)
+        accounts = dict(account for batch in compact_account_batches(self.storage) for account in batch)
+        self.assertEqual(accounts["other@gmail.com"], {'password': "pw"})
+
+    def test_unstorable_rows_are_skipped_by_the_loader(self):
+        """
+        Test that a CSV row with a value the compact layout cannot store fails on its own.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        csv_file = os.path.join(directory.name, "accounts.csv")
+        with open(csv_file, 'w') as file:
+            file.write("username,password,firstname,first dogs name\n"
+                       f"good@gmail.com,pw,Good,Rex\nbad@gmail.com,pw,Ba{RECORD_SEPARATOR}d,Rex\n"
+                       "other@gmail.com,pw,Other,Max\n")
+
+        with patch.dict(ACCOUNT_LAYOUT_SETTINGS, layout='compact'):
+            reports = DataLoader(self.storage).load_initial_data(csv_file)
+
+        self.assertEqual([(report['stored'], report['failed_rows']) for report in reports], [(2, 1)])
+        self.assertTrue(self.repository.exists("good@gmail.com"))
+        self.assertTrue(self.repository.exists("other@gmail.com"))
+        self.assertFalse(self.repository.exists("bad@gmail.com"))
+
+class TestAsyncCompactAccounts(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests the asyncio account manager in the compact layout.
+    """
+
+    async def test_register_and_login(self):
+        """
+        Test that an account registered through AsyncAccount is found by Account.
+        """
+        storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(storage.close)
+        storage.flushdb()
+        self.addCleanup(storage.flushdb)
+        policy = PasswordPolicy(bcrypt_rounds=4)
+        account_manager = AsyncAccount(AsyncStorageAdapter(storage), policy, layout='compact')
+
+        self.assertTrue((await account_manager.register("user@gmail.com", "pw", "User", "pet", "Rex"))[0])
+        self.assertTrue(await account_manager.login("user@gmail.com", "pw"))
+        self.assertEqual(await account_manager.get_security_question("user@gmail.com"), ("pet?", None))
+        self.assertTrue(Account(storage, policy, layout='compact').login("user@gmail.com", "pw"))
+
+class TestMemoryReport(unittest.TestCase):
+    """
+    Tests the report comparing the memory used by each layout.
+    """
+
+    def setUp(self):
+        """
+        Open the test storage on an empty database.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+
+    @unittest.skipIf(TEST_STORAGE_BACKEND == 'redis', "runs against a non-Redis backend")
+    def test_report_needs_redis(self):
+        """
+        Test that the report declines backends without MEMORY USAGE.
+        """
+        self.assertIsNone(memory_report.compare_layouts(accounts=10, redis_client=self.storage))
+
+    @unittest.skipUnless(TEST_STORAGE_BACKEND == 'redis', "needs a Redis server")
+    def test_compact_layout_uses_less_memory(self):
+        """
+        Test that both layouts are measured, the compact one is smaller, and nothing is left behind.
+        """
+        report = memory_report.compare_layouts(accounts=500, redis_client=self.storage)
+        self.assertEqual((report['layouts']['hash']['keys'], report['layouts']['compact']['keys']), (500, 7))
+        self.assertLess(report['layouts']['compact']['bytes_per_account'], report['layouts']['hash']['bytes_per_account'])
+        self.assertEqual(self.storage.dbsize(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
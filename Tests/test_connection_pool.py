@@ -0,0 +1,104 @@
+import unittest
+import redis
+from Models.connection_pool import ReapingConnectionPool
+from Models.redis_client import RedisClient
+
+class OfflineConnection(redis.Connection):
+    """
+    A connection that pretends to connect, so pool behaviour can be tested without a server.
+    """
+
+    def connect(self):
+        if self._sock is None:
+            self._sock = object()
+
+    def disconnect(self, *args, **kwargs):
+        self._sock = None
+
+    def can_read(self, timeout=0):
+        return False
+
+class TestConnectionPool(unittest.TestCase):
+    """
+    Unit tests for the shared, reaping connection pool used by RedisClient.
+    """
+
+    def setUp(self):
+        """
+        Create a small pool of offline connections.
+        """
+        self.pool = ReapingConnectionPool(
+            idle_timeout=0, max_connections=3, timeout=0.1, connection_class=OfflineConnection
+        )
+
+    def tearDown(self):
+        """
+        Close the pool and any pools shared through RedisClient.
+        """
+        self.pool.close()
+        RedisClient.close_all_pools()
+
+    def test_stats_track_checkouts_and_idle_connections(self):
+        """
+        Test that the pool statistics follow connections being checked out and released.
+        """
+        first = self.pool.get_connection()
+        second = self.pool.get_connection()
+        self.assertEqual(self.pool.stats()['in_use'], 2)
+
+        self.pool.release(first)
+        stats = self.pool.stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['in_use'], 1)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['checkouts'], 2)
+        self.pool.release(second)
+
+    def test_released_connections_are_reused(self):
+        """
+        Test that a released connection is handed out again instead of a new one being made.
+        """
+        connection = self.pool.get_connection()
+        self.pool.release(connection)
+        self.assertIs(self.pool.get_connection(), connection)
+        self.assertEqual(self.pool.stats()['created'], 1)
+
+    def test_pool_is_bounded(self):
+        """
+        Test that checking out more than max_connections raises instead of opening more.
+        """
+        connections = [self.pool.get_connection() for _ in range(3)]
+        with self.assertRaises(redis.ConnectionError):
+            self.pool.get_connection()
+        for connection in connections:
+            self.pool.release(connection)
+
+    def test_idle_connections_are_reaped(self):
+        """
+        Test that idle connections are disconnected but stay available for reuse.
+        """
+        connection = self.pool.get_connection()
+        in_use = self.pool.get_connection()
+        self.pool.release(connection)
+
+        self.assertEqual(self.pool.reap_idle(idle_timeout=0), 1)
+        stats = self.pool.stats()
+        self.assertEqual(stats['connected'], 1)
+        self.assertEqual(stats['reaped'], 1)
+
+        self.assertIs(self.pool.get_connection(), connection)
+        self.assertIsNotNone(connection._sock)
+        self.pool.release(in_use)
+
+    def test_clients_with_same_details_share_a_pool(self):
+        """
+        Test that RedisClient hands out one pool per set of connection details.
+        """
+        first = RedisClient.get_pool("localhost", 6379, None, idle_timeout=0)
+        second = RedisClient.get_pool("localhost", 6379, None, idle_timeout=0)
+        other = RedisClient.get_pool("localhost", 6380, None, idle_timeout=0)
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 from unittest.mock import patch, mock_open
-from Models.redis_client import RedisClient
+from Models.account_keys import account_key
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
 from Utils.data_loader import DataLoader
 
 class TestDataLoader(unittest.TestCase):
@@ -14,13 +16,8 @@ class TestDataLoader(unittest.TestCase):
         Initializes a connection to the Redis server and clears any existing data
         to ensure a clean state for each test.
         """
-        # Initialize Redis client with the specified server details
-        self.redis_client = RedisClient(
-            host="mycampsiteredis.redis.cache.windows.net",
-            port=6380,
-            password="F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8=",
-            ssl=True
-        )
+        # Open the test storage, in memory unless CAMPSITE_TEST_STORAGE names another backend
+        self.redis_client = open_storage(TEST_STORAGE_BACKEND)
         # Initialize the DataLoader with the Redis client
         self.data_loader = DataLoader(self.redis_client)
         # Clear any existing data in Redis to ensure tests start fresh
@@ -43,7 +40,7 @@ class TestDataLoader(unittest.TestCase):
         # Load data from the mocked CSV file
         self.data_loader.load_initial_data('ICT320 - Task 2 - Initial Database.csv')
         # Fetch stored account details from Redis
-        stored_account = self.redis_client.hgetall("user1@example.com")
+        stored_account = self.redis_client.hgetall(account_key("user1@example.com"))
         # Verify that the data was stored correctly
         self.assertIn('first_name', stored_account)
         self.assertEqual(stored_account['first_name'], "John")
@@ -57,7 +54,7 @@ class TestDataLoader(unittest.TestCase):
         # Attempt to load data with missing fields
         self.data_loader.load_initial_data('ICT320 - Task 2 - Initial Database.csv')
         # Fetch stored account details, expecting it to be empty due to missing required fields
-        stored_account = self.redis_client.hgetall("user2@example.com")
+        stored_account = self.redis_client.hgetall(account_key("user2@example.com"))
         self.assertEqual(stored_account, {})
 
     @patch('builtins.open', new_callable=mock_open, read_data="username,password,firstname,first dogs name\nuser1@example.com,pass123,John,Max\nuser1@example.com,newpass,Jane,Max\n")
@@ -69,7 +66,7 @@ class TestDataLoader(unittest.TestCase):
         # Load data from a mocked CSV file containing duplicate entries
         self.data_loader.load_initial_data('ICT320 - Task 2 - Initial Database.csv')
         # Fetch stored account details from Redis
-        stored_account = self.redis_client.hgetall("user1@example.com")
+        stored_account = self.redis_client.hgetall(account_key("user1@example.com"))
         # Check that the account reflects the last occurrence of the duplicate entry
         self.assertIn('first_name', stored_account)
         self.assertEqual(stored_account['first_name'], "Jane")
@@ -83,7 +80,7 @@ class TestDataLoader(unittest.TestCase):
         # Load data with incorrect types (e.g., numbers instead of strings)
         self.data_loader.load_initial_data('ICT320 - Task 2 - Initial Database.csv')
         # Fetch stored account details from Redis
-        stored_account = self.redis_client.hgetall("user3@example.com")
+        stored_account = self.redis_client.hgetall(account_key("user3@example.com"))
         # Check that the fields were stored despite incorrect data types
         self.assertIn('first_name', stored_account)
         self.assertEqual(stored_account['first_name'], "42")
@@ -0,0 +1,237 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, mock_open
+import bcrypt
+import redis
+from clean_database import clean_redis_database
+from Models.account_keys import ACCOUNT_KEY_PREFIX, account_key
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+from Utils import data_loader
+from Utils.data_loader import DataLoader
+from Utils.import_checkpoint import FileCheckpointStore
+from Utils.load_manifest import LoadManifest
+
+CSV_HEADER = "username,password,firstname,first dogs name\n"
+
+def make_csv(row_count):
+    """
+    Builds CSV text with the given number of valid account rows.
+    """
+    rows = [f"user{i}@example.com,pass{i},Name{i},Dog{i}\n" for i in range(row_count)]
+    return CSV_HEADER + "".join(rows)
+
+class TestDataLoaderBulk(unittest.TestCase):
+    """
+    Unit tests for the bulk import paths of the DataLoader class.
+    """
+
+    def setUp(self):
+        """
+        Open the test storage on an empty database.
+        """
+        self.redis_client = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.redis_client.close)
+        self.redis_client.flushdb()
+        self.addCleanup(self.redis_client.flushdb)
+
+    def stored_accounts(self):
+        """
+        Lists the account keys in the database.
+        """
+        return sorted(self.redis_client.keys(f"{ACCOUNT_KEY_PREFIX}*"))
+
+    def failing_pipelines(self, failing_executions):
+        """
+        Makes the batches sent by the chosen pipelines fail, like a dropped connection.
+        """
+        pipeline = self.redis_client.pipeline
+        created = []
+
+        def create(*args, **kwargs):
+            batch = pipeline(*args, **kwargs)
+            created.append(batch)
+            if len(created) in failing_executions:
+                def execute(*args, **kwargs):
+                    batch.reset()
+                    raise redis.ConnectionError("connection lost")
+                batch.execute = execute
+            return batch
+        return patch.object(self.redis_client, 'pipeline', side_effect=create)
+
+    def write_csv_file(self, text):
+        """
+        Writes CSV text to a temporary file that is removed after the test.
+        """
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "accounts.csv")
+        with open(path, mode='w', newline='') as file:
+            file.write(text)
+        return path
+
+    @patch('builtins.open', new_callable=mock_open, read_data=make_csv(8))
+    def test_parallel_hashing_stores_every_row(self, mock_file):
+        """
+        Test that hashing with several workers stores every row with a valid hash.
+        """
+        DataLoader(self.redis_client, workers=4).load_initial_data('accounts.csv')
+
+        self.assertEqual(len(self.stored_accounts()), 8)
+        for i in range(8):
+            stored = self.redis_client.hgetall(account_key(f"user{i}@example.com"))
+            self.assertEqual(stored['first_name'], f"Name{i}")
+            self.assertTrue(bcrypt.checkpw(f"pass{i}".encode('utf-8'), stored['password'].encode('utf-8')))
+
+    def test_hash_passwords_reports_errors_per_row(self):
+        """
+        Test that a failure hashing one password does not affect the others.
+        """
+        real_hash = data_loader.hash_password
+
+        def flaky_hash(password):
+            if password == "bad":
+                raise ValueError("cannot hash")
+            return real_hash(password)
+
+        with patch('Utils.data_loader.hash_password', side_effect=flaky_hash):
+            results = DataLoader(self.redis_client, workers=3).hash_passwords(["a", "bad", "c"])
+
+        self.assertIsNotNone(results[0][0])
+        self.assertIsNone(results[1][0])
+        self.assertIsInstance(results[1][1], ValueError)
+        self.assertIsNotNone(results[2][0])
+
+    @patch('builtins.open', new_callable=mock_open, read_data=make_csv(7))
+    def test_rows_are_written_in_pipelined_chunks(self, mock_file):
+        """
+        Test that rows are grouped into chunks and each chunk is sent as one batch.
+        """
+        with patch.object(self.redis_client, 'pipeline', wraps=self.redis_client.pipeline) as pipelines:
+            reports = DataLoader(self.redis_client, chunk_size=3).load_initial_data('accounts.csv')
+
+        self.assertEqual([report['rows'] for report in reports], [3, 3, 1])
+        self.assertEqual(pipelines.call_count, 3)
+        self.assertEqual(len(self.stored_accounts()), 7)
+
+    @patch('builtins.open', new_callable=mock_open, read_data=make_csv(4))
+    def test_failed_chunk_is_reported(self, mock_file):
+        """
+        Test that a failing batch is reported for its chunk without stopping later chunks.
+        """
+        with self.failing_pipelines({1}):
+            reports = DataLoader(self.redis_client, chunk_size=2).load_initial_data('accounts.csv')
+
+        self.assertEqual(reports[0]['error'], "connection lost")
+        self.assertEqual(reports[0]['stored'], 0)
+        self.assertIsNone(reports[1]['error'])
+        self.assertEqual(reports[1]['stored'], 2)
+        self.assertEqual(self.stored_accounts(), [account_key("user2@example.com"), account_key("user3@example.com")])
+
+    def test_streaming_import_loads_file_and_clears_checkpoint(self):
+        """
+        Test that a streaming import stores every row and removes its checkpoint on completion.
+        """
+        csv_file = self.write_csv_file(make_csv(5) + 'quoted@example.com,"multi\nline",Q,"Dog, Jr"\n')
+
+        reports = DataLoader(self.redis_client, chunk_size=2).load_streaming(csv_file)
+
+        self.assertEqual(len(reports), 3)
+        self.assertEqual(len(self.stored_accounts()), 6)
+        self.assertEqual(self.redis_client.hget(account_key("quoted@example.com"), 'security_answer'), "Dog, Jr")
+        self.assertFalse(os.path.exists(f"{csv_file}.checkpoint.json"))
+
+    def test_streaming_import_resumes_from_checkpoint(self):
+        """
+        Test that a restarted import continues after the last committed chunk.
+        """
+        csv_file = self.write_csv_file(make_csv(6))
+        checkpoint_store = FileCheckpointStore(f"{csv_file}.checkpoint.json")
+
+        with self.failing_pipelines({2}):
+            first_run = DataLoader(self.redis_client, chunk_size=2).load_streaming(csv_file, checkpoint_store)
+
+        self.assertEqual(len(first_run), 2)
+        self.assertEqual(checkpoint_store.load()['rows'], 2)
+        self.assertEqual(self.stored_accounts(), [account_key("user0@example.com"), account_key("user1@example.com")])
+
+        with patch('Utils.data_loader.hash_password', wraps=data_loader.hash_password) as hashed:
+            second_run = DataLoader(self.redis_client, chunk_size=2).load_streaming(csv_file, checkpoint_store)
+
+        self.assertEqual([report['rows'] for report in second_run], [2, 2])
+        self.assertEqual(hashed.call_count, 4)
+        self.assertEqual(len(self.stored_accounts()), 6)
+        self.assertIsNone(checkpoint_store.load())
+
+    def test_checkpoint_for_changed_file_is_ignored(self):
+        """
+        Test that a checkpoint saved for different file contents does not skip any rows.
+        """
+        csv_file = self.write_csv_file(make_csv(3))
+        checkpoint_store = FileCheckpointStore(f"{csv_file}.checkpoint.json")
+        checkpoint_store.save({'fingerprint': "stale", 'offset': 80, 'rows': 2})
+
+        DataLoader(self.redis_client).load_streaming(csv_file, checkpoint_store)
+
+        self.assertEqual(len(self.stored_accounts()), 3)
+
+    def test_unchanged_file_is_skipped_on_warm_load(self):
+        """
+        Test that reloading an unchanged file does no hashing and no writes.
+        """
+        csv_file = self.write_csv_file(make_csv(3))
+        DataLoader(self.redis_client, manifest=LoadManifest(self.redis_client)).load_initial_data(csv_file)
+
+        with patch('Utils.data_loader.hash_password') as hashed, \
+                patch.object(self.redis_client, 'pipeline', wraps=self.redis_client.pipeline) as pipelines:
+            reports = DataLoader(self.redis_client, manifest=LoadManifest(self.redis_client)).load_initial_data(csv_file)
+
+        self.assertEqual(reports, [])
+        hashed.assert_not_called()
+        pipelines.assert_not_called()
+
+    def test_cleaned_accounts_are_reloaded(self):
+        """
+        Test that after the accounts are cleaned out, reloading the same file restores them.
+        """
+        csv_file = self.write_csv_file(make_csv(3))
+        DataLoader(self.redis_client, manifest=LoadManifest(self.redis_client)).load_initial_data(csv_file)
+        clean_redis_database(match=f"{ACCOUNT_KEY_PREFIX}*", redis_client=self.redis_client)
+        self.assertEqual(self.stored_accounts(), [])
+
+        reports = DataLoader(self.redis_client, manifest=LoadManifest(self.redis_client)).load_initial_data(csv_file)
+
+        self.assertEqual(sum(report['stored'] for report in reports), 3)
+        self.assertEqual(len(self.stored_accounts()), 3)
+
+    def test_only_changed_rows_are_reapplied(self):
+        """
+        Test that after the file changes, only new, changed or deleted accounts are written.
+        """
+        csv_file = self.write_csv_file(make_csv(4))
+        DataLoader(self.redis_client, manifest=LoadManifest(self.redis_client)).load_initial_data(csv_file)
+
+        self.redis_client.delete(account_key("user0@example.com"))
+        with open(csv_file, mode='a', newline='') as file:
+            file.write("user1@example.com,changed,Name1,Dog1\nnew@example.com,pw,New,Rex\n")
+
+        with patch('Utils.data_loader.hash_password', wraps=data_loader.hash_password) as hashed:
+            reports = DataLoader(self.redis_client, manifest=LoadManifest(self.redis_client)).load_initial_data(csv_file)
+
+        self.assertEqual(hashed.call_count, 3)
+        self.assertEqual(sum(report['unchanged'] for report in reports), 3)
+        self.assertTrue(self.redis_client.exists(account_key("user0@example.com")))
+        self.assertTrue(bcrypt.checkpw(
+            b"changed", self.redis_client.hget(account_key("user1@example.com"), 'password').encode('utf-8')
+        ))
+
+    def test_default_worker_count_uses_all_cores(self):
+        """
+        Test that passing workers=None sizes the pool to the CPU count.
+        """
+        with patch('Utils.data_loader.os.cpu_count', return_value=6):
+            self.assertEqual(DataLoader(self.redis_client, workers=None).workers, 6)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+import export_accounts
+from export_accounts import export_accounts as export, redact_password_hash
+from Models.account_keys import account_key
+from Models.compact_accounts import CompactAccountRepository
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+@unittest.skipIf(export_accounts.pyarrow is None, "pyarrow is not installed")
+class TestExportAccounts(unittest.TestCase):
+    """
+    Tests the streaming export of accounts to Parquet and Arrow IPC files.
+    """
+
+    def setUp(self):
+        """
+        Store 25 accounts and one unrelated hash, and pick a file to export to.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+        for i in range(25):
+            self.storage.hset(account_key(f"user{i}@gmail.com"), mapping={
+                'password': f"$2b$12${'x' * 53}",
+                'first_name': f"User{i}",
+                'security_question': "pet?",
+                'security_answer': "Rex"
+            })
+        self.storage.hset("ratelimit:login:user0@gmail.com", mapping={'tokens': "1"})
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "accounts")
+
+    def test_parquet_export_is_written_in_fixed_size_row_groups(self):
+        """
+        Test that every account is exported, in batches of the requested size, without credentials.
+        """
+        self.assertEqual(export(self.path, batch_size=10, scan_count=7, redis_client=self.storage), 25)
+
+        parquet_file = export_accounts.pyarrow.parquet.ParquetFile(self.path)
+        self.assertEqual([parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)],
+                         [10, 10, 5])
+        table = parquet_file.read()
+        self.assertEqual(table.column_names, ['login_name', 'first_name', 'security_question'])
+        self.assertEqual(sorted(table.column('login_name').to_pylist()), sorted(f"user{i}@gmail.com" for i in range(25)))
+
+    def test_arrow_export_redacts_password_hashes(self):
+        """
+        Test that redacted hashes keep only their scheme and cost in an Arrow IPC file.
+        """
+        self.assertEqual(export(self.path, format='arrow', passwords='redact', security_answers=True,
+                                compression='lz4', redis_client=self.storage), 25)
+
+        table = export_accounts.pyarrow.ipc.open_file(self.path).read_all()
+        self.assertEqual(set(table.column('password').to_pylist()), {"$2b$12$"})
+        self.assertEqual(set(table.column('security_answer').to_pylist()), {"Rex"})
+
+    def test_compact_accounts_are_exported(self):
+        """
+        Test that accounts stored in compact buckets are exported alongside account hashes.
+        """
+        CompactAccountRepository(self.storage, buckets=2).create("compact@gmail.com", {
+            'password': "x", 'first_name': "Compact", 'security_question': "pet?"
+        })
+        self.assertEqual(export(self.path, format='arrow', redis_client=self.storage), 26)
+
+        table = export_accounts.pyarrow.ipc.open_file(self.path).read_all().to_pylist()
+        self.assertIn({'login_name': "compact@gmail.com", 'first_name': "Compact", 'security_question': "pet?"}, table)
+
+    def test_redact_password_hash(self):
+        """
+        Test that the salt and digest are dropped from bcrypt and Argon2 hashes.
+        """
+        self.assertEqual(redact_password_hash("$argon2id$v=19$m=65536,t=3,p=4$c2FsdA$ZGlnZXN0"),
+                         "$argon2id$v=19$m=65536,t=3,p=4$")
+        self.assertEqual(redact_password_hash("plain"), "")
+
+if __name__ == '__main__':
+    unittest.main()
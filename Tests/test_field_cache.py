@@ -0,0 +1,135 @@
+import time
+import unittest
+from Models.account import Account
+from Models.account_keys import account_key
+from Models.field_cache import FieldCache
+from Models.password_policy import PasswordPolicy
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+class TestFieldCacheEviction(unittest.TestCase):
+    """
+    Unit tests for the cache's bookkeeping, without a tracking connection.
+    """
+
+    def setUp(self):
+        """
+        Create a small cache and mark it as serving.
+        """
+        self.cache = FieldCache(None, prefix="account:", max_entries=2, ttl=60)
+        self.cache.ready = True
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Test that the entry not read for longest is dropped when the cache is full.
+        """
+        for key in ("account:a", "account:b"):
+            self.cache.store(key, {'name': key}, self.cache.begin())
+        self.cache.get("account:a")
+        self.cache.store("account:c", {}, self.cache.begin())
+
+        self.assertEqual(self.cache.get("account:a"), {'name': "account:a"})
+        self.assertIsNone(self.cache.get("account:b"))
+        self.assertEqual(self.cache.get("account:c"), {})
+        self.assertEqual(self.cache.stats()['lookups']['evicted'], 1)
+
+    def test_expired_entry_is_a_miss(self):
+        """
+        Test that entries are not served after their time to live.
+        """
+        self.cache.ttl = 0.05
+        self.cache.store("account:a", {'name': "a"}, self.cache.begin())
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("account:a"))
+
+    def test_read_overlapping_an_invalidation_is_not_stored(self):
+        """
+        Test that a result read before a concurrent write cannot be cached.
+        """
+        token = self.cache.begin()
+        self.cache.invalidate("account:a")
+        self.assertFalse(self.cache.store("account:a", {'name': "old"}, token))
+        self.assertIsNone(self.cache.get("account:a"))
+
+    def test_paused_cache_is_bypassed(self):
+        """
+        Test that nothing is served or stored while tracking is down.
+        """
+        self.cache.ready = False
+        self.assertFalse(self.cache.store("account:a", {}, self.cache.begin()))
+        self.assertIsNone(self.cache.get("account:a"))
+        self.assertEqual(self.cache.stats()['lookups'], {'bypassed': 1})
+
+class TestFieldCacheTracking(unittest.TestCase):
+    """
+    Tests that account reads are cached and invalidated by Redis client tracking.
+    """
+
+    def setUp(self):
+        """
+        Store an account and start a cache for an Account manager on a real Redis server.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        # Flush before tracking starts, so the flush's invalidation cannot arrive mid-test
+        self.storage.flushdb()
+        self.cache = FieldCache(self.storage, retry_interval=0.1)
+        if not self.cache.start():
+            self.skipTest("client tracking needs a standalone Redis server")
+        self.addCleanup(self.cache.stop)
+
+        policy = PasswordPolicy(bcrypt_rounds=4)
+        self.account_manager = Account(self.storage, policy, field_cache=self.cache)
+        self.account_manager.register("user@gmail.com", "pw", "User", "pet", "Rex")
+        self.repository = self.account_manager.repository
+        self.repository.reset_stats()
+
+    def wait_for(self, condition):
+        """
+        Polls until a condition holds, as invalidations arrive asynchronously.
+        """
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_forgot_password_steps_read_the_account_once(self):
+        """
+        Test that the security question and answer reads after the first are served locally.
+        """
+        self.assertEqual(self.repository.get_account("user@gmail.com")['security_question'], "pet?")
+        self.assertEqual(self.repository.get_field("user@gmail.com", 'security_answer'), "Rex")
+        self.assertTrue(self.repository.exists("user@gmail.com"))
+
+        self.assertEqual(sum(self.repository.round_trips.values()), 1)
+        self.assertEqual(self.cache.stats()['lookups'], {'miss': 1, 'hit': 2})
+
+    def test_own_write_is_visible_immediately(self):
+        """
+        Test that a password reset is never followed by a read of the old hash.
+        """
+        old_hash = self.repository.get_password_hash("user@gmail.com")
+        self.repository.update("user@gmail.com", {'password': "new-hash"})
+        self.assertNotEqual(self.repository.get_password_hash("user@gmail.com"), old_hash)
+
+    def test_write_by_another_client_invalidates(self):
+        """
+        Test that a write from outside this process evicts the cached account.
+        """
+        self.repository.get_account("user@gmail.com")
+        self.storage.hset(account_key("user@gmail.com"), 'security_answer', "Max")
+
+        self.assertTrue(self.wait_for(lambda: self.cache.stats()['entries'] == 0))
+        self.assertEqual(self.repository.get_field("user@gmail.com", 'security_answer'), "Max")
+
+    def test_flush_empties_the_cache(self):
+        """
+        Test that flushing the database drops every cached account.
+        """
+        self.repository.get_account("user@gmail.com")
+        self.storage.flushdb()
+        self.assertTrue(self.wait_for(lambda: self.cache.stats()['entries'] == 0))
+        self.assertIsNone(self.repository.get_account("user@gmail.com"))
+
+if __name__ == '__main__':
+    unittest.main()
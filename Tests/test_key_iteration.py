@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+import redis
+from Models.redis_client import scan_batches, hscan_batches
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+class TestKeyIteration(unittest.TestCase):
+    """
+    Unit tests for the SCAN and HSCAN based iteration helpers used by RedisClient.
+    """
+
+    def setUp(self):
+        """
+        Open the test storage on an empty database.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.addCleanup(self.storage.flushdb)
+
+    def fill(self, count):
+        """
+        Store `count` account hashes and one unrelated hash.
+        """
+        for i in range(count):
+            self.storage.hset(f"account:{i:03d}", mapping={'first_name': str(i)})
+        self.storage.hset("config", mapping={'version': "1"})
+
+    def flaky_scan(self, failing_calls):
+        """
+        Makes the chosen SCAN calls fail, like a dropped connection.
+        """
+        scan = self.storage.scan
+        calls = []
+
+        def flaky(*args, **kwargs):
+            calls.append(args)
+            if len(calls) in failing_calls:
+                raise redis.ConnectionError("connection reset")
+            return scan(*args, **kwargs)
+        return patch.object(self.storage, 'scan', side_effect=flaky)
+
+    def test_scan_yields_every_matching_key_in_batches(self):
+        """
+        Test that scanning returns each matching key once, one batch per round trip.
+        """
+        self.fill(25)
+
+        with patch.object(self.storage, 'scan', wraps=self.storage.scan) as scan:
+            batches = list(scan_batches(self.storage, match="account:*", count=10))
+
+        self.assertGreater(len(batches), 1)
+        self.assertEqual(sorted(key for batch in batches for key in batch), [f"account:{i:03d}" for i in range(25)])
+        self.assertEqual(scan.call_count, len(batches))
+
+    def test_scan_is_lazy(self):
+        """
+        Test that no further SCAN calls are made until the next batch is requested.
+        """
+        self.fill(25)
+
+        with patch.object(self.storage, 'scan', wraps=self.storage.scan) as scan:
+            next(scan_batches(self.storage, count=10))
+        self.assertEqual(scan.call_count, 1)
+
+    def test_scan_filters_by_type(self):
+        """
+        Test that the type filter is passed through to SCAN.
+        """
+        self.fill(3)
+
+        self.assertEqual(sum(len(batch) for batch in scan_batches(self.storage, type='string')), 0)
+        self.assertEqual(sum(len(batch) for batch in scan_batches(self.storage, type='hash')), 4)
+
+    @patch('Models.redis_client.time.sleep')
+    def test_scan_resumes_from_cursor_after_connection_error(self, mock_sleep):
+        """
+        Test that a dropped connection retries the same cursor instead of restarting the scan.
+        """
+        self.fill(25)
+
+        with self.flaky_scan(failing_calls={2, 3}) as scan:
+            keys = [key for batch in scan_batches(self.storage, match="account:*", count=10) for key in batch]
+
+        self.assertEqual(sorted(keys), [f"account:{i:03d}" for i in range(25)])
+        self.assertEqual(mock_sleep.call_count, 2)
+        # The retries repeat the cursor of the failed call
+        self.assertEqual(scan.call_args_list[1], scan.call_args_list[2])
+        self.assertEqual(scan.call_args_list[2], scan.call_args_list[3])
+
+    @patch('Models.redis_client.time.sleep')
+    def test_scan_gives_up_after_retries(self, mock_sleep):
+        """
+        Test that the error is raised once the retries are used up.
+        """
+        with self.flaky_scan(failing_calls={1, 2, 3}):
+            with self.assertRaises(redis.ConnectionError):
+                list(scan_batches(self.storage, retries=2))
+
+    def test_hscan_yields_all_fields(self):
+        """
+        Test that HSCAN iteration returns every field of a hash.
+        """
+        self.storage.hset("big", mapping={f"field{i}": str(i) for i in range(15)})
+
+        fields = {}
+        for batch in hscan_batches(self.storage, "big", count=4):
+            fields.update(batch)
+
+        self.assertEqual(fields, self.storage.hgetall("big"))
+        self.assertEqual(len(fields), 15)
+
+if __name__ == '__main__':
+    unittest.main()
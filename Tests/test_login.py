@@ -1,7 +1,8 @@
 import bcrypt
 import unittest
 from Models.account import Account
-from Models.redis_client import RedisClient
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
 
 class TestAccountLogin(unittest.TestCase):
     """
@@ -13,12 +14,7 @@ class TestAccountLogin(unittest.TestCase):
         Set up Redis client and create Account instance for testing.
         Initializes test data in Redis with a predefined account.
         """
-        self.redis_client = RedisClient(
-            host="mycampsiteredis.redis.cache.windows.net",
-            port=6380,
-            password="F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8=",
-            ssl=True
-        ).client
+        self.redis_client = open_storage(TEST_STORAGE_BACKEND)
         self.account_manager = Account(self.redis_client)
         self.clear_redis_data()
 
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+import unittest
+import redis
+from Models.account import Account
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+from Utils.error_handler import handle_redis_errors
+from Utils.metrics import CLIENT_CALLS, PASSWORD_HASHING, Histogram, MetricsDumper, MetricsRegistry
+
+class TestHistogram(unittest.TestCase):
+    """
+    Unit tests for the latency histograms.
+    """
+
+    def test_calls_are_counted_in_buckets(self):
+        """
+        Test that each call lands in the first bucket at least as large as its latency.
+        """
+        histogram = Histogram('test_seconds', 'command', "Test.", buckets=(0.01, 0.1))
+        histogram.observe('HGET', 0.005)
+        histogram.observe('HGET', 0.05, error=True)
+        histogram.observe('HGET', 3)
+
+        data = histogram.snapshot()['HGET']
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data['errors'], 1)
+        self.assertEqual(data['buckets'], {'0.01': 1, '0.1': 1, '+Inf': 1})
+        self.assertAlmostEqual(data['sum'], 3.055)
+
+    def test_timed_block_that_raises_is_an_error(self):
+        """
+        Test that time() records a failing block as an error and re-raises.
+        """
+        histogram = Histogram('test_seconds', 'command', "Test.")
+        with self.assertRaises(ValueError):
+            with histogram.time('HSET'):
+                raise ValueError("boom")
+        self.assertEqual(histogram.snapshot()['HSET']['errors'], 1)
+
+    def test_prometheus_buckets_are_cumulative(self):
+        """
+        Test the Prometheus text format of a histogram and its error counter.
+        """
+        registry = MetricsRegistry()
+        histogram = registry.histogram('test_seconds', 'command', "Test latency.", buckets=(0.01, 0.1))
+        histogram.observe('HGET', 0.005)
+        histogram.observe('HGET', 0.05, error=True)
+
+        text = registry.to_prometheus()
+        self.assertIn("# TYPE test_seconds histogram", text)
+        self.assertIn('test_seconds_bucket{command="HGET",le="0.01"} 1', text)
+        self.assertIn('test_seconds_bucket{command="HGET",le="+Inf"} 2', text)
+        self.assertIn('test_seconds_count{command="HGET"} 2', text)
+        self.assertIn('test_errors_total{command="HGET"} 1', text)
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Tests that the app's calls are recorded.
+    """
+
+    def setUp(self):
+        """
+        Start each test from empty metrics.
+        """
+        CLIENT_CALLS.reset()
+        PASSWORD_HASHING.reset()
+
+    def test_error_handler_records_failures(self):
+        """
+        Test that handle_redis_errors still swallows errors and counts them.
+        """
+        @handle_redis_errors
+        def lookup(fail):
+            if fail:
+                raise redis.ConnectionError("down")
+            return "value"
+
+        self.assertEqual(lookup(False), "value")
+        self.assertIsNone(lookup(True))
+        data = CLIENT_CALLS.snapshot()[lookup.__qualname__]
+        self.assertEqual((data['count'], data['errors']), (2, 1))
+
+    def test_password_hash_timings_are_recorded(self):
+        """
+        Test that registering and logging in record their password hash and check.
+        """
+        account_manager = Account(open_storage(TEST_STORAGE_BACKEND))
+        account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")
+        account_manager.login("new@gmail.com", "pw")
+
+        data = PASSWORD_HASHING.snapshot()
+        self.assertEqual(data['bcrypt_hash']['count'], 1)
+        self.assertEqual(data['bcrypt_verify']['count'], 1)
+
+    def test_dumper_writes_json(self):
+        """
+        Test that the dumper writes the metrics as JSON.
+        """
+        registry = MetricsRegistry()
+        registry.histogram('test_seconds', 'command', "Test.").observe('HGET', 0.001)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            MetricsDumper(path, registry=registry).dump()
+            with open(path) as file:
+                dumped = json.load(file)
+        self.assertEqual(dumped['metrics']['test_seconds']['HGET']['count'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from Models import password_policy
+from Models.account import Account
+from Models.account_keys import account_key
+from Models.password_policy import PasswordPolicy, calibrate_bcrypt_rounds
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+
+class TestPasswordPolicy(unittest.TestCase):
+    """
+    Unit tests for hashing, verifying and calibrating under a password policy.
+    """
+
+    def setUp(self):
+        """
+        Use a cheap bcrypt cost so the tests run quickly.
+        """
+        self.policy = PasswordPolicy('bcrypt', bcrypt_rounds=4)
+
+    def test_hash_verifies_only_the_right_password(self):
+        """
+        Test that a hash verifies its own password and rejects others.
+        """
+        stored_hash = self.policy.hash("secret")
+        self.assertTrue(stored_hash.startswith("$2b$04$"))
+        self.assertTrue(self.policy.verify("secret", stored_hash))
+        self.assertFalse(self.policy.verify("wrong", stored_hash))
+
+    def test_malformed_hash_is_rejected(self):
+        """
+        Test that a corrupt stored hash fails verification instead of raising.
+        """
+        self.assertFalse(self.policy.verify("secret", "not-a-hash"))
+
+    def test_hash_with_other_cost_needs_rehash(self):
+        """
+        Test that only hashes made with another cost are reported for rehashing.
+        """
+        self.assertFalse(self.policy.needs_rehash(self.policy.hash("secret")))
+        self.assertTrue(self.policy.needs_rehash(PasswordPolicy(bcrypt_rounds=5).hash("secret")))
+
+    def test_calibration_stays_within_bounds(self):
+        """
+        Test that calibration never goes below the minimum or above the maximum cost.
+        """
+        self.assertEqual(calibrate_bcrypt_rounds(0, min_rounds=4, max_rounds=6), 4)
+        self.assertEqual(calibrate_bcrypt_rounds(60000, min_rounds=4, max_rounds=6), 6)
+
+    def test_unknown_scheme_is_rejected(self):
+        """
+        Test that a misspelt scheme raises instead of silently falling back.
+        """
+        with self.assertRaises(ValueError):
+            PasswordPolicy('scrypt')
+
+    @unittest.skipIf(password_policy.argon2 is not None, "argon2-cffi is installed")
+    def test_argon2_needs_its_package(self):
+        """
+        Test that choosing Argon2id without argon2-cffi gives a clear error.
+        """
+        with self.assertRaises(ValueError):
+            PasswordPolicy('argon2id')
+
+    @unittest.skipIf(password_policy.argon2 is None, "argon2-cffi is not installed")
+    def test_argon2_replaces_bcrypt_hashes(self):
+        """
+        Test that Argon2id hashes verify and that bcrypt hashes are reported for rehashing.
+        """
+        policy = PasswordPolicy('argon2id', argon2_time_cost=1, argon2_memory_cost=8192, argon2_parallelism=1)
+        stored_hash = policy.hash("secret")
+        self.assertTrue(policy.verify("secret", stored_hash))
+        self.assertFalse(policy.needs_rehash(stored_hash))
+        self.assertTrue(policy.needs_rehash(self.policy.hash("secret")))
+        self.assertTrue(policy.verify("secret", self.policy.hash("secret")))
+
+class TestRehashOnLogin(unittest.TestCase):
+    """
+    Tests that logging in upgrades hashes made under an older policy.
+    """
+
+    def setUp(self):
+        """
+        Store an account hashed with cost 4 and log in under a cost 5 policy.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        Account(self.storage, PasswordPolicy(bcrypt_rounds=4)).register("user@gmail.com", "pw", "User", "pet", "Rex")
+        self.account_manager = Account(self.storage, PasswordPolicy(bcrypt_rounds=5))
+
+    def stored_hash(self):
+        return self.storage.hget(account_key("user@gmail.com"), 'password')
+
+    def test_successful_login_upgrades_hash(self):
+        """
+        Test that the hash is replaced with one under the current policy after a login.
+        """
+        self.assertTrue(self.account_manager.login("user@gmail.com", "pw"))
+        self.assertTrue(self.stored_hash().startswith("$2b$05$"))
+        self.assertTrue(self.account_manager.login("user@gmail.com", "pw"))
+
+    def test_failed_login_keeps_hash(self):
+        """
+        Test that a wrong password never triggers a rehash.
+        """
+        self.assertFalse(self.account_manager.login("user@gmail.com", "wrong"))
+        self.assertTrue(self.stored_hash().startswith("$2b$04$"))
+
+    def test_upgrade_does_not_undo_password_change(self):
+        """
+        Test that a hash changed after it was verified is not overwritten by the upgrade.
+        """
+        verified_hash = self.stored_hash()
+        self.account_manager.repository.update("user@gmail.com", {'password': "changed"})
+        self.assertFalse(self.account_manager.upgrade_password_hash("user@gmail.com", "pw", verified_hash))
+        self.assertEqual(self.stored_hash(), "changed")
+
+if __name__ == '__main__':
+    unittest.main()
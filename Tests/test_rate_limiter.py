@@ -0,0 +1,130 @@
+import time
+import unittest
+from unittest.mock import patch
+from Logic.app_logic import AppLogic
+from Models.account import Account
+from Models.password_policy import PasswordPolicy
+from Models.rate_limiter import RateLimiter, RateLimitExceeded
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
+from Utils.metrics import RATE_LIMITED
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Unit tests for the token-bucket rate limiter.
+    """
+
+    def setUp(self):
+        """
+        Create a limiter allowing 3 logins per login name and 5 attempts per client.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        self.limiter = RateLimiter(self.storage, {'login': (3, 60), 'reset': (3, 60), 'client': (5, 60)}, "test-client")
+        RATE_LIMITED.reset()
+
+    def test_attempts_over_capacity_are_rejected(self):
+        """
+        Test that the attempt after the bucket is empty is rejected with a retry time.
+        """
+        for _ in range(3):
+            self.limiter.check('login', "user@gmail.com")
+        with self.assertRaises(RateLimitExceeded) as context:
+            self.limiter.check('login', "user@gmail.com")
+
+        self.assertEqual(context.exception.scope, 'login')
+        self.assertGreater(context.exception.retry_after, 0)
+        self.assertLessEqual(context.exception.retry_after, 20)
+        self.assertEqual(self.limiter.rejected['login'], 1)
+        self.assertEqual(RATE_LIMITED.snapshot(), {'login': 1})
+
+    def test_login_names_and_actions_have_separate_buckets(self):
+        """
+        Test that one login name running out does not limit another, or another action.
+        """
+        for _ in range(3):
+            self.limiter.check('login', "user@gmail.com")
+        self.limiter.check('login', "other@gmail.com")
+        self.limiter.check('reset', "user@gmail.com")
+
+    def test_client_spraying_many_accounts_is_rejected(self):
+        """
+        Test that the per-client bucket stops attempts spread over many login names.
+        """
+        for i in range(5):
+            self.limiter.check('login', f"user{i}@gmail.com")
+        with self.assertRaises(RateLimitExceeded) as context:
+            self.limiter.check('login', "user9@gmail.com")
+        self.assertEqual(context.exception.scope, 'client')
+
+        # Another client is not affected
+        self.limiter.check('login', "user9@gmail.com", client_id="other-client")
+
+    def test_bucket_refills_over_time(self):
+        """
+        Test that tokens come back at the configured rate.
+        """
+        limiter = RateLimiter(self.storage, {'login': (1, 0.2), 'client': (100, 1)}, "test-client")
+        limiter.check('login', "user@gmail.com")
+        with self.assertRaises(RateLimitExceeded):
+            limiter.check('login', "user@gmail.com")
+        time.sleep(0.25)
+        limiter.check('login', "user@gmail.com")
+
+class TestAccountRateLimit(unittest.TestCase):
+    """
+    Tests that the account operations are throttled before any password is checked.
+    """
+
+    def setUp(self):
+        """
+        Store an account and limit logins to two per login name.
+        """
+        self.storage = open_storage(TEST_STORAGE_BACKEND)
+        self.addCleanup(self.storage.close)
+        self.storage.flushdb()
+        limiter = RateLimiter(self.storage, {'login': (2, 60), 'reset': (2, 60), 'client': (10, 60)}, "test-client")
+        self.account_manager = Account(self.storage, PasswordPolicy(bcrypt_rounds=4), limiter)
+        self.account_manager.register("user@gmail.com", "pw", "User", "pet", "Rex")
+
+    def test_limited_login_skips_password_check(self):
+        """
+        Test that a rejected login never reaches the password hash.
+        """
+        self.assertFalse(self.account_manager.login("user@gmail.com", "wrong"))
+        self.assertFalse(self.account_manager.login("user@gmail.com", "wrong"))
+        with patch.object(self.account_manager.password_policy, 'verify') as verify:
+            with self.assertRaises(RateLimitExceeded):
+                self.account_manager.login("user@gmail.com", "pw")
+            verify.assert_not_called()
+
+    def test_password_reset_is_limited(self):
+        """
+        Test that password resets use their own bucket.
+        """
+        self.assertTrue(self.account_manager.forgot_password("user@gmail.com", "Rex", "new", "new"))
+        self.assertFalse(self.account_manager.forgot_password("user@gmail.com", "Wrong", "new", "new"))
+        with self.assertRaises(RateLimitExceeded):
+            self.account_manager.forgot_password("user@gmail.com", "Rex", "new", "new")
+        self.assertTrue(self.account_manager.login("user@gmail.com", "new"))
+
+    def test_reset_flow_reports_the_limit(self):
+        """
+        Test that the app's reset flow takes one attempt per reset and shows the rate
+        limit message instead of calling a correct answer incorrect.
+        """
+        logic = AppLogic(connect=False)
+        logic.account_manager = self.account_manager
+
+        self.assertEqual(logic.verify_security_answer("user@gmail.com", "Rex"), (True, "Security answer verified."))
+        self.assertEqual(logic.reset_password("user@gmail.com", "new"), (True, "Password updated successfully."))
+        self.assertEqual(logic.verify_security_answer("user@gmail.com", "Max"), (False, "Incorrect security answer."))
+
+        is_correct, message = logic.verify_security_answer("user@gmail.com", "Rex")
+        self.assertFalse(is_correct)
+        self.assertNotEqual(message, "Incorrect security answer.")
+        self.assertIn("Too many", message)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,8 @@ import unittest
 import logging
 import time
 from Models.account import Account
-from Models.redis_client import RedisClient
+from Models.storage import open_storage
+from Utils.config import TEST_STORAGE_BACKEND
 
 # Configure logging to display DEBUG level messages
 logging.basicConfig(level=logging.DEBUG)
@@ -29,12 +30,7 @@ class TestPasswordReset(unittest.TestCase):
         Initializes a connection to Redis and ensures a clean environment.
         """
         logging.info("Setting up Redis client and Account manager.")
-        self.redis_client = RedisClient(
-            host="mycampsiteredis.redis.cache.windows.net",
-            port=6380,
-            password="F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8=",
-            ssl=True
-        )
+        self.redis_client = open_storage(TEST_STORAGE_BACKEND)
         self.account_manager = Account(self.redis_client)
         self.clear_redis_data()  # Clear Redis data to avoid test conflicts
 
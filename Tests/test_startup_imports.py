@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import unittest
+from Utils.startup_profile import StartupProfiler
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def loaded_modules(module_name):
+    """
+    Imports a module in a fresh interpreter and returns every module that ended up loaded.
+
+    Args:
+        module_name (str): The module to import, e.g. 'clean_database'.
+
+    Returns:
+        set: Names of the loaded modules.
+    """
+    script = f"import sys, {module_name}; print('\\n'.join(sys.modules))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.split())
+
+class TestStartupImports(unittest.TestCase):
+    """
+    Tests that heavy libraries are only imported where they are used.
+    """
+
+    def test_headless_tools_do_not_import_kivy(self):
+        """
+        Test that the command line tools and the logic layer never load the GUI toolkit.
+        """
+        for module_name in ("clean_database", "migrate_account_keys", "calibrate_password_hash",
+                            "Logic.app_logic", "Utils.data_loader"):
+            with self.subTest(module=module_name):
+                kivy_modules = [name for name in loaded_modules(module_name) if name.split('.')[0] == 'kivy']
+                self.assertEqual(kivy_modules, [])
+
+    def test_logic_layer_does_not_import_redis(self):
+        """
+        Test that importing the logic layer leaves redis to be loaded when it connects.
+        """
+        self.assertNotIn('redis', loaded_modules("Logic.app_logic"))
+
+class TestStartupProfiler(unittest.TestCase):
+    """
+    Tests that the profiler records imports and steps only while enabled.
+    """
+
+    def test_records_new_imports_and_steps(self):
+        """
+        Test that modules imported for the first time and marked steps appear in the timeline.
+        """
+        sys.modules.pop('wave', None)
+        profiler = StartupProfiler(threshold_ms=0)
+        profiler.enable()
+        try:
+            import wave  # noqa: F401 - a small stdlib module that nothing here imports
+            profiler.mark("ready")
+        finally:
+            profiler.disable()
+
+        labels = [(kind, label) for _, _, kind, label, _, _ in profiler.timeline()]
+        self.assertIn(('import', 'wave'), labels)
+        self.assertIn(('step', 'ready'), labels)
+
+    def test_disabled_profiler_records_nothing(self):
+        """
+        Test that steps and phases cost nothing when profiling is off.
+        """
+        profiler = StartupProfiler()
+        profiler.mark("ready")
+        with profiler.phase("build main menu"):
+            pass
+        self.assertEqual(profiler.timeline(), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+import os
+import tempfile
+import unittest
+from Models.account import Account
+from Models.account_keys import account_key
+from Models.memory_backend import MemoryBackend
+from Models.redis_client import scan_batches
+from Models.sqlite_backend import SQLiteBackend
+from Models.storage import open_storage
+from Models.storage_backend import MAX_OPEN_CURSORS
+
+class BackendContract:
+    """
+    Checks shared by every storage backend. Subclasses provide make_backend().
+    """
+
+    def setUp(self):
+        """
+        Create an empty backend.
+        """
+        self.storage = self.make_backend()
+        self.addCleanup(self.storage.close)
+
+    def test_hash_commands_match_redis(self):
+        """
+        Test that hash reads and writes return what redis.Redis would.
+        """
+        self.assertEqual(self.storage.hset("user", mapping={'name': "Ann", 'age': 30}), 2)
+        self.assertEqual(self.storage.hset("user", mapping={'name': "Bea", 'pet': "Rex"}), 1)
+        self.assertEqual(self.storage.hgetall("user"), {'name': "Bea", 'age': "30", 'pet': "Rex"})
+        self.assertEqual(self.storage.hget("user", 'age'), "30")
+        self.assertIsNone(self.storage.hget("user", 'missing'))
+        self.assertEqual(self.storage.hmget("user", ['name', 'missing']), ["Bea", None])
+        self.assertEqual(self.storage.hsetnx("user", 'name', "Cat"), 0)
+        self.assertEqual(self.storage.hsetnx("user", 'city', "Perth"), 1)
+        self.assertEqual(self.storage.hgetall("missing"), {})
+
+    def test_field_deletion_matches_redis(self):
+        """
+        Test that deleting the last field of a hash deletes the hash.
+        """
+        self.storage.hset("user", mapping={'name': "Ann", 'pet': "Rex"})
+        self.assertEqual((self.storage.hlen("user"), sorted(self.storage.hkeys("user"))), (2, ['name', 'pet']))
+        self.assertEqual(self.storage.hdel("user", 'name', 'name', 'missing'), 1)
+        self.assertEqual(self.storage.hdel("user", 'pet'), 1)
+        self.assertEqual((self.storage.exists("user"), self.storage.hkeys("user")), (0, []))
+
+    def test_exists_delete_and_rename(self):
+        """
+        Test key existence, deletion and renaming.
+        """
+        self.storage.hset("a", mapping={'x': 1})
+        self.storage.hset("b", mapping={'x': 2})
+        self.assertEqual(self.storage.exists("a", "b", "c"), 2)
+        self.storage.rename("a", "b")
+        self.assertEqual(self.storage.hgetall("b"), {'x': "1"})
+        self.assertEqual(self.storage.delete("a", "b"), 1)
+        self.assertEqual(self.storage.dbsize(), 0)
+
+    def test_scan_visits_every_key_while_deleting(self):
+        """
+        Test that a scan sees every key once even when keys are deleted during it.
+        """
+        for i in range(95):
+            self.storage.hset(f"key{i:03d}", mapping={'value': i})
+        seen = []
+        for keys in scan_batches(self.storage, match="key*", count=10):
+            seen.extend(keys)
+            self.storage.delete(*keys)
+        self.assertEqual(sorted(seen), [f"key{i:03d}" for i in range(95)])
+        self.assertEqual(self.storage.dbsize(), 0)
+
+    def test_abandoned_scans_are_forgotten(self):
+        """
+        Test that cursors of scans that are never finished do not pile up.
+        """
+        for i in range(20):
+            self.storage.hset(f"key{i:02d}", mapping={'x': i})
+        for _ in range(MAX_OPEN_CURSORS + 10):
+            self.assertNotEqual(self.storage.scan(count=5)[0], 0)
+        self.assertEqual(len(self.storage._cursors), MAX_OPEN_CURSORS)
+
+        cursor, keys = self.storage.scan(count=5)
+        while cursor:
+            cursor, batch = self.storage.scan(cursor=cursor, count=5)
+            keys.extend(batch)
+        self.assertEqual(keys, [f"key{i:02d}" for i in range(20)])
+
+    def test_hscan_pages_through_fields(self):
+        """
+        Test that HSCAN returns every field in pages.
+        """
+        self.storage.hset("big", mapping={f"field{i:02d}": i for i in range(25)})
+        fields, cursor = {}, 0
+        while True:
+            cursor, batch = self.storage.hscan("big", cursor=cursor, count=10)
+            fields.update(batch)
+            if cursor == 0:
+                break
+        self.assertEqual(len(fields), 25)
+
+    def test_pipeline_returns_results_in_order(self):
+        """
+        Test that a pipeline applies its commands together and returns their results in order.
+        """
+        pipeline = self.storage.pipeline(transaction=True)
+        pipeline.hset("a", mapping={'x': 1})
+        pipeline.exists("a")
+        pipeline.hget("a", 'x')
+        self.assertEqual(pipeline.execute(), [1, 1, "1"])
+
+    def test_failed_pipeline_stores_nothing(self):
+        """
+        Test that a pipeline whose call raises rolls back the writes queued before it.
+        """
+        self.storage.hset("kept", mapping={'x': 1})
+        pipeline = self.storage.pipeline(transaction=True)
+        pipeline.hset("a", mapping={'x': 1})
+        pipeline.delete("kept")
+        pipeline.rename("missing", "x")
+        pipeline.hset("b", mapping={'x': 1})
+        with self.assertRaises(KeyError):
+            pipeline.execute()
+
+        self.assertEqual(sorted(self.storage.keys()), ["kept"])
+        self.assertEqual(self.storage.hgetall("kept"), {'x': "1"})
+        # Later operations commit as usual
+        self.storage.hset("c", mapping={'x': 1})
+        self.assertEqual(sorted(self.storage.keys()), ["c", "kept"])
+
+    def test_accounts_work_through_script_fallbacks(self):
+        """
+        Test that account creation, login and password reset run on the backend.
+        """
+        account_manager = Account(self.storage)
+        self.assertTrue(account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")[0])
+        self.assertFalse(account_manager.register("new@gmail.com", "pw", "New", "pet", "Rex")[0])
+        self.assertTrue(account_manager.forgot_password("new@gmail.com", "Rex", "newpw", "newpw"))
+        self.assertTrue(account_manager.login("new@gmail.com", "newpw"))
+        self.assertIn(account_key("new@gmail.com"), self.storage.keys("account:*"))
+
+class TestMemoryBackend(BackendContract, unittest.TestCase):
+    """
+    Tests for the in-process memory backend.
+    """
+
+    def make_backend(self):
+        return MemoryBackend()
+
+class TestSQLiteBackend(BackendContract, unittest.TestCase):
+    """
+    Tests for the SQLite backend.
+    """
+
+    def make_backend(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "campsite.db")
+        return SQLiteBackend(self.path)
+
+    def test_data_survives_reopening(self):
+        """
+        Test that stored hashes are still there after the database is reopened.
+        """
+        self.storage.hset("user", mapping={'name': "Ann"})
+        self.storage.close()
+        reopened = SQLiteBackend(self.path)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.hgetall("user"), {'name': "Ann"})
+
+class TestOpenStorage(unittest.TestCase):
+    """
+    Tests for choosing a backend by name.
+    """
+
+    def test_unknown_backend_is_rejected(self):
+        """
+        Test that a misspelt backend name raises instead of silently falling back.
+        """
+        with self.assertRaises(ValueError):
+            open_storage('mongo')
+
+    def test_memory_backend_is_selected(self):
+        """
+        Test that the memory backend can be chosen by name.
+        """
+        self.assertIsInstance(open_storage('memory'), MemoryBackend)
+
+if __name__ == '__main__':
+    unittest.main()
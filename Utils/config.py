@@ -0,0 +1,97 @@
+import os
+import socket
+
+# Connection details for the application's Redis database. Each value can be overridden
+# with an environment variable so tools and tests can point at another server.
+REDIS_SETTINGS = {
+    'host': os.environ.get('CAMPSITE_REDIS_HOST', 'mycampsiteredis.redis.cache.windows.net'),
+    'port': int(os.environ.get('CAMPSITE_REDIS_PORT', '6380')),
+    'password': os.environ.get('CAMPSITE_REDIS_PASSWORD', 'F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8='),
+    'ssl': os.environ.get('CAMPSITE_REDIS_SSL', '1') != '0',
+    # Set to 1 when host and port point at a node of a Redis Cluster
+    'cluster': os.environ.get('CAMPSITE_REDIS_CLUSTER', '0') == '1'
+}
+
+# Where accounts are stored: 'redis' (the server above), 'sqlite' (a local file) or
+# 'memory' (in-process, nothing is kept after the app exits)
+STORAGE_SETTINGS = {
+    'backend': os.environ.get('CAMPSITE_STORAGE', 'redis'),
+    'path': os.environ.get('CAMPSITE_SQLITE_PATH', 'campsite.db')
+}
+
+# Backend the test suite runs against, so tests need no network unless asked to
+TEST_STORAGE_BACKEND = os.environ.get('CAMPSITE_TEST_STORAGE', 'memory')
+
+# Periodic dump of the in-process metrics (see Utils.metrics). Nothing is written unless a
+# path is set; the format is 'json' or 'prometheus' (for a node exporter's textfile collector).
+METRICS_SETTINGS = {
+    'path': os.environ.get('CAMPSITE_METRICS_PATH'),
+    'format': os.environ.get('CAMPSITE_METRICS_FORMAT', 'json'),
+    'interval': float(os.environ.get('CAMPSITE_METRICS_INTERVAL', '60'))
+}
+
+# Password hashing (see Models.password_policy). With CAMPSITE_PASSWORD_CALIBRATE=1 the
+# work factor is measured on this machine at startup so one hash takes about target_ms,
+# instead of using the configured bcrypt_rounds or argon2_time_cost.
+PASSWORD_SETTINGS = {
+    'scheme': os.environ.get('CAMPSITE_PASSWORD_SCHEME', 'bcrypt'),
+    'bcrypt_rounds': int(os.environ.get('CAMPSITE_BCRYPT_ROUNDS', '12')),
+    'argon2_time_cost': int(os.environ.get('CAMPSITE_ARGON2_TIME_COST', '3')),
+    'argon2_memory_cost': int(os.environ.get('CAMPSITE_ARGON2_MEMORY_KIB', '65536')),
+    'argon2_parallelism': int(os.environ.get('CAMPSITE_ARGON2_PARALLELISM', '4')),
+    'calibrate': os.environ.get('CAMPSITE_PASSWORD_CALIBRATE', '0') == '1',
+    'target_ms': float(os.environ.get('CAMPSITE_PASSWORD_TARGET_MS', '250'))
+}
+
+# Token buckets limiting login and password-reset attempts before any password is hashed
+# (see Models.rate_limiter): (attempts, window in seconds). Attempts are counted per login
+# name and per client; the bucket refills gradually, at attempts per window.
+RATE_LIMIT_SETTINGS = {
+    'enabled': os.environ.get('CAMPSITE_RATE_LIMIT', '1') != '0',
+    'login': (int(os.environ.get('CAMPSITE_LOGIN_ATTEMPTS', '5')), float(os.environ.get('CAMPSITE_LOGIN_WINDOW', '60'))),
+    'reset': (int(os.environ.get('CAMPSITE_RESET_ATTEMPTS', '5')), float(os.environ.get('CAMPSITE_RESET_WINDOW', '300'))),
+    'client': (int(os.environ.get('CAMPSITE_CLIENT_ATTEMPTS', '30')), float(os.environ.get('CAMPSITE_CLIENT_WINDOW', '60'))),
+    'client_id': os.environ.get('CAMPSITE_CLIENT_ID') or socket.gethostname()
+}
+
+# In-process filter of registered login names (see Models.account_filter), so lookups for
+# accounts that do not exist need no round trip. Built with one SCAN at startup.
+ACCOUNT_FILTER_ENABLED = os.environ.get('CAMPSITE_ACCOUNT_FILTER', '1') != '0'
+
+# In-process cache of account hashes (see Models.field_cache), invalidated through Redis
+# client tracking, so repeated reads of one account need no round trip. Needs Redis 6 or
+# later and a standalone (not cluster) deployment; otherwise reads go to Redis as usual.
+FIELD_CACHE_SETTINGS = {
+    'enabled': os.environ.get('CAMPSITE_FIELD_CACHE', '1') != '0',
+    'max_entries': int(os.environ.get('CAMPSITE_FIELD_CACHE_SIZE', '10000')),
+    'ttl': float(os.environ.get('CAMPSITE_FIELD_CACHE_TTL', '300'))
+}
+
+# Startup profiling (see Utils.startup_profile): prints a timeline of module imports and
+# startup steps once the app is ready. Imports quicker than the threshold are left out.
+STARTUP_PROFILE_SETTINGS = {
+    'enabled': os.environ.get('CAMPSITE_PROFILE_STARTUP', '0') == '1',
+    'threshold_ms': float(os.environ.get('CAMPSITE_PROFILE_THRESHOLD_MS', '2'))
+}
+
+# The asyncio account service (see account_server.py): where it listens, and the limits
+# that bound its work under load. Requests beyond max_in_flight wait, up to max_queue,
+# and are turned away after that; hash_workers passwords are hashed at once (0 = one per CPU).
+SERVICE_SETTINGS = {
+    'host': os.environ.get('CAMPSITE_SERVICE_HOST', '127.0.0.1'),
+    'port': int(os.environ.get('CAMPSITE_SERVICE_PORT', '8080')),
+    'max_connections': int(os.environ.get('CAMPSITE_SERVICE_MAX_CONNECTIONS', '1000')),
+    'max_in_flight': int(os.environ.get('CAMPSITE_SERVICE_MAX_IN_FLIGHT', '64')),
+    'max_queue': int(os.environ.get('CAMPSITE_SERVICE_MAX_QUEUE', '256')),
+    'hash_workers': int(os.environ.get('CAMPSITE_SERVICE_HASH_WORKERS', '0')),
+    'redis_connections': int(os.environ.get('CAMPSITE_SERVICE_REDIS_CONNECTIONS', '50'))
+}
+
+# How accounts are laid out in Redis (see Models.compact_accounts): 'hash' keeps each account
+# in its own hash, 'compact' packs them into small bucket hashes to save memory at volume.
+# The bucket count cannot change once accounts are stored; aim for about 64 accounts per
+# bucket, and raise hash-max-listpack-value to 256 so the buckets stay listpack-encoded.
+ACCOUNT_LAYOUT_SETTINGS = {
+    'layout': os.environ.get('CAMPSITE_ACCOUNT_LAYOUT', 'hash'),
+    'buckets': int(os.environ.get('CAMPSITE_COMPACT_BUCKETS', '16384'))
+}
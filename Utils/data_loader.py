@@ -1,19 +1,157 @@
 import csv
-import bcrypt
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from Models.account_filter import publish_account_rebuild
+from Models.cluster_pipeline import batch_pipeline
+from Models.compact_accounts import account_writer
+from Models.password_policy import get_password_policy, set_password_policy
+from Utils.import_checkpoint import FileCheckpointStore, file_fingerprint
 
-class DataLoader: #NOTE test CSV data is in Assets folder, drag to root folder to test. 
+EXPECTED_HEADERS = ['username', 'password', 'firstname', 'first dogs name']
+
+def hash_password(password):
+    """
+    Hashes a plain-text password under the application's password policy.
+
+    Kept at module level so it can be pickled and sent to a process pool. Hashes done in
+    a worker process are recorded in that process's metrics, not the parent's.
+
+    Args:
+        password (str): The plain-text password.
+
+    Returns:
+        str: The hash of the password.
+    """
+    return get_password_policy().hash(password)
+
+def chunked(items, size):
+    """
+    Groups an iterable into lists of at most `size` items without reading it all into memory.
+
+    Args:
+        items (iterable): The items to group.
+        size (int): The maximum number of items per chunk.
+
+    Yields:
+        list: The next chunk of items.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+class OffsetLineReader:
+    """
+    Iterates over the lines of a binary file while tracking the byte offset consumed so far.
+
+    csv.reader pulls exactly the lines it needs for each record, so after a record is
+    returned, `offset` points at the start of the next record and can be saved as a
+    resume point.
+    """
+
+    def __init__(self, file, offset=0, encoding='utf-8'):
+        """
+        Initializes the reader.
+
+        Args:
+            file (io.BufferedReader): File opened in binary mode, positioned at `offset`.
+            offset (int, optional): Byte offset of the current file position. Defaults to 0.
+            encoding (str, optional): Encoding used to decode each line. Defaults to 'utf-8'.
+        """
+        self.file = file
+        self.offset = offset
+        self.encoding = encoding
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self.offset += len(line)
+        return line.decode(self.encoding)
+
+class DataLoader: #NOTE test CSV data is in Assets folder, drag to root folder to test.
     """
     A class for loading and managing data in Redis from a CSV file.
+
+    Rows are processed in chunks: the passwords of a chunk are hashed (in parallel when
+    more than one worker is configured) and the chunk is then written to Redis as one
+    pipelined batch, so each chunk costs a single round trip.
     """
 
-    def __init__(self, redis_client):
+    def __init__(self, redis_client, workers=1, use_processes=False, chunk_size=500, transactional=True,
+                 manifest=None, progress_callback=None):
         """
         Initializes the DataLoader with a Redis client.
 
         Args:
             redis_client (redis.Redis): Redis client for database operations.
+            workers (int, optional): Number of workers used to hash passwords. 1 hashes on the
+                calling thread, None uses one worker per CPU core. Defaults to 1.
+            use_processes (bool, optional): Hash in a process pool instead of a thread pool.
+                bcrypt releases the GIL, so threads are usually enough. Defaults to False.
+            chunk_size (int, optional): Number of rows written per pipelined batch. Defaults to 500.
+            transactional (bool, optional): Wrap each batch in MULTI/EXEC so a chunk is stored
+                completely or not at all. Defaults to True.
+            manifest (LoadManifest, optional): Manifest of previously loaded files and rows. When
+                given, unchanged files are skipped outright and unchanged rows are neither
+                re-hashed nor re-written. Defaults to None.
+            progress_callback (function, optional): Called with each chunk report as soon as
+                the chunk has been processed. Defaults to None.
         """
         self.redis_client = redis_client
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self.chunk_size = max(1, chunk_size)
+        self.transactional = transactional
+        self.manifest = manifest
+        self.progress_callback = progress_callback
+        # Writes each account in the configured layout (see Models.compact_accounts)
+        self.write_account = account_writer(redis_client)
+
+    def hash_passwords(self, passwords, executor=None):
+        """
+        Hashes a batch of passwords, in parallel when more than one worker is configured.
+
+        A failure for one password does not affect the others, so callers can report
+        errors per row.
+
+        Args:
+            passwords (list): Plain-text passwords to hash.
+            executor (concurrent.futures.Executor, optional): Pool to reuse. A temporary pool
+                is created when parallel hashing is enabled and none is given.
+
+        Returns:
+            list: One (hashed_password, error) tuple per password, in input order.
+                Exactly one of the two values is None.
+        """
+        if executor is None and (self.workers <= 1 or len(passwords) <= 1):
+            results = []
+            for password in passwords:
+                try:
+                    results.append((hash_password(password), None))
+                except Exception as e:
+                    results.append((None, e))
+            return results
+
+        if executor is None:
+            with self._create_executor() as temporary_executor:
+                return self.hash_passwords(passwords, temporary_executor)
+
+        futures = [executor.submit(hash_password, password) for password in passwords]
+        results = []
+        for future in futures:
+            try:
+                results.append((future.result(), None))
+            except Exception as e:
+                results.append((None, e))
+        return results
 
     def load_initial_data(self, csv_file):
         """
@@ -21,44 +159,32 @@ class DataLoader: #NOTE test CSV data is in Assets folder, drag to root folder t
 
         Args:
             csv_file (str): Path to the CSV file containing initial data.
+
+        Returns:
+            list: One report dictionary per chunk (see _store_chunk).
         """
+        reports = []
         try:
+            file_digest = self._manifest_file_digest(csv_file)
+            if file_digest is False:
+                return reports
+
             with open(csv_file, mode='r') as file:
                 reader = csv.DictReader(file)
-                expected_headers = ['username', 'password', 'firstname', 'first dogs name']
 
                 # Verify that CSV headers match the expected schema
-                if reader.fieldnames != expected_headers:
+                if reader.fieldnames != EXPECTED_HEADERS:
                     raise ValueError("CSV headers do not match the expected schema.")
 
-                for row in reader:
-                    username = row.get('username').strip()
-                    password = row.get('password').strip()
-                    firstname = row.get('firstname').strip()
-                    first_dogs_name = row.get('first dogs name').strip()
-
-                    # Ensure all required fields are present before saving to Redis
-                    if username and password and firstname and first_dogs_name:
-                        # Hash the password before storing it in Redis
-                        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-
-                        # Prepare the mapping dictionary for Redis storage
-                        data_mapping = {
-                            'password': hashed_password.decode('utf-8'),
-                            'first_name': firstname,
-                            'security_answer': first_dogs_name
-                        }
-
-                        # Store the account details in Redis
-                        self.redis_client.hset(username, mapping=data_mapping)
-                    else:
-                        print(f"Skipping row with missing data: {row}")
+                reports = self._store_accounts(self._parse_rows(reader, skip_row_errors=False))
 
+            self._record_file_loaded(csv_file, file_digest, reports)
             print("Initial data loaded into Redis.")
         except FileNotFoundError:
             print(f"File not found: {csv_file}")
         except Exception as e:
             print(f"An error occurred while loading data: {e}")
+        return reports
 
     def clear_redis_data(self):
         """
@@ -76,30 +202,298 @@ class DataLoader: #NOTE test CSV data is in Assets folder, drag to root folder t
 
         Args:
             csv_file (str): Path to the CSV file containing data.
+
+        Returns:
+            list: One report dictionary per chunk (see _store_chunk).
         """
+        reports = []
         try:
+            file_digest = self._manifest_file_digest(csv_file)
+            if file_digest is False:
+                return reports
+
             with open(csv_file, mode='r') as file:
                 reader = csv.DictReader(file)
-                for row in reader:
-                    try:
-                        username = row.get('username').strip()
-                        password = row.get('password').strip()
-                        firstname = row.get('firstname').strip()
-                        first_dogs_name = row.get('first dogs name').strip()
-
-                        # Hash the password and save valid rows to Redis
-                        if username and password and firstname and first_dogs_name:
-                            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-                            self.redis_client.hset(username, mapping={
-                                'password': hashed_password.decode('utf-8'),
-                                'first_name': firstname,
-                                'security_answer': first_dogs_name
-                            })
-                        else:
-                            print(f"Skipping row with missing fields: {row}")
-                    except Exception as row_error:
-                        print(f"Error processing row {row}: {row_error}")
+                reports = self._store_accounts(self._parse_rows(reader, skip_row_errors=True))
 
+            self._record_file_loaded(csv_file, file_digest, reports)
             print("Data loaded with additional error handling.")
         except Exception as e:
             print(f"Error loading data: {e}")
+        return reports
+
+    def load_streaming(self, csv_file, checkpoint_store=None):
+        """
+        Streams a CSV file into Redis with bounded memory, resuming from the last checkpoint.
+
+        Only one chunk is held in memory at a time. After each chunk is committed, the byte
+        offset reached and a fingerprint of the file are saved, and a later call on the same
+        file continues from there instead of re-hashing rows that are already stored. The
+        import stops at the first failed chunk so the checkpoint never skips unsaved rows,
+        and the checkpoint is removed once the whole file has been loaded.
+
+        Args:
+            csv_file (str): Path to the CSV file containing data.
+            checkpoint_store (optional): Store for the checkpoint, such as FileCheckpointStore
+                or RedisCheckpointStore. Defaults to a '.checkpoint.json' sidecar file next
+                to the CSV file.
+
+        Returns:
+            list: One report dictionary per chunk processed by this call.
+        """
+        if checkpoint_store is None:
+            checkpoint_store = FileCheckpointStore(f"{csv_file}.checkpoint.json")
+
+        reports = []
+        try:
+            file_digest = self._manifest_file_digest(csv_file)
+            if file_digest is False:
+                checkpoint_store.clear()
+                return reports
+
+            fingerprint = file_fingerprint(csv_file)
+            checkpoint = checkpoint_store.load()
+            if checkpoint and checkpoint.get('fingerprint') != fingerprint:
+                print("Checkpoint belongs to a different version of the file, starting over.")
+                checkpoint = None
+
+            with open(csv_file, mode='rb') as file:
+                header_reader = OffsetLineReader(file)
+                fieldnames = next(csv.reader(header_reader), None)
+                if fieldnames != EXPECTED_HEADERS:
+                    raise ValueError("CSV headers do not match the expected schema.")
+
+                lines = header_reader
+                rows_committed = 0
+                if checkpoint:
+                    file.seek(checkpoint['offset'])
+                    lines = OffsetLineReader(file, checkpoint['offset'])
+                    rows_committed = checkpoint['rows']
+                    print(f"Resuming import after {rows_committed} rows.")
+
+                def save_checkpoint(report):
+                    nonlocal rows_committed
+                    rows_committed += report['rows']
+                    checkpoint_store.save({
+                        'fingerprint': fingerprint,
+                        'offset': lines.offset,
+                        'rows': rows_committed
+                    })
+
+                reader = csv.DictReader(lines, fieldnames=fieldnames)
+                reports = self._store_accounts(
+                    self._parse_rows(reader, skip_row_errors=True),
+                    on_chunk_stored=save_checkpoint,
+                    stop_on_error=True
+                )
+
+            if reports and reports[-1]['error'] is not None:
+                print(f"Import stopped after {rows_committed} rows, run it again to resume.")
+            else:
+                checkpoint_store.clear()
+                self._record_file_loaded(csv_file, file_digest, reports)
+                print("Streaming import completed.")
+        except FileNotFoundError:
+            print(f"File not found: {csv_file}")
+        except Exception as e:
+            print(f"Error loading data: {e}")
+        return reports
+
+    def _manifest_file_digest(self, csv_file):
+        """
+        Digests the file for the manifest and checks whether it has already been loaded.
+
+        Args:
+            csv_file (str): Path to the CSV file.
+
+        Returns:
+            str: The file digest, None when no manifest is configured, or False when the
+                file is unchanged since its last complete load and can be skipped.
+        """
+        if self.manifest is None:
+            return None
+
+        file_digest = self.manifest.file_digest(csv_file)
+        if self.manifest.is_file_loaded(csv_file, file_digest):
+            print(f"{csv_file} is unchanged since it was last loaded, skipping.")
+            return False
+        return file_digest
+
+    def _record_file_loaded(self, csv_file, file_digest, reports):
+        """
+        Records the file in the manifest if every row of it was stored.
+
+        Args:
+            csv_file (str): Path to the CSV file.
+            file_digest (str): Digest returned by _manifest_file_digest.
+            reports (list): The chunk reports of the load.
+        """
+        if self.manifest is None or file_digest is None:
+            return
+        if all(report['error'] is None and not report['failed_rows'] for report in reports):
+            self.manifest.mark_file_loaded(csv_file, file_digest)
+
+    def _parse_rows(self, reader, skip_row_errors):
+        """
+        Extracts the account fields from CSV rows, skipping rows with missing data.
+
+        Args:
+            reader (csv.DictReader): Reader positioned at the first data row.
+            skip_row_errors (bool): Report and skip rows that cannot be parsed instead of raising.
+
+        Yields:
+            tuple: (row, username, password, firstname, first_dogs_name) for each valid row.
+        """
+        for row in reader:
+            try:
+                username = row.get('username').strip()
+                password = row.get('password').strip()
+                firstname = row.get('firstname').strip()
+                first_dogs_name = row.get('first dogs name').strip()
+            except Exception as row_error:
+                if not skip_row_errors:
+                    raise
+                print(f"Error processing row {row}: {row_error}")
+                continue
+
+            # Ensure all required fields are present before saving to Redis
+            if username and password and firstname and first_dogs_name:
+                yield row, username, password, firstname, first_dogs_name
+            else:
+                print(f"Skipping row with missing data: {row}")
+
+    def _create_executor(self):
+        """
+        Creates the worker pool used for password hashing.
+
+        Returns:
+            concurrent.futures.Executor: A thread or process pool, or None when hashing serially.
+        """
+        if self.workers <= 1:
+            return None
+        if self.use_processes:
+            # Hand the parent's policy to each worker so a calibrated cost is not measured
+            # again, possibly differently, in every process
+            return ProcessPoolExecutor(
+                max_workers=self.workers, initializer=set_password_policy, initargs=(get_password_policy(),)
+            )
+        return ThreadPoolExecutor(max_workers=self.workers)
+
+    def _store_accounts(self, accounts, on_chunk_stored=None, stop_on_error=False):
+        """
+        Stores parsed rows in Redis one chunk at a time.
+
+        Args:
+            accounts (iterable): Tuples of (row, username, password, firstname, first_dogs_name).
+            on_chunk_stored (function, optional): Called with the report of each chunk whose
+                batch was committed, before the next chunk is read.
+            stop_on_error (bool, optional): Stop at the first chunk whose batch fails. Defaults to False.
+
+        Returns:
+            list: One report dictionary per chunk.
+        """
+        reports = []
+        executor = self._create_executor()
+        try:
+            for chunk_number, chunk in enumerate(chunked(accounts, self.chunk_size), start=1):
+                report = self._store_chunk(chunk_number, chunk, executor)
+                reports.append(report)
+                if self.progress_callback is not None:
+                    self.progress_callback(report)
+                if report['error'] is not None:
+                    if stop_on_error:
+                        break
+                elif on_chunk_stored is not None:
+                    on_chunk_stored(report)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            # Running app instances do not know about accounts written in bulk
+            if any(report['stored'] for report in reports):
+                publish_account_rebuild(self.redis_client)
+        return reports
+
+    def _store_chunk(self, chunk_number, chunk, executor):
+        """
+        Hashes the passwords of one chunk and writes its accounts in a single pipelined batch.
+
+        With a manifest, rows that are unchanged since the last load are dropped first, so
+        they cost neither a bcrypt hash nor a write. Rows whose password fails to hash, or
+        whose values the account layout cannot store, are reported and left out of the batch.
+        If the batch itself fails, the whole chunk is reported as failed.
+
+        Args:
+            chunk_number (int): 1-based position of the chunk in the file.
+            chunk (list): Tuples of (row, username, password, firstname, first_dogs_name).
+            executor (concurrent.futures.Executor): Pool used for hashing, or None.
+
+        Returns:
+            dict: Report with the chunk number, row count, stored count, unchanged count,
+                failed row count and the batch error message (None on success).
+        """
+        report = {
+            'chunk': chunk_number, 'rows': len(chunk), 'stored': 0,
+            'unchanged': 0, 'failed_rows': 0, 'error': None
+        }
+
+        digests = {}
+        if self.manifest is not None:
+            row_digests = [self.manifest.row_digest(*account[1:]) for account in chunk]
+            try:
+                unchanged = self.manifest.unchanged([account[1] for account in chunk], row_digests)
+            except Exception as e:
+                report['failed_rows'] = len(chunk)
+                report['error'] = str(e)
+                print(f"Chunk {chunk_number} failed: {e}")
+                return report
+
+            changed = []
+            for account, row_digest, skip in zip(chunk, row_digests, unchanged):
+                if skip:
+                    report['unchanged'] += 1
+                else:
+                    changed.append(account)
+                    digests[account[1]] = row_digest
+            chunk = changed
+
+        hashed = self.hash_passwords([account[2] for account in chunk], executor)
+
+        pipeline = batch_pipeline(self.redis_client, transaction=self.transactional)
+        stored_digests = {}
+        queued = 0
+        for (row, username, _, firstname, first_dogs_name), (hashed_password, error) in zip(chunk, hashed):
+            if error is not None:
+                print(f"Error processing row {row}: {error}")
+                report['failed_rows'] += 1
+                continue
+
+            # Queue the account details for the batch write. The compact layout rejects
+            # values it cannot store before anything is queued.
+            try:
+                self.write_account(pipeline, username, {
+                    'password': hashed_password,
+                    'first_name': firstname,
+                    'security_answer': first_dogs_name
+                })
+            except ValueError as e:
+                print(f"Error processing row {row}: {e}")
+                report['failed_rows'] += 1
+                continue
+            if username in digests:
+                stored_digests[username] = digests[username]
+            queued += 1
+
+        if self.manifest is not None:
+            self.manifest.queue_rows(pipeline, stored_digests)
+
+        try:
+            if queued:
+                pipeline.execute()
+            report['stored'] = queued
+            print(f"Chunk {chunk_number}: stored {queued} of {report['rows']} rows, "
+                  f"{report['unchanged']} unchanged.")
+        except Exception as e:
+            report['failed_rows'] += queued
+            report['error'] = str(e)
+            print(f"Chunk {chunk_number} failed: {e}")
+        return report
@@ -1,10 +1,17 @@
+import functools
+import time
 import redis
+from Utils.metrics import CLIENT_CALLS
 
 def handle_redis_errors(func):
     """
     Decorator to handle Redis connection errors and other general exceptions
     during Redis operations.
 
+    Every call is also recorded in the process metrics (see Utils.metrics): its count,
+    whether it failed, and how long it took, under the function's qualified name
+    (e.g. 'RedisClient.hget').
+
     Args:
         func (function): The function to wrap with error handling.
 
@@ -12,10 +19,17 @@ def handle_redis_errors(func):
         function: The wrapped function with error handling that catches Redis connection errors
                   and other general exceptions, providing a safe fallback.
     """
+    name = func.__qualname__
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        started_at = time.perf_counter()
+        error = True
         try:
             # Execute the wrapped function
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
+            error = False
+            return result
         except redis.ConnectionError as e:
             # Handle Redis-specific connection errors
             print(f"Redis connection error: {e}")
@@ -24,5 +38,7 @@ def handle_redis_errors(func):
             # Handle any other general exceptions
             print(f"An error occurred: {e}")
             return None
+        finally:
+            CLIENT_CALLS.observe(name, time.perf_counter() - started_at, error)
 
     return wrapper
@@ -0,0 +1,126 @@
+import hashlib
+import json
+import os
+
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+def file_fingerprint(path):
+    """
+    Computes a cheap fingerprint of a file from its size and its first and last blocks.
+
+    Reading the whole file would defeat the point of resuming a multi-gigabyte import,
+    so only the edges are hashed. Any append, truncation or rewrite of the header
+    changes the fingerprint.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest identifying the file contents.
+    """
+    size = os.path.getsize(path)
+    digest = hashlib.sha256(str(size).encode('utf-8'))
+    with open(path, mode='rb') as file:
+        digest.update(file.read(FINGERPRINT_BLOCK_SIZE))
+        if size > FINGERPRINT_BLOCK_SIZE:
+            file.seek(max(FINGERPRINT_BLOCK_SIZE, size - FINGERPRINT_BLOCK_SIZE))
+            digest.update(file.read(FINGERPRINT_BLOCK_SIZE))
+    return digest.hexdigest()
+
+class FileCheckpointStore:
+    """
+    Keeps the import checkpoint in a JSON sidecar file next to the CSV file.
+    """
+
+    def __init__(self, path):
+        """
+        Initializes the store.
+
+        Args:
+            path (str): Path of the sidecar file.
+        """
+        self.path = path
+
+    def load(self):
+        """
+        Reads the saved checkpoint.
+
+        Returns:
+            dict: The checkpoint, or None if there is none or it cannot be read.
+        """
+        try:
+            with open(self.path, mode='r') as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+
+    def save(self, checkpoint):
+        """
+        Writes the checkpoint atomically so a crash never leaves a half-written file.
+
+        Args:
+            checkpoint (dict): The checkpoint to save.
+        """
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, mode='w') as file:
+            json.dump(checkpoint, file)
+        os.replace(temporary_path, self.path)
+
+    def clear(self):
+        """
+        Removes the saved checkpoint.
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+class RedisCheckpointStore:
+    """
+    Keeps the import checkpoint in a Redis hash, so any machine can resume the import.
+    """
+
+    def __init__(self, redis_client, key="loader:checkpoint"):
+        """
+        Initializes the store.
+
+        Args:
+            redis_client (redis.Redis): Redis client for database operations.
+            key (str, optional): Key of the checkpoint hash. Defaults to 'loader:checkpoint'.
+        """
+        self.redis_client = redis_client
+        self.key = key
+
+    def load(self):
+        """
+        Reads the saved checkpoint.
+
+        Returns:
+            dict: The checkpoint, or None if there is none.
+        """
+        stored = self.redis_client.hgetall(self.key)
+        if not stored:
+            return None
+        return {
+            'fingerprint': stored.get('fingerprint'),
+            'offset': int(stored.get('offset', 0)),
+            'rows': int(stored.get('rows', 0))
+        }
+
+    def save(self, checkpoint):
+        """
+        Writes the checkpoint.
+
+        Args:
+            checkpoint (dict): The checkpoint to save.
+        """
+        self.redis_client.hset(self.key, mapping=checkpoint)
+
+    def clear(self):
+        """
+        Removes the saved checkpoint.
+        """
+        self.redis_client.delete(self.key)
@@ -0,0 +1,150 @@
+import hashlib
+import os
+from Models.account_keys import account_key
+from Models.cluster_pipeline import batch_pipeline
+from Models.compact_accounts import bucket_key
+from Utils.config import ACCOUNT_LAYOUT_SETTINGS
+
+class LoadManifest:
+    """
+    Records what the DataLoader has already imported, so repeated imports only apply changes.
+
+    Two hashes are kept in Redis:
+        - `<key>`: the digest of every fully loaded file, plus a random salt.
+        - `<key>:rows`: a salted digest of the last loaded contents of each row, keyed by login name.
+
+    Row digests are salted so the manifest cannot be used to look up CSV passwords.
+    """
+
+    def __init__(self, redis_client, key="loader:manifest"):
+        """
+        Initializes the manifest.
+
+        Args:
+            redis_client (redis.Redis): Redis client for database operations.
+            key (str, optional): Key prefix of the manifest hashes. Defaults to 'loader:manifest'.
+        """
+        self.redis_client = redis_client
+        self.key = key
+        self.rows_key = f"{key}:rows"
+        self._salt = None
+
+    @staticmethod
+    def file_digest(path):
+        """
+        Computes the SHA-256 digest of a whole file.
+
+        Args:
+            path (str): Path to the file.
+
+        Returns:
+            str: Hex digest of the file contents.
+        """
+        digest = hashlib.sha256()
+        with open(path, mode='rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def is_file_loaded(self, path, digest):
+        """
+        Checks whether a file with these exact contents has already been loaded completely.
+
+        Args:
+            path (str): Path to the file.
+            digest (str): Digest of the file contents.
+
+        Returns:
+            bool: True if the file is unchanged since its last complete load.
+        """
+        return self.redis_client.hget(self.key, self._file_field(path)) == digest
+
+    def mark_file_loaded(self, path, digest):
+        """
+        Records that a file has been loaded completely.
+
+        Args:
+            path (str): Path to the file.
+            digest (str): Digest of the file contents.
+        """
+        self.redis_client.hset(self.key, mapping={self._file_field(path): digest})
+
+    def row_digest(self, *fields):
+        """
+        Computes the salted digest of a row's contents.
+
+        Args:
+            *fields (str): The row's values.
+
+        Returns:
+            str: Hex digest of the row.
+        """
+        digest = hashlib.blake2b(key=self._get_salt(), digest_size=16)
+        for field in fields:
+            digest.update(field.encode('utf-8'))
+            digest.update(b'\x1f')
+        return digest.hexdigest()
+
+    def unchanged(self, keys, digests):
+        """
+        Finds the rows whose contents match the manifest and whose account still exists.
+
+        The manifest lookups and existence checks are sent in one pipelined round trip.
+
+        Args:
+            keys (list): Login names of the rows.
+            digests (list): Row digests, in the same order as `keys`.
+
+        Returns:
+            list: One bool per row, True if the row can be skipped.
+        """
+        if not keys:
+            return []
+
+        pipeline = batch_pipeline(self.redis_client, transaction=False)
+        pipeline.hmget(self.rows_key, keys)
+        for key in keys:
+            if ACCOUNT_LAYOUT_SETTINGS['layout'] == 'compact':
+                pipeline.hexists(bucket_key(key), key)
+            else:
+                pipeline.exists(account_key(key))
+        results = pipeline.execute()
+
+        stored_digests, exists = results[0], results[1:]
+        return [
+            stored == digest and bool(found)
+            for stored, digest, found in zip(stored_digests, digests, exists)
+        ]
+
+    def queue_rows(self, pipeline, digests_by_key):
+        """
+        Queues manifest updates for stored rows on the pipeline that writes them.
+
+        Args:
+            pipeline (redis.client.Pipeline): The pipeline writing the rows.
+            digests_by_key (dict): Row digests keyed by login name.
+        """
+        if digests_by_key:
+            pipeline.hset(self.rows_key, mapping=digests_by_key)
+
+    def clear(self):
+        """
+        Forgets everything that has been loaded, so the next import applies every row.
+        """
+        self.redis_client.delete(self.key)
+        self.redis_client.delete(self.rows_key)
+        self._salt = None
+
+    def _file_field(self, path):
+        return f"file:{os.path.abspath(path)}"
+
+    def _get_salt(self):
+        """
+        Returns the manifest salt, creating it on first use.
+
+        HSETNX makes concurrent loaders agree on a single salt.
+        """
+        if self._salt is None:
+            self.redis_client.hsetnx(self.key, 'salt', os.urandom(16).hex())
+            self._salt = bytes.fromhex(self.redis_client.hget(self.key, 'salt'))
+        return self._salt
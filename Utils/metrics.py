@@ -0,0 +1,354 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds of the latency buckets in seconds, from half a millisecond to ten seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """
+    Counts calls, errors and latencies of one kind of operation, split by a label such as
+    the command name.
+
+    Latencies are kept in fixed buckets, so recording costs the same however long the app
+    runs, and the data maps directly onto a Prometheus histogram.
+    """
+
+    def __init__(self, name, label, description, buckets=DEFAULT_BUCKETS):
+        """
+        Initializes an empty histogram.
+
+        Args:
+            name (str): Metric name, e.g. 'campsite_redis_command_seconds'.
+            label (str): Name of the label the series are split by, e.g. 'command'.
+            description (str): Help text for the exported metric.
+            buckets (tuple, optional): Bucket upper bounds in seconds. Defaults to DEFAULT_BUCKETS.
+        """
+        self.name = name
+        self.label = label
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, seconds, error=False):
+        """
+        Records one call.
+
+        Args:
+            value (str): The label value, e.g. 'HGET'.
+            seconds (float): How long the call took.
+            error (bool, optional): Whether the call failed. Defaults to False.
+        """
+        with self._lock:
+            series = self._series.get(value)
+            if series is None:
+                series = self._series[value] = {
+                    'count': 0, 'errors': 0, 'sum': 0.0, 'buckets': [0] * (len(self.buckets) + 1)
+                }
+            series['count'] += 1
+            series['sum'] += seconds
+            if error:
+                series['errors'] += 1
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series['buckets'][index] += 1
+                    break
+            else:
+                series['buckets'][-1] += 1
+
+    @contextmanager
+    def time(self, value):
+        """
+        Times the block and records it, marking it as an error if it raises.
+
+        Args:
+            value (str): The label value.
+        """
+        started_at = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(value, time.perf_counter() - started_at, error)
+
+    def snapshot(self):
+        """
+        Returns a copy of the recorded data.
+
+        Returns:
+            dict: Per label value: count, errors, sum and mean in seconds, and a 'buckets'
+                mapping of each upper bound ('+Inf' last) to the number of calls in it.
+        """
+        with self._lock:
+            series = {value: dict(data, buckets=list(data['buckets'])) for value, data in self._series.items()}
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {
+            value: {
+                'count': data['count'],
+                'errors': data['errors'],
+                'sum': round(data['sum'], 6),
+                'mean': round(data['sum'] / data['count'], 6) if data['count'] else 0.0,
+                'buckets': dict(zip(bounds, data['buckets']))
+            }
+            for value, data in sorted(series.items())
+        }
+
+    def reset(self):
+        """
+        Forgets everything recorded so far.
+        """
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self):
+        """
+        Formats the histogram in the Prometheus text exposition format.
+
+        Returns:
+            str: The latency histogram and the matching error counter.
+        """
+        base = self.name[:-len('_seconds')] if self.name.endswith('_seconds') else self.name
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        errors = [
+            f"# HELP {base}_errors_total Failed calls counted in {self.name}.",
+            f"# TYPE {base}_errors_total counter"
+        ]
+        for value, data in self.snapshot().items():
+            label = f'{self.label}="{_escape(value)}"'
+            cumulative = 0
+            for bound, count in data['buckets'].items():
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{label}}} {data['sum']}")
+            lines.append(f"{self.name}_count{{{label}}} {data['count']}")
+            errors.append(f"{base}_errors_total{{{label}}} {data['errors']}")
+        return "\n".join(lines + errors) + "\n"
+
+class CounterMetric:
+    """
+    Counts events, split by a label, e.g. rejected attempts per rate-limit scope.
+    """
+
+    def __init__(self, name, label, description):
+        """
+        Initializes an empty counter.
+
+        Args:
+            name (str): Metric name, ending in '_total' by Prometheus convention.
+            label (str): Name of the label the series are split by.
+            description (str): Help text for the exported metric.
+        """
+        self.name = name
+        self.label = label
+        self.description = description
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value, amount=1):
+        """
+        Adds to the count of a label value.
+
+        Args:
+            value (str): The label value.
+            amount (int, optional): How much to add. Defaults to 1.
+        """
+        with self._lock:
+            self._counts[value] = self._counts.get(value, 0) + amount
+
+    def snapshot(self):
+        """
+        Returns a copy of the counts, keyed by label value.
+        """
+        with self._lock:
+            return dict(sorted(self._counts.items()))
+
+    def reset(self):
+        """
+        Forgets everything counted so far.
+        """
+        with self._lock:
+            self._counts.clear()
+
+    def to_prometheus(self):
+        """
+        Formats the counter in the Prometheus text exposition format.
+        """
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for value, count in self.snapshot().items():
+            lines.append(f'{self.name}{{{self.label}="{_escape(value)}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+class MetricsRegistry:
+    """
+    Holds every metric of the process so they can be read or exported together.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty registry.
+        """
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name, label, description, buckets=DEFAULT_BUCKETS):
+        """
+        Returns the histogram with the given name, creating it on first use.
+
+        Args:
+            name (str): Metric name.
+            label (str): Name of the label the series are split by.
+            description (str): Help text.
+            buckets (tuple, optional): Bucket upper bounds in seconds.
+
+        Returns:
+            Histogram: The shared histogram.
+        """
+        return self._get_or_create(name, lambda: Histogram(name, label, description, buckets))
+
+    def counter(self, name, label, description):
+        """
+        Returns the counter with the given name, creating it on first use.
+
+        Args:
+            name (str): Metric name.
+            label (str): Name of the label the series are split by.
+            description (str): Help text.
+
+        Returns:
+            CounterMetric: The shared counter.
+        """
+        return self._get_or_create(name, lambda: CounterMetric(name, label, description))
+
+    def snapshot(self):
+        """
+        Returns the data of every metric, keyed by metric name (see Histogram.snapshot and
+        CounterMetric.snapshot).
+        """
+        return {metric.name: metric.snapshot() for metric in self._all()}
+
+    def reset(self):
+        """
+        Clears every metric.
+        """
+        for metric in self._all():
+            metric.reset()
+
+    def to_prometheus(self):
+        """
+        Formats every metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        return "".join(metric.to_prometheus() for metric in self._all())
+
+    def _get_or_create(self, name, create):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = create()
+            return metric
+
+    def _all(self):
+        with self._lock:
+            return list(self._metrics.values())
+
+class MetricsDumper:
+    """
+    Writes the registry to a file at a fixed interval from a background thread.
+
+    Each dump replaces the file atomically, so readers such as a node exporter's textfile
+    collector never see a half-written file.
+    """
+
+    def __init__(self, path, interval=60, format='json', registry=None):
+        """
+        Initializes the dumper. Call start() to begin writing.
+
+        Args:
+            path (str): File to write.
+            interval (float, optional): Seconds between dumps. Defaults to 60.
+            format (str, optional): 'json' or 'prometheus'. Defaults to 'json'.
+            registry (MetricsRegistry, optional): Registry to dump. Defaults to METRICS.
+        """
+        if format not in ('json', 'prometheus'):
+            raise ValueError(f"Unknown metrics format '{format}', expected 'json' or 'prometheus'.")
+        self.path = path
+        self.interval = interval
+        self.format = format
+        self.registry = registry or METRICS
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the background thread.
+        """
+        self._thread = threading.Thread(target=self._run, name="metrics-dumper", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the thread and writes one last dump.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.dump()
+
+    def dump(self):
+        """
+        Writes the current metrics to the file.
+        """
+        if self.format == 'json':
+            content = json.dumps({'written_at': time.time(), 'metrics': self.registry.snapshot()}, indent=2)
+        else:
+            content = self.registry.to_prometheus()
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as file:
+            file.write(content)
+        os.replace(temporary_path, self.path)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.dump()
+            except Exception as e:
+                print(f"Failed to write metrics to {self.path}: {e}")
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# The registry shared by the whole process
+METRICS = MetricsRegistry()
+
+REDIS_COMMANDS = METRICS.histogram(
+    'campsite_redis_command_seconds', 'command',
+    "Latency of each Redis command or pipeline sent by the app."
+)
+CLIENT_CALLS = METRICS.histogram(
+    'campsite_client_call_seconds', 'call',
+    "Latency of RedisClient calls, including their error handling."
+)
+PASSWORD_HASHING = METRICS.histogram(
+    'campsite_password_hash_seconds', 'operation',
+    "Time spent hashing and verifying passwords."
+)
+RATE_LIMITED = METRICS.counter(
+    'campsite_rate_limited_total', 'scope',
+    "Attempts rejected by the rate limiter, by the bucket that ran out."
+)
+ACCOUNT_FILTER = METRICS.counter(
+    'campsite_account_filter_total', 'result',
+    "Account lookups checked against the in-process account filter, by result."
+)
+FIELD_CACHE = METRICS.counter(
+    'campsite_field_cache_total', 'result',
+    "Hash reads checked against the in-process field cache, and its evictions, by result."
+)
@@ -0,0 +1,134 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+class StartupProfiler:
+    """
+    Records a timeline of module imports and startup steps, to see what the app spends its
+    startup time on.
+
+    While enabled, every import of a module that is not loaded yet is timed, including the
+    modules it imports in turn, and startup code adds its own steps with mark() and phase().
+    Nothing is recorded while it is disabled, so the calls can stay in the startup code.
+    """
+
+    def __init__(self, threshold_ms=2.0):
+        """
+        Initializes a disabled profiler.
+
+        Args:
+            threshold_ms (float, optional): Imports faster than this, including their own
+                imports, are left out of the report. Defaults to 2.
+        """
+        self.threshold_ms = threshold_ms
+        self.enabled = False
+        self.started_at = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._original_import = None
+
+    def enable(self, started_at=None, threshold_ms=None):
+        """
+        Starts recording imports and steps.
+
+        Args:
+            started_at (float, optional): time.perf_counter() value the timeline starts from.
+                Defaults to now.
+            threshold_ms (float, optional): Replaces the report threshold given at creation.
+        """
+        if threshold_ms is not None:
+            self.threshold_ms = threshold_ms
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def disable(self):
+        """
+        Stops recording imports, keeping what was recorded so far.
+        """
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+        self.enabled = False
+
+    def mark(self, label):
+        """
+        Records that a startup step has been reached.
+
+        Args:
+            label (str): What happened, e.g. 'first frame'.
+        """
+        if self.enabled:
+            self._record('step', label, time.perf_counter(), 0.0)
+
+    @contextmanager
+    def phase(self, label):
+        """
+        Times a block of startup code.
+
+        Args:
+            label (str): What the block does, e.g. 'build main menu'.
+        """
+        if not self.enabled:
+            yield
+            return
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record('phase', label, started_at, time.perf_counter() - started_at)
+
+    def timeline(self):
+        """
+        Returns the recorded events in the order they started, leaving out fast imports.
+
+        Returns:
+            list: (offset in seconds, duration in seconds, kind, label, depth, thread name)
+                tuples, where kind is 'import', 'phase' or 'step', and depth is how deeply
+                nested an import was.
+        """
+        with self._lock:
+            events = list(self.events)
+        return sorted(
+            (event for event in events if event[2] != 'import' or event[1] * 1000 >= self.threshold_ms),
+            key=lambda event: event[0]
+        )
+
+    def report(self):
+        """
+        Prints the timeline.
+        """
+        print("Startup timeline (offset, duration, thread):")
+        for offset, duration, kind, label, depth, thread in self.timeline():
+            duration_text = f"{duration * 1000:8.1f} ms" if kind != 'step' else " " * 11
+            name = f"import {label}" if kind == 'import' else label
+            print(f"  {offset * 1000:8.1f} ms {duration_text}  {'  ' * depth}{name}  [{thread}]")
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Modules already loaded and relative imports (timed within their package) pass straight through
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+
+        depth = getattr(self._local, 'depth', 0)
+        self._local.depth = depth + 1
+        started_at = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            self._local.depth = depth
+            self._record('import', name, started_at, time.perf_counter() - started_at, depth)
+
+    def _record(self, kind, label, started_at, duration, depth=0):
+        with self._lock:
+            self.events.append((
+                started_at - self.started_at, duration, kind, label, depth, threading.current_thread().name
+            ))
+
+# The application's profiler, enabled by gui_main.py when CAMPSITE_PROFILE_STARTUP=1
+STARTUP_PROFILE = StartupProfiler()
@@ -0,0 +1,100 @@
+import argparse
+import asyncio
+from Logic.account_http import AccountHTTPServer
+from Logic.account_service import AccountService
+from Models.async_storage import close_async_storage, open_async_storage
+from Models.rate_limiter import AsyncRateLimiter
+from Utils.config import RATE_LIMIT_SETTINGS, SERVICE_SETTINGS
+
+async def serve(host, port, backend=None, max_connections=1000, max_in_flight=64, max_queue=256, hash_workers=None,
+                use_processes=False, redis_connections=50, rate_limit=True, ready=None):
+    """
+    Runs the asyncio account service over HTTP until cancelled.
+
+    Args:
+        host (str): Address to listen on.
+        port (int): Port to listen on; 0 picks a free one.
+        backend (str, optional): Storage backend. Defaults to STORAGE_SETTINGS['backend'].
+        max_connections (int, optional): Client connections open at once. Defaults to 1000.
+        max_in_flight (int, optional): Requests handled at once. Defaults to 64.
+        max_queue (int, optional): Requests allowed to wait for a slot. Defaults to 256.
+        hash_workers (int, optional): Passwords hashed at once. Defaults to the number of CPUs.
+        use_processes (bool, optional): Hash in worker processes instead of threads. Defaults to False.
+        redis_connections (int, optional): Most Redis connections open at once. Defaults to 50.
+        rate_limit (bool, optional): Throttle login and reset attempts per login name and
+            client address. Defaults to True.
+        ready (asyncio.Future, optional): Set to the port listened on once serving.
+
+    Returns:
+        bool: False if the database is unreachable.
+    """
+    storage = await open_async_storage(backend, max_connections=redis_connections)
+    if storage is None:
+        return False
+
+    service = AccountService(
+        storage,
+        rate_limiter=AsyncRateLimiter(storage) if rate_limit else None,
+        max_in_flight=max_in_flight,
+        max_queue=max_queue,
+        hash_workers=hash_workers,
+        use_processes=use_processes
+    )
+    server = AccountHTTPServer(service, host, port, max_connections=max_connections)
+    try:
+        port = await server.start()
+        print(f"Serving account requests on http://{host}:{port}")
+        if ready is not None:
+            ready.set_result(port)
+        await server.serve_forever()
+    finally:
+        await server.close()
+        service.close()
+        await close_async_storage(storage)
+    return True
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the account service.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Serve login, create-account and password-reset requests over HTTP.")
+    parser.add_argument('--host', default=SERVICE_SETTINGS['host'], help="Address to listen on.")
+    parser.add_argument('--port', type=int, default=SERVICE_SETTINGS['port'], help="Port to listen on.")
+    parser.add_argument('--backend', default=None, help="Storage backend: redis, sqlite or memory.")
+    parser.add_argument('--max-connections', type=int, default=SERVICE_SETTINGS['max_connections'],
+                        help="Client connections open at once.")
+    parser.add_argument('--max-in-flight', type=int, default=SERVICE_SETTINGS['max_in_flight'],
+                        help="Requests handled at once.")
+    parser.add_argument('--max-queue', type=int, default=SERVICE_SETTINGS['max_queue'],
+                        help="Requests that may wait for a slot before new ones are rejected.")
+    parser.add_argument('--hash-workers', type=int, default=SERVICE_SETTINGS['hash_workers'],
+                        help="Passwords hashed at once (0 = one per CPU).")
+    parser.add_argument('--processes', action='store_true', help="Hash passwords in worker processes.")
+    parser.add_argument('--redis-connections', type=int, default=SERVICE_SETTINGS['redis_connections'],
+                        help="Most Redis connections open at once.")
+    parser.add_argument('--no-rate-limit', action='store_true', help="Do not throttle login and reset attempts.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        asyncio.run(serve(
+            args.host,
+            args.port,
+            backend=args.backend,
+            max_connections=args.max_connections,
+            max_in_flight=args.max_in_flight,
+            max_queue=args.max_queue,
+            hash_workers=args.hash_workers or None,
+            use_processes=args.processes,
+            redis_connections=args.redis_connections,
+            rate_limit=RATE_LIMIT_SETTINGS['enabled'] and not args.no_rate_limit
+        ))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,98 @@
+import argparse
+import os
+import shutil
+import tempfile
+from GUI.assets import ASSETS_DIR, BACKGROUND, ICON_ATLAS, ICONS, scaled_background_path
+
+def build_assets(icon_size=256, atlas_size=512, window_size=None):
+    """
+    Packs the icons into one atlas texture and, optionally, scales the background to the
+    window size, so the app decodes and uploads less at startup.
+
+    Icons larger than icon_size are shrunk first; the help icon, for example, is stored at
+    1024x1024 but drawn at under 100 pixels, and the others at about 200. The app uses the
+    atlas and the scaled background whenever they exist (see GUI.assets), so delete them to
+    go back to the original files. Requires Pillow.
+
+    Args:
+        icon_size (int, optional): Largest width or height of a packed icon. Defaults to 256.
+        atlas_size (int, optional): Width and height of the atlas texture. Defaults to 512.
+        window_size (tuple, optional): (width, height) to pre-scale the background to.
+            Defaults to leaving the background as it is.
+
+    Returns:
+        bool: True if the assets were built.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        print("Building the assets requires Pillow (pip install pillow).")
+        return False
+    from kivy.atlas import Atlas
+
+    workdir = tempfile.mkdtemp()
+    try:
+        # Shrink the icons that are far larger than they are drawn, keeping their proportions
+        filenames = []
+        for icon in ICONS:
+            with Image.open(os.path.join(ASSETS_DIR, icon)) as image:
+                image = image.convert('RGBA')
+                if max(image.size) > icon_size:
+                    image.thumbnail((icon_size, icon_size), Image.LANCZOS)
+                filename = os.path.join(workdir, os.path.splitext(icon)[0] + ".png")
+                image.save(filename)
+                filenames.append(filename)
+
+        # Icons that do not fit in one texture spill into further pages
+        created = Atlas.create(os.path.splitext(ICON_ATLAS)[0], filenames, atlas_size)
+        if created is None:
+            print(f"An icon is larger than the {atlas_size}x{atlas_size} atlas; use a smaller --icon-size.")
+            return False
+        _, pages = created
+        print(f"Packed {len(filenames)} icons into {ICON_ATLAS} ({len(pages)} {atlas_size}x{atlas_size} textures).")
+    finally:
+        shutil.rmtree(workdir)
+
+    if window_size is not None:
+        path = scaled_background_path(*window_size)
+        with Image.open(BACKGROUND) as image:
+            image.convert('RGB').resize(window_size, Image.LANCZOS).save(path, quality=90)
+        print(f"Scaled the background to {window_size[0]}x{window_size[1]} in {path}.")
+    return True
+
+def parse_window_size(value):
+    """
+    Parses a window size such as '1280x720'.
+
+    Args:
+        value (str): The size.
+
+    Returns:
+        tuple: (width, height).
+    """
+    try:
+        width, height = (int(part) for part in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got '{value}'")
+    return width, height
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the asset build tool.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Pack the GUI icons into an atlas and pre-scale the background.")
+    parser.add_argument('--icon-size', type=int, default=256, help="Largest width or height of a packed icon.")
+    parser.add_argument('--atlas-size', type=int, default=512, help="Width and height of the atlas texture.")
+    parser.add_argument('--window-size', type=parse_window_size, default=None,
+                        help="Also scale the background to this window size, e.g. 1280x720.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    build_assets(args.icon_size, args.atlas_size, args.window_size)
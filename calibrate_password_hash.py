@@ -0,0 +1,61 @@
+import argparse
+import time
+from Models.password_policy import PasswordPolicy
+from Utils.config import PASSWORD_SETTINGS
+
+def calibrate_password_hash(scheme='bcrypt', target_ms=250):
+    """
+    Measures the password-hash work factor that takes about target_ms on this machine and
+    prints the settings to pin it.
+
+    Pinning the result is better than calibrating at every startup when several machines
+    share a database, as each would otherwise pick its own cost and keep rehashing the
+    others' hashes on login.
+
+    Args:
+        scheme (str, optional): 'bcrypt' or 'argon2id'. Defaults to 'bcrypt'.
+        target_ms (float, optional): Wanted time per hash in milliseconds. Defaults to 250.
+
+    Returns:
+        PasswordPolicy: The calibrated policy.
+    """
+    policy = PasswordPolicy.calibrated(
+        scheme, target_ms,
+        argon2_memory_cost=PASSWORD_SETTINGS['argon2_memory_cost'],
+        argon2_parallelism=PASSWORD_SETTINGS['argon2_parallelism']
+    )
+    started_at = time.perf_counter()
+    policy.hash("calibration")
+    elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+    print(f"{policy.describe()}: one hash takes {elapsed_ms:.0f} ms (target {target_ms:.0f} ms).")
+    print(f"CAMPSITE_PASSWORD_SCHEME={scheme}")
+    if scheme == 'bcrypt':
+        print(f"CAMPSITE_BCRYPT_ROUNDS={policy.bcrypt_rounds}")
+    else:
+        print(f"CAMPSITE_ARGON2_TIME_COST={policy.argon2_time_cost}")
+    return policy
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the calibration tool.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Find the password-hash cost that fits a target latency.")
+    parser.add_argument('--scheme', choices=['bcrypt', 'argon2id'], default=PASSWORD_SETTINGS['scheme'],
+                        help="Hashing scheme to calibrate.")
+    parser.add_argument('--target-ms', type=float, default=PASSWORD_SETTINGS['target_ms'],
+                        help="Wanted time per hash in milliseconds.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        calibrate_password_hash(args.scheme, args.target_ms)
+    except ValueError as e:
+        print(e)
@@ -1,31 +1,119 @@
-from Models.redis_client import RedisClient
+import argparse
+import time
+from Models.account_filter import publish_account_rebuild
+from Models.account_keys import ACCOUNT_KEY_PREFIX, is_legacy_account_key
+from Models.cluster_pipeline import batch_pipeline
+from Models.compact_accounts import COMPACT_KEY_PREFIX
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+from Utils.load_manifest import LoadManifest
 
-def clean_redis_database():
+def holds_accounts(key, manifest):
     """
-    Cleans the Redis database by deleting all keys.
+    Tells whether deleting a key removes accounts or the loader's record of them.
+
+    Args:
+        key (str): A Redis key.
+        manifest (LoadManifest): The data loader's manifest.
+
+    Returns:
+        bool: True for account keys, compact buckets, legacy account keys and the manifest itself.
+    """
+    return (key.startswith((ACCOUNT_KEY_PREFIX, COMPACT_KEY_PREFIX)) or is_legacy_account_key(key)
+            or key in (manifest.key, manifest.rows_key))
+
+def clean_redis_database(match='*', batch_size=500, dry_run=False, max_keys_per_second=None, redis_client=None):
+    """
+    Cleans the Redis database by deleting all keys matching a pattern.
+
+    Keys are found with incremental SCAN instead of KEYS, so the server is never blocked
+    for long, and each batch is removed with pipelined UNLINK commands in one round trip.
+    UNLINK frees the memory in the background on the server. When the deleted keys include
+    accounts or the manifest, the data loader's manifest is cleared too, so the next import
+    stores every row again, and running app instances are asked to rebuild their account
+    filters. Other cleans, such as 'ratelimit:*', leave both alone.
+
+    Args:
+        match (str, optional): Glob-style pattern of the keys to delete, e.g. 'account:*'. Defaults to '*'.
+        batch_size (int, optional): SCAN count hint and number of keys deleted per round trip. Defaults to 500.
+        dry_run (bool, optional): Only count the matching keys without deleting them. SCAN may
+            return a key more than once, so the count can be slightly high. Defaults to False.
+        max_keys_per_second (float, optional): Pause between batches to stay under this rate,
+            so the tool can run against a live instance. Defaults to no limit.
+        redis_client (redis.Redis, optional): Client to use. Defaults to the configured storage.
+
+    Returns:
+        int: The number of keys deleted, or that would be deleted in a dry run.
     """
     try:
-        # Initialize the Redis client with connection parameters
-        redis_client = RedisClient(
-            host='mycampsiteredis.redis.cache.windows.net',
-            port=6380,
-            password='F21P4lrm3B63A5nNWUldt528Usqtped65AzCaNnjtg8=',
-            ssl=True
-        ).client
-        
-        # Retrieve all keys in the Redis database
-        keys = redis_client.keys('*')
-        if not keys:
-            print("The Redis database is already clean.")
-            return
-
-        # Delete all keys from the database
-        for key in keys:
-            redis_client.delete(key)
-
-        print("All data has been successfully cleared from the Redis database.")
+        if redis_client is None:
+            # Open the configured storage (Redis unless CAMPSITE_STORAGE says otherwise)
+            redis_client = open_storage()
+
+        started_at = time.monotonic()
+        processed = 0
+        manifest = LoadManifest(redis_client)
+        accounts_deleted = match == '*'
+        # Retrieve the matching keys one batch at a time
+        for keys in scan_batches(redis_client, match=match, count=batch_size):
+            if keys:
+                if dry_run:
+                    processed += len(keys)
+                else:
+                    # Delete the whole batch in one round trip
+                    pipeline = batch_pipeline(redis_client, transaction=False)
+                    for key in keys:
+                        pipeline.unlink(key)
+                    processed += sum(pipeline.execute())
+                    accounts_deleted = accounts_deleted or any(holds_accounts(key, manifest) for key in keys)
+
+                action = "Found" if dry_run else "Deleted"
+                print(f"{action} {processed} keys so far...")
+
+                # Sleep long enough to keep the average rate under the limit
+                if max_keys_per_second:
+                    ahead = processed / max_keys_per_second - (time.monotonic() - started_at)
+                    if ahead > 0:
+                        time.sleep(ahead)
+
+        if processed == 0:
+            print("The Redis database is already clean." if match == '*' else f"No keys match '{match}'.")
+        elif dry_run:
+            print(f"Dry run: {processed} keys match '{match}' and would be deleted.")
+        else:
+            print(f"{processed} keys matching '{match}' have been successfully cleared from the Redis database.")
+            if accounts_deleted:
+                # The load manifest would otherwise let the loader skip files whose accounts were deleted
+                manifest.clear()
+                # Running app instances still have the deleted accounts in their filters
+                publish_account_rebuild(redis_client)
+        return processed
     except Exception as e:
         print(f"Failed to clean the Redis database: {e}")
+        return 0
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the cleaning tool.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Delete keys from the Redis database without blocking it.")
+    parser.add_argument('--match', default='*', help="Only delete keys matching this pattern, e.g. 'account:*'.")
+    parser.add_argument('--batch-size', type=int, default=500, help="Keys scanned and deleted per round trip.")
+    parser.add_argument('--dry-run', action='store_true', help="Count the matching keys without deleting them.")
+    parser.add_argument('--rate', type=float, default=None, help="Maximum keys deleted per second.")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    clean_redis_database()
+    args = parse_args()
+    clean_redis_database(
+        match=args.match,
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        max_keys_per_second=args.rate
+    )
@@ -0,0 +1,196 @@
+import argparse
+import time
+from Models.account_keys import login_name_from_key
+from Models.cluster_pipeline import batch_pipeline
+from Models.compact_accounts import ACCOUNT_SCAN_PATTERN, COMPACT_KEY_PREFIX, decode_record
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pyarrow is optional and only needed to export accounts
+    pyarrow = None
+
+FORMATS = ('parquet', 'arrow')
+PASSWORD_MODES = ('exclude', 'redact', 'include')
+
+# Columns of the export, in order. Every account field is a string; fields an account
+# lacks are null. The password and security answer columns are only written on request.
+ACCOUNT_COLUMNS = ('login_name', 'first_name', 'security_question', 'password', 'security_answer')
+
+def redact_password_hash(stored_hash):
+    """
+    Keeps the scheme and cost of a password hash and drops its salt and digest, so the
+    export still shows which hashes are due for an upgrade without exposing any of them.
+
+    Args:
+        stored_hash (str): A bcrypt or Argon2 hash.
+
+    Returns:
+        str: e.g. '$2b$12$' or '$argon2id$v=19$m=65536,t=3,p=4$', or '' for anything else.
+    """
+    parts = stored_hash.split('$')
+    if stored_hash.startswith('$2') and len(parts) == 4:
+        return '$'.join(parts[:3]) + '$'
+    if stored_hash.startswith('$argon2') and len(parts) >= 5:
+        return '$'.join(parts[:-2]) + '$'
+    return ''
+
+def export_columns(passwords='exclude', security_answers=False):
+    """
+    Returns the columns an export writes.
+
+    Args:
+        passwords (str, optional): 'exclude', 'redact' or 'include'. Defaults to 'exclude'.
+        security_answers (bool, optional): Whether to write the security answers. Defaults to False.
+
+    Returns:
+        list: The column names.
+    """
+    return [
+        column for column in ACCOUNT_COLUMNS
+        if (column != 'password' or passwords != 'exclude') and (column != 'security_answer' or security_answers)
+    ]
+
+def export_accounts(path, format='parquet', batch_size=10000, passwords='exclude', security_answers=False,
+                    compression='zstd', scan_count=1000, redis_client=None):
+    """
+    Streams every account into a compressed Parquet or Arrow IPC file for offline analysis.
+
+    Account keys are found with incremental SCAN and each batch is read with one pipelined
+    round trip of HGETALL commands, so the export never blocks Redis and holds at most one
+    record batch in memory, however many accounts there are. Accounts in either layout are
+    exported; a compact bucket yields every account it holds. Rows are written in record
+    batches of exactly batch_size rows (the last one may be shorter), one Parquet row group
+    each. Accounts deleted during the export are left out, and SCAN can return a key
+    twice while Redis resizes its table, so deduplicate on login_name when that matters.
+    Accounts still under legacy bare keys are not exported; run migrate_account_keys.py first.
+
+    Password hashes and security answers are credentials, so they are left out unless
+    asked for; with passwords='redact' only each hash's scheme and cost are kept.
+
+    Args:
+        path (str): The file to write.
+        format (str, optional): 'parquet' or 'arrow' (the Arrow IPC file format). Defaults to 'parquet'.
+        batch_size (int, optional): Rows per record batch. Defaults to 10000.
+        passwords (str, optional): 'exclude', 'redact' or 'include'. Defaults to 'exclude'.
+        security_answers (bool, optional): Also export the security answers. Defaults to False.
+        compression (str, optional): Codec, e.g. 'zstd', 'lz4' or 'none'. Parquet also offers
+            'snappy' and 'gzip'. Defaults to 'zstd'.
+        scan_count (int, optional): SCAN count hint and accounts read per round trip. Defaults to 1000.
+        redis_client (redis.Redis, optional): Client to use. Defaults to the configured storage.
+
+    Returns:
+        int: The number of accounts exported, or None on failure.
+    """
+    if pyarrow is None:
+        print("Exporting accounts requires pyarrow (pip install pyarrow).")
+        return None
+    if format not in FORMATS:
+        print(f"Unknown export format '{format}', expected one of: {', '.join(FORMATS)}")
+        return None
+    if passwords not in PASSWORD_MODES:
+        print(f"Unknown password mode '{passwords}', expected one of: {', '.join(PASSWORD_MODES)}")
+        return None
+
+    columns = export_columns(passwords, security_answers)
+    schema = pyarrow.schema([(column, pyarrow.string()) for column in columns])
+    codec = None if compression == 'none' else compression
+    writer = None
+    try:
+        if redis_client is None:
+            redis_client = open_storage()
+
+        if format == 'parquet':
+            writer = pyarrow.parquet.ParquetWriter(path, schema, compression=codec or 'none')
+        else:
+            writer = pyarrow.ipc.new_file(path, schema, options=pyarrow.ipc.IpcWriteOptions(compression=codec))
+
+        started_at = time.monotonic()
+        exported = 0
+        rows = {column: [] for column in columns}
+        for keys in scan_batches(redis_client, match=ACCOUNT_SCAN_PATTERN, count=scan_count):
+            if not keys:
+                continue
+            for login_name, account in _read_accounts(redis_client, keys):
+                account['login_name'] = login_name
+                if passwords == 'redact' and account.get('password'):
+                    account['password'] = redact_password_hash(account['password'])
+                for column in columns:
+                    rows[column].append(account.get(column))
+
+            # Write only whole batches, carrying the remainder over to the next scan batch
+            while len(rows['login_name']) >= batch_size:
+                _write_batch(writer, schema, {column: values[:batch_size] for column, values in rows.items()})
+                rows = {column: values[batch_size:] for column, values in rows.items()}
+                exported += batch_size
+                print(f"Exported {exported} accounts...")
+
+        if rows['login_name']:
+            _write_batch(writer, schema, rows)
+            exported += len(rows['login_name'])
+        writer.close()
+        writer = None
+        print(f"Exported {exported} accounts to {path} in {time.monotonic() - started_at:.1f}s.")
+        return exported
+    except Exception as e:
+        print(f"Failed to export accounts: {e}")
+        return None
+    finally:
+        if writer is not None:
+            writer.close()
+
+def _read_accounts(redis_client, keys):
+    # Reads a scan batch in one round trip, as (login_name, fields) of every account in it
+    pipeline = batch_pipeline(redis_client, transaction=False)
+    for key in keys:
+        pipeline.hgetall(key)
+    accounts = []
+    for key, fields in zip(keys, pipeline.execute()):
+        if key.startswith(COMPACT_KEY_PREFIX):
+            accounts.extend((login_name, decode_record(record)) for login_name, record in fields.items())
+        elif fields and login_name_from_key(key) is not None:
+            accounts.append((login_name_from_key(key), fields))
+    return accounts
+
+def _write_batch(writer, schema, rows):
+    batch = pyarrow.RecordBatch.from_pydict(rows, schema=schema)
+    if isinstance(writer, pyarrow.parquet.ParquetWriter):
+        writer.write_batch(batch, row_group_size=batch.num_rows)
+    else:
+        writer.write_batch(batch)
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the export tool.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Export every account to a Parquet or Arrow IPC file.")
+    parser.add_argument('path', help="The file to write, e.g. accounts.parquet.")
+    parser.add_argument('--format', choices=FORMATS, default='parquet', help="Parquet or the Arrow IPC file format.")
+    parser.add_argument('--batch-size', type=int, default=10000, help="Rows per record batch.")
+    parser.add_argument('--passwords', choices=PASSWORD_MODES, default='exclude',
+                        help="Leave the password hashes out, keep only their scheme and cost, or include them.")
+    parser.add_argument('--security-answers', action='store_true', help="Also export the security answers.")
+    parser.add_argument('--compression', default='zstd', help="Compression codec, e.g. zstd, lz4 or none.")
+    parser.add_argument('--scan-count', type=int, default=1000, help="Accounts scanned and read per round trip.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    export_accounts(
+        args.path,
+        format=args.format,
+        batch_size=args.batch_size,
+        passwords=args.passwords,
+        security_answers=args.security_answers,
+        compression=args.compression,
+        scan_count=args.scan_count
+    )
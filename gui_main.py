@@ -1,12 +1,17 @@
+import time
+APP_STARTED_AT = time.perf_counter()  # Taken before the heavy imports so startup times include them
+from Utils.config import METRICS_SETTINGS, STARTUP_PROFILE_SETTINGS
+from Utils.startup_profile import STARTUP_PROFILE
+if STARTUP_PROFILE_SETTINGS['enabled']:
+    STARTUP_PROFILE.enable(APP_STARTED_AT, STARTUP_PROFILE_SETTINGS['threshold_ms'])  # Time every import below
+
 from kivy.core.window import Window
 from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager, NoTransition
+from kivy.uix.screenmanager import NoTransition
+from GUI.backend_startup import start_backend
+from GUI.screen_registry import LazyScreenManager, screen_factory
 from Logic.app_logic import AppLogic
-from Screens.main_menu_screen import MainMenuScreen
-from Screens.create_account_screen import CreateAccountScreen
-from Screens.login_screen import LoginScreen
-from Screens.forgot_password_screen import ForgotPasswordScreen
-from Screens.info_screen import InfoScreen
+from Utils.metrics import MetricsDumper
 
 # Set the application title and window properties
 Window.title = "Find a Campsite App"
@@ -22,22 +27,56 @@ class CampsiteApp(App):
 
     def build(self):
         """
-        Sets up the screen manager and adds all screens to it.
+        Sets up the screen manager and registers all screens with it.
+
+        Only the main menu is built here; the other screens are built when first opened, or
+        while the main menu sits idle. The database connection and initial data load run in
+        the background, so the window is drawn straight away and the main menu shows the
+        startup progress.
 
         Returns:
-            ScreenManager: The screen manager instance with all app screens added.
+            LazyScreenManager: The screen manager instance with all app screens registered.
         """
-        self.logic = AppLogic()  # Initialize application logic
-        self.screen_manager = ScreenManager(transition=NoTransition())  # Screen manager with no transition animations
+        self.logic = AppLogic(connect=False)  # Initialize application logic, connected in the background below
+        self.screen_manager = LazyScreenManager(transition=NoTransition())  # Screen manager with no transition animations
+
+        # Register screens with the screen manager, preloading the main menu's destinations.
+        # The first screen registered is built straight away.
+        with STARTUP_PROFILE.phase("build main menu"):
+            self.screen_manager.register('main', screen_factory('Screens.main_menu_screen', 'MainMenuScreen', name='main'),
+                                         next_screens=('login', 'create_account', 'forgot_password'))
+        self.screen_manager.register('create_account', screen_factory(
+            'Screens.create_account_screen', 'CreateAccountScreen', self.logic, name='create_account'))
+        self.screen_manager.register('login', screen_factory(
+            'Screens.login_screen', 'LoginScreen', self.logic, name='login'))
+        self.screen_manager.register('forgot_password', screen_factory(
+            'Screens.forgot_password_screen', 'ForgotPasswordScreen', self.logic, name='forgot_password'))
+        self.screen_manager.register('info', screen_factory('Screens.info_screen', 'InfoScreen', name='info'))
+        main_menu = self.screen_manager.get_screen('main')
+
+        # Connect to Redis and load the initial data without blocking the first frame
+        start_backend(self.logic, APP_STARTED_AT, on_status=main_menu.set_status)
 
-        # Add screens to the screen manager
-        self.screen_manager.add_widget(MainMenuScreen(name='main'))
-        self.screen_manager.add_widget(CreateAccountScreen(self.logic, name='create_account'))
-        self.screen_manager.add_widget(LoginScreen(self.logic, name='login'))
-        self.screen_manager.add_widget(ForgotPasswordScreen(self.logic, name='forgot_password'))
-        self.screen_manager.add_widget(InfoScreen(name='info'))
+        # Write the command and password hashing metrics to a file periodically if configured
+        self.metrics_dumper = None
+        if METRICS_SETTINGS['path']:
+            self.metrics_dumper = MetricsDumper(
+                METRICS_SETTINGS['path'], METRICS_SETTINGS['interval'], METRICS_SETTINGS['format']
+            )
+            self.metrics_dumper.start()
 
         return self.screen_manager
 
+    def on_stop(self):
+        """
+        Stops the background work and closes the shared Redis connections when the
+        application exits, after a final metrics dump.
+        """
+        if self.metrics_dumper is not None:
+            self.metrics_dumper.stop()
+        self.logic.stop()
+        from Models.redis_client import RedisClient  # Loaded with the backend rather than at startup
+        RedisClient.close_all_pools()
+
 if __name__ == '__main__':
     CampsiteApp().run()  # Run the application
@@ -0,0 +1,286 @@
+import argparse
+import random
+from collections import Counter
+import redis
+from redis.cluster import RedisCluster
+from Benchmarks.benchmark_suite import BENCH_PASSWORD, BENCH_USER_PREFIX, clear_benchmark_keys
+from Models.account_keys import ACCOUNT_KEY_PREFIX, account_key
+from Models.cluster_pipeline import batch_pipeline
+from Models.compact_accounts import (
+    ACCOUNT_LAYOUTS, ACCOUNT_SCAN_PATTERN, COMPACT_KEY_PREFIX, account_writer, bucket_key, encode_record
+)
+from Models.password_policy import get_password_policy
+from Models.redis_client import scan_batches
+from Models.storage import open_storage
+from Models.storage_backend import StorageBackend
+
+# Bucket fill the comparison assumes unless told otherwise: well under the default
+# hash-max-listpack-entries of 128, with room for uneven buckets
+ACCOUNTS_PER_BUCKET = 64
+
+# Keys whose OBJECT ENCODING is checked after storing the synthetic accounts
+SAMPLED_ENCODINGS = 100
+
+def listpack_limits(redis_client):
+    """
+    Reads the limits under which Redis keeps a hash in the compact listpack encoding.
+
+    Args:
+        redis_client (redis.Redis): The Redis client.
+
+    Returns:
+        dict: 'entries' and 'value' (bytes), or None if CONFIG GET is not allowed, as on
+            some managed services.
+    """
+    try:
+        # Redis 7 renamed the ziplist settings to listpack and keeps the old names as aliases
+        for encoding in ('listpack', 'ziplist'):
+            config = redis_client.config_get(f"hash-max-{encoding}-*")
+            if config:
+                return {
+                    'entries': int(config[f"hash-max-{encoding}-entries"]),
+                    'value': int(config[f"hash-max-{encoding}-value"])
+                }
+    except redis.exceptions.RedisError:
+        pass
+    return None
+
+def measure_layout(redis_client, layout, accounts=10000, buckets=None, password_hash=None):
+    """
+    Stores synthetic benchmark accounts in one layout and measures the memory they add.
+
+    The MEMORY USAGE of every key the accounts are written to is taken before and after,
+    so compact buckets that already hold real accounts are measured correctly. MEMORY USAGE
+    leaves out the server's own entry for each key, so on a standalone server the change
+    in used_memory is reported too; it includes everything else happening on the server,
+    so it is only a rough figure. The benchmark accounts are deleted afterwards.
+
+    Args:
+        redis_client (redis.Redis): The Redis client.
+        layout (str): 'hash' or 'compact'.
+        accounts (int, optional): Accounts to store. Defaults to 10000.
+        buckets (int, optional): Number of compact buckets. Defaults to the CAMPSITE_COMPACT_BUCKETS setting.
+        password_hash (str, optional): Hash stored for every account. Defaults to a hash
+            made under the application's password policy.
+
+    Returns:
+        dict: The layout, accounts, keys, bytes_per_account (by MEMORY USAGE),
+            used_memory_per_account (None on a cluster), the longest compact record in
+            bytes, and the encodings of up to SAMPLED_ENCODINGS keys.
+    """
+    password_hash = password_hash or get_password_policy().hash(BENCH_PASSWORD)
+    login_names = [f"{BENCH_USER_PREFIX}{i}@example.com" for i in range(accounts)]
+    if layout == 'compact':
+        keys = sorted({bucket_key(login_name, buckets) for login_name in login_names})
+    else:
+        keys = [account_key(login_name) for login_name in login_names]
+
+    clear_benchmark_keys(redis_client)
+    used_before = _used_memory(redis_client)
+    usage_before = _memory_usage(redis_client, keys)
+    try:
+        write_account = account_writer(redis_client, layout, buckets)
+        max_record_bytes = 0
+        for start in range(0, accounts, 1000):
+            pipeline = batch_pipeline(redis_client, transaction=False)
+            for i in range(start, min(start + 1000, accounts)):
+                fields = {
+                    'password': password_hash,
+                    'first_name': f"Bench{i}",
+                    'security_question': "What is your pet's name?",
+                    'security_answer': f"Pet{i}"
+                }
+                max_record_bytes = max(max_record_bytes, len(encode_record(fields).encode('utf-8')))
+                write_account(pipeline, login_names[i], fields)
+            pipeline.execute()
+
+        usage = _memory_usage(redis_client, keys) - usage_before
+        used_after = _used_memory(redis_client)
+        sampled = random.sample(keys, min(len(keys), SAMPLED_ENCODINGS))
+        encodings = Counter(redis_client.object('encoding', key) for key in sampled)
+    finally:
+        clear_benchmark_keys(redis_client)
+
+    return {
+        'layout': layout,
+        'accounts': accounts,
+        'keys': len(keys),
+        'bytes_per_account': usage / accounts if accounts else 0.0,
+        'used_memory_per_account': (used_after - used_before) / accounts
+                                   if accounts and used_before is not None else None,
+        'max_record_bytes': max_record_bytes,
+        'encodings': dict(encodings)
+    }
+
+def compare_layouts(accounts=10000, buckets=None, redis_client=None):
+    """
+    Measures the bytes per account of the hash and compact layouts on the Redis server,
+    with the same synthetic accounts, and prints a report.
+
+    Unless a bucket count is given, the compact layout is measured at ACCOUNTS_PER_BUCKET
+    accounts per bucket, the fill CAMPSITE_COMPACT_BUCKETS should be sized for.
+
+    Args:
+        accounts (int, optional): Accounts stored in each layout. Defaults to 10000.
+        buckets (int, optional): Number of compact buckets. Defaults to accounts / ACCOUNTS_PER_BUCKET.
+        redis_client (redis.Redis, optional): Client to use. Defaults to the configured storage.
+
+    Returns:
+        dict: The settings, the listpack limits, each layout's measurements, and the share
+            of memory the compact layout saves; None on failure.
+    """
+    try:
+        if redis_client is None:
+            redis_client = open_storage()
+        if redis_client is None:
+            return None
+        if isinstance(redis_client, StorageBackend):
+            print("The memory report needs the Redis backend; MEMORY USAGE is a Redis command.")
+            return None
+
+        buckets = buckets or max(1, accounts // ACCOUNTS_PER_BUCKET)
+        password_hash = get_password_policy().hash(BENCH_PASSWORD)
+        layouts = {
+            layout: measure_layout(redis_client, layout, accounts, buckets, password_hash)
+            for layout in ACCOUNT_LAYOUTS
+        }
+    except Exception as e:
+        print(f"Failed to measure the account layouts: {e}")
+        return None
+
+    hash_bytes, compact_bytes = layouts['hash']['bytes_per_account'], layouts['compact']['bytes_per_account']
+    report = {
+        'accounts': accounts,
+        'buckets': buckets,
+        'listpack_limits': listpack_limits(redis_client),
+        'layouts': layouts,
+        'savings': 1 - compact_bytes / hash_bytes if hash_bytes else None
+    }
+    _print_report(report)
+    return report
+
+def measure_stored_accounts(scan_count=1000, redis_client=None):
+    """
+    Measures the memory of the accounts already stored, in each layout, without changing them.
+
+    Account keys and buckets are found with one incremental SCAN, and each batch is measured
+    with a pipelined round trip of MEMORY USAGE (and HLEN for buckets). Accounts still
+    under legacy bare keys are not counted.
+
+    Args:
+        scan_count (int, optional): SCAN count hint and keys measured per round trip. Defaults to 1000.
+        redis_client (redis.Redis, optional): Client to use. Defaults to the configured storage.
+
+    Returns:
+        dict: For each layout, the accounts, keys, bytes and bytes_per_account; None on failure.
+    """
+    try:
+        if redis_client is None:
+            redis_client = open_storage()
+        if redis_client is None:
+            return None
+        if isinstance(redis_client, StorageBackend):
+            print("The memory report needs the Redis backend; MEMORY USAGE is a Redis command.")
+            return None
+
+        totals = {layout: Counter() for layout in ACCOUNT_LAYOUTS}
+        for keys in scan_batches(redis_client, match=ACCOUNT_SCAN_PATTERN, count=scan_count):
+            keys = [key for key in keys if key.startswith((ACCOUNT_KEY_PREFIX, COMPACT_KEY_PREFIX))]
+            if not keys:
+                continue
+            pipeline = batch_pipeline(redis_client, transaction=False)
+            for key in keys:
+                pipeline.memory_usage(key, samples=0)
+                if key.startswith(COMPACT_KEY_PREFIX):
+                    pipeline.hlen(key)
+            results = iter(pipeline.execute())
+            for key in keys:
+                layout = 'compact' if key.startswith(COMPACT_KEY_PREFIX) else 'hash'
+                totals[layout]['bytes'] += next(results) or 0
+                totals[layout]['accounts'] += next(results) if layout == 'compact' else 1
+                totals[layout]['keys'] += 1
+    except Exception as e:
+        print(f"Failed to measure the stored accounts: {e}")
+        return None
+
+    report = {}
+    for layout, total in totals.items():
+        report[layout] = {
+            'accounts': total['accounts'],
+            'keys': total['keys'],
+            'bytes': total['bytes'],
+            'bytes_per_account': total['bytes'] / total['accounts'] if total['accounts'] else None
+        }
+        if total['accounts']:
+            print(f"{layout}: {total['accounts']} accounts in {total['keys']} keys, {total['bytes']} bytes, "
+                  f"{report[layout]['bytes_per_account']:.1f} bytes per account.")
+    if not any(total['accounts'] for total in totals.values()):
+        print("No accounts are stored.")
+    return report
+
+def _memory_usage(redis_client, keys):
+    # Total MEMORY USAGE of the keys, counting missing ones as 0, 1000 keys per round trip
+    total = 0
+    for start in range(0, len(keys), 1000):
+        pipeline = batch_pipeline(redis_client, transaction=False)
+        for key in keys[start:start + 1000]:
+            pipeline.memory_usage(key, samples=0)
+        total += sum(usage or 0 for usage in pipeline.execute())
+    return total
+
+def _used_memory(redis_client):
+    # A cluster spreads the keys over several servers, so there is no single figure to compare
+    if isinstance(redis_client, RedisCluster):
+        return None
+    return redis_client.info('memory')['used_memory']
+
+def _print_report(report):
+    print(f"{report['accounts']} synthetic accounts per layout, {report['buckets']} compact buckets:")
+    for layout, result in report['layouts'].items():
+        used_memory = result['used_memory_per_account']
+        used_memory = "" if used_memory is None else f", about {used_memory:.1f} by used_memory"
+        encodings = ", ".join(f"{encoding} {count}" for encoding, count in sorted(result['encodings'].items()))
+        print(f"  {layout}: {result['bytes_per_account']:.1f} bytes per account by MEMORY USAGE{used_memory} "
+              f"({result['keys']} keys; sampled encodings: {encodings})")
+    if report['savings'] is not None:
+        print(f"The compact layout uses {report['savings']:.0%} less memory per account.")
+
+    # Buckets over either limit are converted to a hashtable and lose most of the saving
+    limits = report['listpack_limits']
+    compact = report['layouts']['compact']
+    if limits is None:
+        print("Could not read hash-max-listpack-value; compact buckets need it above "
+              f"{compact['max_record_bytes']} bytes to stay listpack-encoded.")
+    else:
+        if compact['max_record_bytes'] > limits['value']:
+            print(f"Warning: records of up to {compact['max_record_bytes']} bytes exceed hash-max-listpack-value "
+                  f"({limits['value']}); raise it to 256 so compact buckets stay listpack-encoded.")
+        if report['accounts'] / report['buckets'] > limits['entries'] / 2:
+            print(f"Warning: buckets average {report['accounts'] / report['buckets']:.0f} accounts, too close to "
+                  f"hash-max-listpack-entries ({limits['entries']}); use more buckets.")
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the memory report.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Compare the memory used per account by the hash and compact layouts.")
+    parser.add_argument('--accounts', type=int, default=10000, help="Synthetic accounts stored in each layout.")
+    parser.add_argument('--buckets', type=int, default=None,
+                        help=f"Compact buckets to spread them over; by default {ACCOUNTS_PER_BUCKET} accounts per bucket.")
+    parser.add_argument('--stored', action='store_true',
+                        help="Measure the accounts already stored instead of synthetic ones.")
+    parser.add_argument('--scan-count', type=int, default=1000, help="Keys scanned and measured per round trip.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.stored:
+        measure_stored_accounts(scan_count=args.scan_count)
+    else:
+        compare_layouts(accounts=args.accounts, buckets=args.buckets)
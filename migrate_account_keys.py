@@ -0,0 +1,165 @@
+import argparse
+import time
+from Models.account_filter import publish_account_rebuild
+from Models.account_keys import ACCOUNT_KEY_PREFIX, MIGRATION_PROGRESS_KEY, account_key, is_legacy_account_key
+from Models.cluster_pipeline import batch_pipeline
+from Models.redis_client import dbsize, scan_batches
+from Models.storage import open_storage
+from Models.storage_backend import script_fallback
+
+# Moves one legacy account hash to its namespaced key. Running it server-side keeps the
+# move atomic while the app is reading and writing the same accounts. If the namespaced
+# key already exists it was written by the app after the migration started, so it wins
+# and the stale legacy copy is dropped.
+# KEYS[1] = legacy key, KEYS[2] = namespaced key
+# Returns 1 if moved, 2 if the legacy copy was dropped, 0 if the key is not an account.
+MIGRATE_ACCOUNT_SCRIPT = """
+if redis.call('TYPE', KEYS[1])['ok'] ~= 'hash' or redis.call('HEXISTS', KEYS[1], 'password') == 0 then
+    return 0
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    redis.call('DEL', KEYS[1])
+    return 2
+end
+redis.call('RENAME', KEYS[1], KEYS[2])
+return 1
+"""
+
+@script_fallback(MIGRATE_ACCOUNT_SCRIPT)
+def _migrate_account(storage, keys, args):
+    legacy, namespaced = keys
+    if not storage.hexists(legacy, 'password'):
+        return 0
+    if storage.exists(namespaced):
+        storage.delete(legacy)
+        return 2
+    storage.rename(legacy, namespaced)
+    return 1
+
+def migration_progress(redis_client):
+    """
+    Reads the progress counters of the account key migration.
+
+    Args:
+        redis_client (redis.Redis): Redis client for database operations.
+
+    Returns:
+        dict: status ('not started', 'running' or 'complete'), total (keys in the database
+            when the migration started), scanned, migrated, dropped and skipped counts.
+    """
+    progress = redis_client.hgetall(MIGRATION_PROGRESS_KEY) or {}
+    report = {'status': progress.get('status', 'not started')}
+    for field in ('total', 'scanned', 'migrated', 'dropped', 'skipped'):
+        report[field] = int(progress.get(field, 0))
+    return report
+
+def migrate_account_keys(batch_size=500, dry_run=False, max_keys_per_second=None, redis_client=None):
+    """
+    Moves accounts stored under bare login name keys to the namespaced key schema.
+
+    The database is walked with incremental SCAN, and each batch of candidate keys is moved
+    with one pipelined round trip of MIGRATE_ACCOUNT_SCRIPT calls, so the tool can run
+    while the app is live. The app keeps working during the migration because its reads
+    fall back to the legacy key. Progress counters are updated in the same round trip as
+    each batch and can be read with migration_progress() or `--status`.
+
+    Args:
+        batch_size (int, optional): SCAN count hint and keys moved per round trip. Defaults to 500.
+        dry_run (bool, optional): Only count the candidate legacy keys. Defaults to False.
+        max_keys_per_second (float, optional): Pause between batches to stay under this rate.
+            Defaults to no limit.
+        redis_client (redis.Redis, optional): Client to use. Defaults to the configured storage.
+
+    Returns:
+        dict: The final progress counters (see migration_progress), or None on failure.
+    """
+    try:
+        if redis_client is None:
+            redis_client = open_storage()
+
+        migrate = redis_client.register_script(MIGRATE_ACCOUNT_SCRIPT)
+        # Load the script on every node up front, so batched EVALSHA calls never miss it
+        redis_client.script_load(MIGRATE_ACCOUNT_SCRIPT)
+        total = dbsize(redis_client)
+        if not dry_run:
+            redis_client.delete(MIGRATION_PROGRESS_KEY)
+            redis_client.hset(MIGRATION_PROGRESS_KEY, mapping={
+                'status': 'running', 'total': total, 'started_at': int(time.time())
+            })
+
+        started_at = time.monotonic()
+        counts = {'scanned': 0, 'migrated': 0, 'dropped': 0, 'skipped': 0}
+        for keys in scan_batches(redis_client, count=batch_size, type='hash'):
+            # Keys already moved can show up again later in the scan, so leave them out of the counts
+            keys = [key for key in keys if not key.startswith(ACCOUNT_KEY_PREFIX)]
+            counts['scanned'] += len(keys)
+            candidates = [key for key in keys if is_legacy_account_key(key)]
+            counts['skipped'] += len(keys) - len(candidates)
+
+            if dry_run:
+                counts['migrated'] += len(candidates)
+            elif candidates:
+                # Move the whole batch in one round trip
+                pipeline = batch_pipeline(redis_client, transaction=False)
+                for key in candidates:
+                    migrate(keys=[key, account_key(key)], client=pipeline)
+                results = pipeline.execute()
+                counts['migrated'] += results.count(1)
+                counts['dropped'] += results.count(2)
+                counts['skipped'] += results.count(0)
+
+            if not dry_run:
+                redis_client.hset(MIGRATION_PROGRESS_KEY, mapping=dict(counts, updated_at=int(time.time())))
+
+            done = f"{counts['scanned']}/{total}" if total else str(counts['scanned'])
+            print(f"Scanned {done} keys, migrated {counts['migrated']} accounts so far...")
+
+            # Sleep long enough to keep the average rate under the limit
+            if max_keys_per_second:
+                ahead = counts['scanned'] / max_keys_per_second - (time.monotonic() - started_at)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+        if dry_run:
+            print(f"Dry run: {counts['migrated']} legacy keys would be migrated.")
+            return dict(counts, status='not started', total=total)
+
+        redis_client.hset(MIGRATION_PROGRESS_KEY, mapping={'status': 'complete'})
+        if counts['migrated']:
+            # Filters that skip legacy keys have not seen the migrated accounts yet
+            publish_account_rebuild(redis_client)
+        print(f"Migration complete: {counts['migrated']} accounts migrated, "
+              f"{counts['dropped']} stale legacy copies dropped.")
+        return migration_progress(redis_client)
+    except Exception as e:
+        print(f"Failed to migrate account keys: {e}")
+        return None
+
+def parse_args(argv=None):
+    """
+    Parses the command line options of the migration tool.
+
+    Args:
+        argv (list, optional): Arguments to parse. Defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed options.
+    """
+    parser = argparse.ArgumentParser(description="Move accounts to namespaced keys while the app is running.")
+    parser.add_argument('--batch-size', type=int, default=500, help="Keys scanned and moved per round trip.")
+    parser.add_argument('--dry-run', action='store_true', help="Count the legacy keys without moving them.")
+    parser.add_argument('--rate', type=float, default=None, help="Maximum keys scanned per second.")
+    parser.add_argument('--status', action='store_true', help="Show the progress of the migration and exit.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.status:
+        progress = migration_progress(open_storage())
+        print(", ".join(f"{field}: {value}" for field, value in progress.items()))
+    else:
+        migrate_account_keys(
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            max_keys_per_second=args.rate
+        )